@@ -0,0 +1,78 @@
+import os
+
+from aiogram import Bot, Dispatcher
+from aiogram.client.default import DefaultBotProperties
+from aiogram.client.telegram import TelegramAPIServer
+from aiogram.enums import ParseMode
+
+from app.database.fsm_storage import SQLiteStorage
+from app.handlers import routers
+from app.middlewares import CallbackDedupMiddleware, FastAckMiddleware, UserThrottleMiddleware
+from app.utils.edit_guard import EditGuardMiddleware
+from app.utils.jobs import job_executor
+from app.utils.rate_limit import OutboundScheduler
+from app.utils.session import ThrottledSession
+from app.utils.update_scheduler import UserOrderedScheduler
+
+
+def create_bot(rate_share: int = 1) -> Bot:
+    """
+    Создает бота с сессией, ограничивающей скорость запросов к Telegram
+
+    Args:
+        rate_share: На сколько процессов делится общий лимит запросов
+            (в режиме нескольких воркеров у каждого своя сессия)
+    """
+    # Все запросы к Telegram идут через планировщик с ограничением скорости
+    session_kwargs = {}
+    if os.getenv("TELEGRAM_API_URL"):
+        # Свой сервер Bot API (или scripts/fake_telegram.py для локальных проверок)
+        session_kwargs["api"] = TelegramAPIServer.from_base(os.getenv("TELEGRAM_API_URL"))
+    session = ThrottledSession(scheduler=OutboundScheduler(
+        global_rate=float(os.getenv("TELEGRAM_GLOBAL_RATE", "30")) / rate_share,
+        chat_rate=float(os.getenv("TELEGRAM_CHAT_RATE", "1")),
+    ), **session_kwargs)
+    # Редактирования, которые ничего не меняют, в Telegram не отправляются
+    session.middleware(EditGuardMiddleware())
+
+    return Bot(token=os.getenv("BOT_TOKEN"), session=session, default=DefaultBotProperties(
+        parse_mode=ParseMode.MARKDOWN,
+    ))
+
+
+def create_dispatcher(bot: Bot) -> Dispatcher:
+    """Создает диспетчер с middleware и всеми роутерами"""
+    # Апдейты разных пользователей обрабатываются параллельно, одного пользователя - по порядку
+    update_scheduler = UserOrderedScheduler(
+        max_concurrency=int(os.getenv("UPDATE_CONCURRENCY", "32")),
+    )
+    # Состояния сценариев хранятся в SQLite и переживают перезапуск
+    storage = SQLiteStorage(
+        os.getenv("FSM_DB", "fsm.db"),
+        ttl=float(os.getenv("FSM_TTL", str(24 * 60 * 60))),
+    )
+    dp = Dispatcher(storage=storage, events_isolation=update_scheduler)
+    dp["update_scheduler"] = update_scheduler
+
+    # Повторные нажатия и флуд отсекаются до обработчиков и запросов к базе
+    throttle = UserThrottleMiddleware(
+        rate=float(os.getenv("USER_RATE", "2")),
+        burst=int(os.getenv("USER_BURST", "5")),
+    )
+    dp.callback_query.outer_middleware(CallbackDedupMiddleware())
+    dp.callback_query.outer_middleware(throttle)
+    dp.message.outer_middleware(throttle)
+
+    # На нажатие кнопки отвечаем сразу, поздние ответы обработчиков перехватывает сессия
+    fast_ack = FastAckMiddleware(toasts={"bl_dist:": "📍 Сортирую по расстоянию…"})
+    dp.callback_query.outer_middleware(fast_ack)
+    bot.session.middleware(fast_ack.request_middleware)
+
+    # Пул процессов для тяжелых задач останавливается вместе с диспетчером
+    dp.shutdown.register(job_executor.shutdown)
+
+    # Регистрируем все роутеры
+    for router in routers:
+        dp.include_router(router)
+
+    return dp
@@ -1,3 +1,5 @@
 from app.database.database import Database
+from app.database.tags import tag_index, KNOWN_TAGS
+from app.database.spatial import spatial_index
 
-__all__ = ['Database'] 
\ No newline at end of file
+__all__ = ['Database', 'tag_index', 'KNOWN_TAGS', 'spatial_index'] 
\ No newline at end of file
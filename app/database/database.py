@@ -1,11 +1,43 @@
 import aiosqlite
 import os
-from typing import List, Dict, Any, Optional, Tuple
+from typing import List, Dict, Any, Optional, Tuple, AsyncIterator, Callable
 from datetime import datetime, date
+from app.database.search import normalize_search_text
+from app.database.tags import detect_tags
+from app.database.version import bump_content_version, data_version
+from app.utils.clock import (
+    parse_time_to_minutes, city_clock, set_city_timezones, LUNCH_SOON_MINUTES
+)
+
+
+class _BackupRestarted(Exception):
+    """Копирование базы слишком часто начиналось заново из-за записи в базу"""
+
+
+# Города, с которыми работает бот, и их часовые пояса
+DEFAULT_CITIES = {
+    "Липецк": "Europe/Moscow",
+    "Ковров": "Europe/Moscow",
+}
+
+# Город пользователя по (файл БД, ID пользователя); город меняется только через add_user
+_user_city_cache: Dict[Tuple[str, int], str] = {}
+USER_CITY_CACHE_SIZE = 100_000
+
+DEFAULT_DATABASE_NAME = "lunch_hunter.db"
+
+# Поисковые запросы, которые столько дней не вводились, удаляются при запуске
+SEARCH_QUERY_TTL_DAYS = 30
 
 class Database:
-    def __init__(self, db_name: str = "lunch_hunter.db"):
-        self.db_name = db_name
+    def __init__(self, db_name: Optional[str] = None):
+        # По умолчанию - база из DATABASE_NAME, общая для main.py, воркеров и обработчиков
+        self.db_name = db_name or os.getenv("DATABASE_NAME", DEFAULT_DATABASE_NAME)
+        
+    async def enable_wal(self):
+        """Переводит базу в режим WAL, чтобы несколько процессов читали ее, не мешая записи"""
+        async with aiosqlite.connect(self.db_name) as db:
+            await db.execute("PRAGMA journal_mode=WAL")
         
     async def create_tables(self):
         """Создает необходимые таблицы в базе данных"""
@@ -21,6 +53,18 @@ class Database:
             )
             ''')
             
+            # Таблица городов и их часовых поясов
+            await db.execute('''
+            CREATE TABLE IF NOT EXISTS cities (
+                name TEXT PRIMARY KEY,
+                timezone TEXT NOT NULL DEFAULT 'Europe/Moscow'
+            )
+            ''')
+            
+            await db.executemany('''
+            INSERT OR IGNORE INTO cities (name, timezone) VALUES (?, ?)
+            ''', list(DEFAULT_CITIES.items()))
+            
             # Таблица заведений
             await db.execute('''
             CREATE TABLE IF NOT EXISTS places (
@@ -58,6 +102,8 @@ class Database:
                 price REAL NOT NULL,
                 category TEXT NOT NULL,
                 description TEXT,
+                normalized_name TEXT,
+                normalized_category TEXT,
                 FOREIGN KEY (place_id) REFERENCES places(id) ON DELETE CASCADE
             )
             ''')
@@ -75,7 +121,192 @@ class Database:
             )
             ''')
             
+            # Таблица тегов заведений (кальяны, веранда, доставка и т.д.)
+            await db.execute('''
+            CREATE TABLE IF NOT EXISTS place_tags (
+                place_id INTEGER NOT NULL,
+                tag TEXT NOT NULL,
+                PRIMARY KEY (place_id, tag),
+                FOREIGN KEY (place_id) REFERENCES places(id) ON DELETE CASCADE
+            )
+            ''')
+            
+            await db.execute('''
+            CREATE INDEX IF NOT EXISTS idx_place_tags_tag ON place_tags(tag, place_id)
+            ''')
+            
+            # Кэш геокодирования: нормализованный адрес -> координаты
+            # (NULL в координатах - адрес не найден, повторно не ищем)
+            await db.execute('''
+            CREATE TABLE IF NOT EXISTS geocode_cache (
+                address_key TEXT PRIMARY KEY,
+                latitude REAL,
+                longitude REAL,
+                source TEXT,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+            ''')
+            
+            # Счетчик изменений данных о заведениях, по нему воркеры узнают об изменениях в других процессах
+            await db.execute('''
+            CREATE TABLE IF NOT EXISTS content_version (
+                id INTEGER PRIMARY KEY CHECK (id = 1),
+                value INTEGER NOT NULL
+            )
+            ''')
+            await db.execute('INSERT OR IGNORE INTO content_version (id, value) VALUES (1, 0)')
+            
+            # Поисковые запросы под короткими ID: запрос целиком в callback_data может не уместиться
+            await db.execute('''
+            CREATE TABLE IF NOT EXISTS search_queries (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                query TEXT NOT NULL UNIQUE,
+                last_used_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+            ''')
+            await self._ensure_column(db, 'search_queries', 'last_used_at', 'TIMESTAMP')
+            await self._prune_search_queries(db)
+            
+            # Поисковые колонки для баз, созданных до их появления
+            await self._ensure_column(db, 'menu_items', 'normalized_name', 'TEXT')
+            await self._ensure_column(db, 'menu_items', 'normalized_category', 'TEXT')
+            await self._backfill_menu_search_columns(db)
+            
+            # Город заведения дублируется в ланчах и меню для индексов по цене
+            await self._ensure_column(db, 'business_lunches', 'city', 'TEXT')
+            await self._ensure_column(db, 'menu_items', 'city', 'TEXT')
+            for table in ('business_lunches', 'menu_items'):
+                await db.execute(f'''
+                UPDATE {table} SET city = (SELECT city FROM places WHERE places.id = {table}.place_id)
+                WHERE city IS NULL
+                ''')
+            
+            # Индекс для поиска позиций меню внутри заведения
+            await db.execute('''
+            CREATE INDEX IF NOT EXISTS idx_menu_items_place_search
+            ON menu_items(place_id, normalized_category, normalized_name)
+            ''')
+            
+            # Координаты заведений и последняя геопозиция пользователя
+            await self._ensure_column(db, 'places', 'latitude', 'REAL')
+            await self._ensure_column(db, 'places', 'longitude', 'REAL')
+            await self._ensure_column(db, 'users', 'latitude', 'REAL')
+            await self._ensure_column(db, 'users', 'longitude', 'REAL')
+            await self._ensure_column(db, 'users', 'location_updated_at', 'TIMESTAMP')
+            
+            # Время ланча в минутах от полуночи для фильтра "идёт сейчас"
+            await self._ensure_column(db, 'business_lunches', 'start_minute', 'INTEGER')
+            await self._ensure_column(db, 'business_lunches', 'end_minute', 'INTEGER')
+            await self._backfill_lunch_minutes(db)
+            
+            await db.execute('''
+            CREATE INDEX IF NOT EXISTS idx_business_lunches_city_weekday_end
+            ON business_lunches(city, weekday, end_minute, start_minute)
+            ''')
+            
+            # Индексы для сортировки и фильтрации по цене с постраничным курсором
+            await db.execute('''
+            CREATE INDEX IF NOT EXISTS idx_business_lunches_city_weekday_price
+            ON business_lunches(city, weekday, price, id)
+            ''')
+            await db.execute('''
+            CREATE INDEX IF NOT EXISTS idx_business_lunches_place_weekday
+            ON business_lunches(place_id, weekday)
+            ''')
+            await db.execute('''
+            CREATE INDEX IF NOT EXISTS idx_menu_items_city_name_price
+            ON menu_items(city, normalized_name, price, normalized_category, place_id)
+            ''')
+            # Поиск по меню с сортировкой по цене идет по позициям города в порядке цены
+            await db.execute('''
+            CREATE INDEX IF NOT EXISTS idx_menu_items_city_price
+            ON menu_items(city, price, place_id, normalized_name, normalized_category)
+            ''')
+            # Выбор заведения администратором листается по курсору (название, ID)
+            await db.execute('''
+            CREATE INDEX IF NOT EXISTS idx_places_city_name
+            ON places(city, name, id)
+            ''')
+            # Рейтинг заведения считается по индексу, без чтения всей таблицы отзывов
+            await db.execute('''
+            CREATE INDEX IF NOT EXISTS idx_reviews_place_rating
+            ON reviews(place_id, rating)
+            ''')
+            
+            # Снятые администратором теги помечаются, чтобы автоматическая расстановка их не возвращала
+            await self._ensure_column(db, 'place_tags', 'suppressed', 'INTEGER NOT NULL DEFAULT 0')
+            await self._backfill_place_tags(db)
+            
             await db.commit()
+        data_version.bump()
+        await self.load_city_timezones()
+    
+    async def _ensure_column(self, db: aiosqlite.Connection, table: str, column: str, definition: str):
+        """Добавляет колонку в таблицу, если её ещё нет"""
+        cursor = await db.execute(f'PRAGMA table_info({table})')
+        columns = [row[1] for row in await cursor.fetchall()]
+        if column not in columns:
+            await db.execute(f'ALTER TABLE {table} ADD COLUMN {column} {definition}')
+    
+    async def _prune_search_queries(self, db: aiosqlite.Connection):
+        """
+        Удаляет поисковые запросы, которые не вводились SEARCH_QUERY_TTL_DAYS дней
+        
+        ID не переиспользуются (AUTOINCREMENT), поэтому кнопки старых поисков
+        получают "Поиск устарел", а не чужой запрос.
+        """
+        await db.execute('UPDATE search_queries SET last_used_at = CURRENT_TIMESTAMP WHERE last_used_at IS NULL')
+        await db.execute('''
+        DELETE FROM search_queries WHERE last_used_at < datetime('now', ?)
+        ''', (f'-{SEARCH_QUERY_TTL_DAYS} days',))
+    
+    async def _backfill_menu_search_columns(self, db: aiosqlite.Connection):
+        """Заполняет поисковые колонки позиций меню, добавленных до миграции"""
+        cursor = await db.execute('''
+        SELECT id, name, category FROM menu_items
+        WHERE normalized_name IS NULL OR normalized_category IS NULL
+        ''')
+        rows = await cursor.fetchall()
+        if rows:
+            await db.executemany('''
+            UPDATE menu_items SET normalized_name = ?, normalized_category = ? WHERE id = ?
+            ''', [(normalize_search_text(name), normalize_search_text(category), item_id)
+                  for item_id, name, category in rows])
+    
+    async def _backfill_lunch_minutes(self, db: aiosqlite.Connection):
+        """Переводит текстовое время ланчей, добавленных до миграции, в минуты от полуночи"""
+        cursor = await db.execute('''
+        SELECT id, start_time, end_time FROM business_lunches
+        WHERE start_minute IS NULL OR end_minute IS NULL
+        ''')
+        rows = await cursor.fetchall()
+        if rows:
+            await db.executemany('''
+            UPDATE business_lunches SET start_minute = ?, end_minute = ? WHERE id = ?
+            ''', [(parse_time_to_minutes(start_time), parse_time_to_minutes(end_time), lunch_id)
+                  for lunch_id, start_time, end_time in rows])
+    
+    async def _backfill_place_tags(self, db: aiosqlite.Connection):
+        """
+        Проставляет автоматические теги по категориям заведений и позиций меню
+        
+        Теги, снятые через /untag, остаются в таблице с suppressed = 1,
+        поэтому INSERT OR IGNORE их не возвращает.
+        """
+        cursor = await db.execute('''
+        SELECT p.id, p.category, GROUP_CONCAT(DISTINCT mi.category)
+        FROM places p
+        LEFT JOIN menu_items mi ON p.id = mi.place_id
+        GROUP BY p.id
+        ''')
+        rows = await cursor.fetchall()
+        tag_rows = [(place_id, tag)
+                    for place_id, category, menu_categories in rows
+                    for tag in detect_tags(category, menu_categories)]
+        if tag_rows:
+            await db.executemany('''
+            INSERT OR IGNORE INTO place_tags (place_id, tag) VALUES (?, ?)
+            ''', tag_rows)
     
     async def add_user(self, user_id: int, username: Optional[str], city: str) -> int:
         """Добавляет или обновляет пользователя в базе данных"""
@@ -97,7 +328,8 @@ class Database:
                 ''', (user_id, username, city))
             
             await db.commit()
-            return user_id
+        _user_city_cache[(self.db_name, user_id)] = city
+        return user_id
     
     async def set_admin_status(self, user_id: int, is_admin: bool) -> bool:
         """Устанавливает статус администратора для пользователя (только для ручного вызова)"""
@@ -129,13 +361,23 @@ class Database:
     
     async def get_user_city(self, user_id: int) -> Optional[str]:
         """Получает город пользователя"""
+        city = _user_city_cache.get((self.db_name, user_id))
+        if city is not None:
+            return city
+        
         async with aiosqlite.connect(self.db_name) as db:
             cursor = await db.execute('''
             SELECT city FROM users WHERE user_id = ?
             ''', (user_id,))
             
             row = await cursor.fetchone()
-            return row[0] if row else None
+        
+        if not row:
+            return None
+        if len(_user_city_cache) >= USER_CITY_CACHE_SIZE:
+            _user_city_cache.clear()
+        _user_city_cache[(self.db_name, user_id)] = row[0]
+        return row[0]
     
     async def add_place(self, name: str, address: str, category: str, city: str,
                         photo_id: Optional[str] = None, 
@@ -146,9 +388,16 @@ class Database:
             INSERT INTO places (name, address, category, city, photo_id, admin_comment)
             VALUES (?, ?, ?, ?, ?, ?)
             ''', (name, address, category, city, photo_id, admin_comment))
+            place_id = cursor.lastrowid
             
+            await db.executemany('''
+            INSERT OR IGNORE INTO place_tags (place_id, tag) VALUES (?, ?)
+            ''', [(place_id, tag) for tag in detect_tags(category)])
+            
+            await bump_content_version(db)
             await db.commit()
-            return cursor.lastrowid
+            data_version.bump()
+            return place_id
     
     async def add_business_lunch(self, place_id: int, price: float, 
                                 start_time: str, end_time: str, 
@@ -167,11 +416,15 @@ class Database:
         """
         async with aiosqlite.connect(self.db_name) as db:
             cursor = await db.execute('''
-            INSERT INTO business_lunches (place_id, price, start_time, end_time, description, weekday)
-            VALUES (?, ?, ?, ?, ?, ?)
-            ''', (place_id, price, start_time, end_time, description, weekday))
+            INSERT INTO business_lunches (place_id, price, start_time, end_time, description, weekday, city,
+                                          start_minute, end_minute)
+            VALUES (?, ?, ?, ?, ?, ?, (SELECT city FROM places WHERE id = ?), ?, ?)
+            ''', (place_id, price, start_time, end_time, description, weekday, place_id,
+                  parse_time_to_minutes(start_time), parse_time_to_minutes(end_time)))
             
+            await bump_content_version(db)
             await db.commit()
+            data_version.bump()
             return cursor.lastrowid
     
     async def add_menu_item(self, place_id: int, name: str, price: float, 
@@ -179,12 +432,21 @@ class Database:
         """Добавляет позицию меню для заведения"""
         async with aiosqlite.connect(self.db_name) as db:
             cursor = await db.execute('''
-            INSERT INTO menu_items (place_id, name, price, category, description)
-            VALUES (?, ?, ?, ?, ?)
-            ''', (place_id, name, price, category, description))
+            INSERT INTO menu_items (place_id, name, price, category, description,
+                                    normalized_name, normalized_category, city)
+            VALUES (?, ?, ?, ?, ?, ?, ?, (SELECT city FROM places WHERE id = ?))
+            ''', (place_id, name, price, category, description,
+                  normalize_search_text(name), normalize_search_text(category), place_id))
+            menu_item_id = cursor.lastrowid
             
+            await db.executemany('''
+            INSERT OR IGNORE INTO place_tags (place_id, tag) VALUES (?, ?)
+            ''', [(place_id, tag) for tag in detect_tags(category)])
+            
+            await bump_content_version(db)
             await db.commit()
-            return cursor.lastrowid
+            data_version.bump()
+            return menu_item_id
     
     async def add_review(self, user_id: int, place_id: int, rating: int, 
                         comment: Optional[str] = None) -> int:
@@ -195,10 +457,30 @@ class Database:
             VALUES (?, ?, ?, ?)
             ''', (user_id, place_id, rating, comment))
             
+            await bump_content_version(db)
             await db.commit()
+            data_version.bump()
             return cursor.lastrowid
     
-    async def get_business_lunches(self, city: str, limit: int = 10, offset: int = 0, weekday: Optional[int] = None) -> List[Dict[str, Any]]:
+    def _lunch_day_condition(self, weekday: int, open_at: Optional[int]) -> Tuple[str, tuple]:
+        """
+        Условие для ланчей дня недели; с open_at - только идущих сейчас или начинающихся в ближайшие минуты
+        
+        Ланч, который заканчивается раньше, чем начинается (например, 22:00 - 02:00),
+        идет через полночь: после полуночи он еще идет, но относится к предыдущему дню.
+        """
+        if open_at is None:
+            return '(bl.weekday = ? OR bl.weekday = 0)', (weekday,)
+        previous_weekday = (weekday + 5) % 7 + 1
+        return '''(
+                (bl.weekday = ? OR bl.weekday = 0) AND bl.start_minute <= ?
+                AND (bl.end_minute > ? OR bl.end_minute < bl.start_minute)
+                OR (bl.weekday = ? OR bl.weekday = 0)
+                AND bl.end_minute < bl.start_minute AND bl.end_minute > ?
+            )''', (weekday, open_at + LUNCH_SOON_MINUTES, open_at, previous_weekday, open_at)
+    
+    async def get_business_lunches(self, city: str, limit: int = 10, offset: int = 0, weekday: Optional[int] = None,
+                                   open_at: Optional[int] = None, with_ratings: bool = False) -> List[Dict[str, Any]]:
         """
         Получает список заведений с бизнес-ланчами
         
@@ -207,23 +489,40 @@ class Database:
             limit: Ограничение количества результатов
             offset: Смещение для пагинации
             weekday: Конкретный день недели (1-7) или None для текущего дня
+            open_at: Время в минутах от полуночи, чтобы оставить только идущие
+                     или скоро начинающиеся ланчи, или None
+            with_ratings: Добавить средний рейтинг (avg_rating) и количество отзывов (review_count)
         """
         # Если weekday не указан, используем текущий день недели
         if weekday is None:
-            weekday = datetime.now().isoweekday()  # 1 - пн, 2 - вт, и т.д.
+            weekday = city_clock(city).weekday()  # 1 - пн, 2 - вт, и т.д.
         
-        async with aiosqlite.connect(self.db_name) as db:
-            db.row_factory = aiosqlite.Row
-            cursor = await db.execute('''
+        day_condition, day_params = self._lunch_day_condition(weekday, open_at)
+        
+        query = f'''
             SELECT p.id, p.name, p.address, p.city, p.photo_id, p.admin_comment,
-                   bl.price, bl.start_time, bl.end_time, bl.description, bl.weekday
+                   bl.price, bl.start_time, bl.end_time, bl.description, bl.weekday,
+                   bl.start_minute, bl.end_minute
             FROM places p
             JOIN business_lunches bl ON p.id = bl.place_id
-            WHERE (bl.weekday = ? OR bl.weekday = 0) AND p.city = ?
+            WHERE {day_condition} AND bl.city = ?
             GROUP BY p.id
             ORDER BY p.name
             LIMIT ? OFFSET ?
-            ''', (weekday, city, limit, offset))
+        '''
+        if with_ratings:
+            # Рейтинги считаются только для заведений уже выбранной страницы
+            query = f'''
+            SELECT page.*,
+                   (SELECT AVG(rating) FROM reviews r WHERE r.place_id = page.id) AS avg_rating,
+                   (SELECT COUNT(*) FROM reviews r WHERE r.place_id = page.id) AS review_count
+            FROM ({query}) page
+            ORDER BY page.name
+            '''
+        
+        async with aiosqlite.connect(self.db_name) as db:
+            db.row_factory = aiosqlite.Row
+            cursor = await db.execute(query, (*day_params, city, limit, offset))
             
             rows = await cursor.fetchall()
             result = []
@@ -231,18 +530,274 @@ class Database:
                 result.append(dict(row))
             return result
     
+    async def get_business_lunches_by_price(self, city: str, weekday: Optional[int] = None,
+                                            max_price: Optional[float] = None,
+                                            cursor: Optional[Tuple[float, int]] = None,
+                                            backward: bool = False,
+                                            limit: int = 1) -> List[Dict[str, Any]]:
+        """
+        Получает заведения с бизнес-ланчами, отсортированные по цене (сначала дешёвые)
+        
+        Каждое заведение показывается один раз - с самым дешёвым ланчем на этот день.
+        Постраничный вывод идет по курсору (цена, ID ланча), поэтому каждая страница
+        читает из индекса (city, weekday, price) только limit строк.
+        
+        Args:
+            city: Город
+            weekday: День недели (1-7) или None для текущего дня
+            max_price: Максимальная цена ланча или None
+            cursor: Пара (цена, ID ланча), относительно которой берется страница
+            backward: Брать ланчи перед курсором (предыдущая страница)
+            limit: Количество результатов
+        """
+        if weekday is None:
+            weekday = city_clock(city).weekday()
+        
+        order = 'DESC' if backward else 'ASC'
+        conditions = ['city = ?']
+        params: List[Any] = [city]
+        if max_price is not None:
+            conditions.append('price <= ?')
+            params.append(max_price)
+        if cursor is not None:
+            conditions.append(f"(price, id) {'<' if backward else '>'} (?, ?)")
+            params.extend(cursor)
+        condition = ' AND '.join(conditions)
+        # Более дешёвый ланч того же заведения в тот же день (при равной цене - с меньшим ID)
+        cheaper = '''NOT EXISTS (SELECT 1 FROM business_lunches b3
+                                 WHERE b3.place_id = bl.place_id AND b3.weekday = bl.weekday
+                                       AND (b3.price, b3.id) < (bl.price, bl.id))'''
+        
+        # Ланчи на конкретный день и ланчи "каждый день" берутся из двух диапазонов индекса,
+        # ланч "каждый день" не показывается, если у заведения есть ланч на этот день
+        query = f'''
+        SELECT p.id, p.name, p.address, p.city, p.photo_id, p.admin_comment,
+               x.lunch_id, x.price, x.start_time, x.end_time, x.description, x.weekday
+        FROM (
+            SELECT * FROM (
+                SELECT id AS lunch_id, place_id, price, start_time, end_time, description, weekday
+                FROM business_lunches bl
+                WHERE weekday = ? AND {condition} AND {cheaper}
+                ORDER BY price {order}, id {order}
+                LIMIT ?
+            )
+            UNION ALL
+            SELECT * FROM (
+                SELECT id AS lunch_id, place_id, price, start_time, end_time, description, weekday
+                FROM business_lunches bl
+                WHERE weekday = 0 AND {condition} AND {cheaper}
+                      AND NOT EXISTS (SELECT 1 FROM business_lunches b2
+                                      WHERE b2.place_id = bl.place_id AND b2.weekday = ?)
+                ORDER BY price {order}, id {order}
+                LIMIT ?
+            )
+        ) x
+        JOIN places p ON p.id = x.place_id
+        ORDER BY x.price {order}, x.lunch_id {order}
+        LIMIT ?
+        '''
+        
+        async with aiosqlite.connect(self.db_name) as db:
+            db.row_factory = aiosqlite.Row
+            cursor_ = await db.execute(query, (
+                weekday, *params, limit,
+                *params, weekday, limit,
+                limit
+            ))
+            rows = await cursor_.fetchall()
+            result = [dict(row) for row in rows]
+            if backward:
+                result.reverse()
+            return result
+    
+    async def count_business_lunches_by_price(self, city: str, weekday: Optional[int] = None,
+                                              max_price: Optional[float] = None) -> int:
+        """
+        Подсчитывает заведения с бизнес-ланчами для режима сортировки по цене
+        
+        Args:
+            city: Город
+            weekday: День недели (1-7) или None для текущего дня
+            max_price: Максимальная цена ланча или None
+        """
+        if weekday is None:
+            weekday = city_clock(city).weekday()
+        
+        price_condition = 'AND price <= ?' if max_price is not None else ''
+        price_params = (max_price,) if max_price is not None else ()
+        
+        async with aiosqlite.connect(self.db_name) as db:
+            cursor = await db.execute(f'''
+            SELECT
+                (SELECT COUNT(DISTINCT place_id) FROM business_lunches
+                 WHERE city = ? AND weekday = ? {price_condition})
+              + (SELECT COUNT(DISTINCT place_id) FROM business_lunches bl
+                 WHERE city = ? AND weekday = 0 {price_condition}
+                       AND NOT EXISTS (SELECT 1 FROM business_lunches b2
+                                       WHERE b2.place_id = bl.place_id AND b2.weekday = ?))
+            ''', (city, weekday, *price_params, city, *price_params, weekday))
+            
+            count = await cursor.fetchone()
+            return count[0] if count else 0
+    
+    async def search_places_by_menu_price(self, query: str, city: str,
+                                          max_price: Optional[float] = None,
+                                          cursor: Optional[Tuple[float, int]] = None,
+                                          backward: bool = False,
+                                          limit: int = 1) -> List[Dict[str, Any]]:
+        """
+        Поиск заведений по позициям меню, отсортированный по самой дешёвой подходящей позиции
+        
+        Позиции города читаются из индекса (city, price, place_id) в порядке цены, начиная
+        с курсора (минимальная цена, ID заведения). Заведение попадает в выдачу по своей
+        самой дешёвой подходящей позиции, а чтение останавливается, как только набрано
+        limit заведений, поэтому страница не группирует все позиции города.
+        
+        Args:
+            query: Поисковый запрос
+            city: Город
+            max_price: Максимальная цена позиции или None
+            cursor: Пара (минимальная цена, ID заведения), относительно которой берется страница
+            backward: Брать заведения перед курсором (предыдущая страница)
+            limit: Количество результатов
+        """
+        normalized_query = normalize_search_text(query)
+        order = 'DESC' if backward else 'ASC'
+        conditions = ['mi.city = ?', '(instr(mi.normalized_name, ?) > 0 OR instr(mi.normalized_category, ?) > 0)']
+        params: List[Any] = [city, normalized_query, normalized_query]
+        if max_price is not None:
+            conditions.append('mi.price <= ?')
+            params.append(max_price)
+        if cursor is not None:
+            conditions.append(f"(mi.price, mi.place_id) {'<' if backward else '>'} (?, ?)")
+            params.extend(cursor)
+        
+        async with aiosqlite.connect(self.db_name) as db:
+            db.row_factory = aiosqlite.Row
+            cursor_ = await db.execute(f'''
+            SELECT mi.place_id, mi.price
+            FROM menu_items mi INDEXED BY idx_menu_items_city_price
+            WHERE {' AND '.join(conditions)}
+                  AND NOT EXISTS (SELECT 1 FROM menu_items m2
+                                  WHERE m2.place_id = mi.place_id AND m2.price < mi.price
+                                        AND (instr(m2.normalized_name, ?) > 0
+                                             OR instr(m2.normalized_category, ?) > 0))
+            ORDER BY mi.price {order}, mi.place_id {order}
+            ''', (*params, normalized_query, normalized_query))
+            
+            # Несколько подходящих позиций заведения по одной минимальной цене идут подряд
+            min_prices: Dict[int, float] = {}
+            while len(min_prices) < limit:
+                rows = await cursor_.fetchmany(limit + 10)
+                if not rows:
+                    break
+                for place_id, price in rows:
+                    min_prices.setdefault(place_id, price)
+                    if len(min_prices) == limit:
+                        break
+            await cursor_.close()
+            if not min_prices:
+                return []
+            
+            placeholders = ', '.join('?' * len(min_prices))
+            cursor_ = await db.execute(f'''
+            SELECT id, name, address, city, photo_id, admin_comment
+            FROM places WHERE id IN ({placeholders})
+            ''', tuple(min_prices))
+            places = {row['id']: dict(row) for row in await cursor_.fetchall()}
+        
+        result = []
+        for place_id, price in min_prices.items():
+            if place_id in places:
+                result.append({**places[place_id], 'min_price': price})
+        if backward:
+            result.reverse()
+        return result
+    
+    async def count_search_results_by_price(self, query: str, city: str,
+                                            max_price: Optional[float] = None) -> int:
+        """Подсчитывает заведения с подходящими позициями меню не дороже max_price"""
+        normalized_query = normalize_search_text(query)
+        price_condition = 'AND price <= ?' if max_price is not None else ''
+        price_params = (max_price,) if max_price is not None else ()
+        
+        async with aiosqlite.connect(self.db_name) as db:
+            cursor = await db.execute(f'''
+            SELECT COUNT(DISTINCT place_id)
+            FROM menu_items INDEXED BY idx_menu_items_city_price
+            WHERE city = ?
+                  AND (instr(normalized_name, ?) > 0 OR instr(normalized_category, ?) > 0)
+                  {price_condition}
+            ''', (city, normalized_query, normalized_query, *price_params))
+            
+            count = await cursor.fetchone()
+            return count[0] if count else 0
+    
+    async def get_search_query_id(self, query: str) -> int:
+        """
+        Возвращает короткий ID поискового запроса для callback_data
+        
+        Вызывается один раз, когда пользователь вводит запрос: запрос сохраняется
+        при первом вводе, при повторном обновляется время последнего ввода.
+        """
+        async with aiosqlite.connect(self.db_name) as db:
+            cursor = await db.execute('''
+            INSERT INTO search_queries (query) VALUES (?)
+            ON CONFLICT(query) DO UPDATE SET last_used_at = CURRENT_TIMESTAMP
+            RETURNING id
+            ''', (query,))
+            row = await cursor.fetchone()
+            await db.commit()
+            return row[0]
+    
+    async def get_search_query(self, query_id: int) -> Optional[str]:
+        """Возвращает поисковый запрос по его ID или None, если такого нет"""
+        async with aiosqlite.connect(self.db_name) as db:
+            cursor = await db.execute('SELECT query FROM search_queries WHERE id = ?', (query_id,))
+            row = await cursor.fetchone()
+            return row[0] if row else None
+    
+    async def compare_menu_prices(self, query: str, city: str, limit: int = 10) -> List[Dict[str, Any]]:
+        """
+        Находит самые дешёвые подходящие позиции меню во всех заведениях города
+        
+        Args:
+            query: Поисковый запрос
+            city: Город
+            limit: Количество позиций в результате
+        """
+        normalized_query = normalize_search_text(query)
+        
+        async with aiosqlite.connect(self.db_name) as db:
+            db.row_factory = aiosqlite.Row
+            cursor = await db.execute('''
+            SELECT mi.id, mi.name, mi.price, mi.category, mi.description,
+                   p.id AS place_id, p.name AS place_name
+            FROM menu_items mi INDEXED BY idx_menu_items_city_name_price
+            JOIN places p ON p.id = mi.place_id
+            WHERE mi.city = ?
+                  AND (instr(mi.normalized_name, ?) > 0 OR instr(mi.normalized_category, ?) > 0)
+            ORDER BY mi.price, mi.id
+            LIMIT ?
+            ''', (city, normalized_query, normalized_query, limit))
+            
+            rows = await cursor.fetchall()
+            return [dict(row) for row in rows]
+    
     async def search_places_by_menu(self, query: str, city: str, limit: int = 10, offset: int = 0) -> List[Dict[str, Any]]:
         """Поиск заведений по позициям меню"""
+        normalized_query = normalize_search_text(query)
         async with aiosqlite.connect(self.db_name) as db:
             db.row_factory = aiosqlite.Row
             cursor = await db.execute('''
             SELECT DISTINCT p.id, p.name, p.address, p.city, p.photo_id, p.admin_comment
             FROM places p
             JOIN menu_items mi ON p.id = mi.place_id
-            WHERE (mi.name LIKE ? OR mi.category LIKE ?) AND p.city = ?
+            WHERE (instr(mi.normalized_name, ?) > 0 OR instr(mi.normalized_category, ?) > 0)
+                  AND p.city = ?
             ORDER BY p.name
             LIMIT ? OFFSET ?
-            ''', (f'%{query}%', f'%{query}%', city, limit, offset))
+            ''', (normalized_query, normalized_query, city, limit, offset))
             
             rows = await cursor.fetchall()
             result = []
@@ -271,12 +826,15 @@ class Database:
             place_id: ID заведения
             weekday: День недели (1-7) или None для текущего дня
         """
-        # Если weekday не указан, используем текущий день недели
-        if weekday is None:
-            weekday = datetime.now().isoweekday()  # 1 - пн, 2 - вт, и т.д.
-        
         async with aiosqlite.connect(self.db_name) as db:
             db.row_factory = aiosqlite.Row
+            
+            # Если weekday не указан, используем текущий день недели в городе заведения
+            if weekday is None:
+                cursor = await db.execute('SELECT city FROM places WHERE id = ?', (place_id,))
+                row = await cursor.fetchone()
+                weekday = city_clock(row['city'] if row else None).weekday()  # 1 - пн, 2 - вт, и т.д.
+            
             # Сначала пытаемся найти бизнес-ланч для конкретного дня недели
             cursor = await db.execute('''
             SELECT * FROM business_lunches 
@@ -341,6 +899,51 @@ class Database:
                 result.append(dict(row))
             return result
     
+    async def get_matching_menu_items(self, place_id: int, query: str,
+                                      limit: Optional[int] = None,
+                                      category_only: bool = False) -> Tuple[List[Dict[str, Any]], int]:
+        """
+        Получает позиции меню заведения, подходящие под поисковый запрос
+        
+        Args:
+            place_id: ID заведения
+            query: Поисковый запрос
+            limit: Сколько позиций вернуть (None - все)
+            category_only: Искать только по категории позиции
+        
+        Returns:
+            Кортеж (позиции, общее количество подходящих позиций)
+        """
+        normalized_query = normalize_search_text(query)
+        if category_only:
+            condition = 'instr(normalized_category, ?) > 0'
+            params = (place_id, normalized_query)
+        else:
+            condition = '(instr(normalized_name, ?) > 0 OR instr(normalized_category, ?) > 0)'
+            params = (place_id, normalized_query, normalized_query)
+        
+        async with aiosqlite.connect(self.db_name) as db:
+            db.row_factory = aiosqlite.Row
+            cursor = await db.execute(f'''
+            SELECT COUNT(*) FROM menu_items
+            WHERE place_id = ? AND {condition}
+            ''', params)
+            count = await cursor.fetchone()
+            total = count[0] if count else 0
+            
+            if total == 0:
+                return [], 0
+            
+            cursor = await db.execute(f'''
+            SELECT * FROM menu_items
+            WHERE place_id = ? AND {condition}
+            ORDER BY category, name
+            LIMIT ?
+            ''', params + (limit if limit is not None else -1,))
+            
+            rows = await cursor.fetchall()
+            return [dict(row) for row in rows], total
+    
     async def get_reviews_by_place_id(self, place_id: int) -> List[Dict[str, Any]]:
         """Получает отзывы о заведении"""
         async with aiosqlite.connect(self.db_name) as db:
@@ -356,38 +959,44 @@ class Database:
                 result.append(dict(row))
             return result
     
-    async def count_business_lunches(self, city: str, weekday: Optional[int] = None) -> int:
+    async def count_business_lunches(self, city: str, weekday: Optional[int] = None,
+                                     open_at: Optional[int] = None) -> int:
         """
         Подсчитывает общее количество заведений с бизнес-ланчами
         
         Args:
             city: Город
             weekday: День недели (1-7) или None для текущего дня
+            open_at: Время в минутах от полуночи, чтобы считать только идущие
+                     или скоро начинающиеся ланчи, или None
         """
         # Если weekday не указан, используем текущий день недели
         if weekday is None:
-            weekday = datetime.now().isoweekday()  # 1 - пн, 2 - вт, и т.д.
+            weekday = city_clock(city).weekday()  # 1 - пн, 2 - вт, и т.д.
+        
+        day_condition, day_params = self._lunch_day_condition(weekday, open_at)
         
         async with aiosqlite.connect(self.db_name) as db:
-            cursor = await db.execute('''
-            SELECT COUNT(DISTINCT p.id)
-            FROM places p
-            JOIN business_lunches bl ON p.id = bl.place_id
-            WHERE (bl.weekday = ? OR bl.weekday = 0) AND p.city = ?
-            ''', (weekday, city))
+            cursor = await db.execute(f'''
+            SELECT COUNT(DISTINCT bl.place_id)
+            FROM business_lunches bl
+            WHERE {day_condition} AND bl.city = ?
+            ''', (*day_params, city))
             
             count = await cursor.fetchone()
             return count[0] if count else 0
     
     async def count_search_results(self, query: str, city: str) -> int:
         """Подсчитывает количество результатов поиска"""
+        normalized_query = normalize_search_text(query)
         async with aiosqlite.connect(self.db_name) as db:
             cursor = await db.execute('''
             SELECT COUNT(DISTINCT p.id)
             FROM places p
             JOIN menu_items mi ON p.id = mi.place_id
-            WHERE (mi.name LIKE ? OR mi.category LIKE ?) AND p.city = ?
-            ''', (f'%{query}%', f'%{query}%', city))
+            WHERE (instr(mi.normalized_name, ?) > 0 OR instr(mi.normalized_category, ?) > 0)
+                  AND p.city = ?
+            ''', (normalized_query, normalized_query, city))
             
             count = await cursor.fetchone()
             return count[0] if count else 0
@@ -408,6 +1017,490 @@ class Database:
                 result.append(dict(row))
             return result
     
+    @staticmethod
+    def _admin_places_filter(city: str, name_filter: Optional[str]) -> Tuple[str, List[Any]]:
+        """Условие WHERE и параметры для выбора заведений администратором"""
+        where = 'city = ?'
+        params: List[Any] = [city]
+        if name_filter:
+            where += ' AND instr(normalize_text(name), ?) > 0'
+            params.append(normalize_search_text(name_filter))
+        return where, params
+    
+    async def get_places_page_for_admin(self, city: str, name_filter: Optional[str] = None,
+                                        cursor: Optional[Tuple[str, int]] = None, backward: bool = False,
+                                        limit: int = 5) -> List[Dict[str, Any]]:
+        """
+        Получает страницу заведений города по курсору для выбора администратором
+        
+        Заведения упорядочены по (название, ID) и читаются по индексу (city, name, id):
+        страница берется после (или перед) курсором, без OFFSET. Курсор - сами значения
+        (название, ID), поэтому страницы листаются, даже если заведение-курсор удалено.
+        
+        Args:
+            city: Город
+            name_filter: Часть названия (без учета регистра) или None
+            cursor: Пара (название, ID), относительно которой берется страница
+            backward: Брать заведения перед курсором (предыдущая страница)
+            limit: Количество заведений на странице
+        """
+        where, params = self._admin_places_filter(city, name_filter)
+        order = 'DESC' if backward else 'ASC'
+        if cursor is not None:
+            where += f" AND (name, id) {'<' if backward else '>'} (?, ?)"
+            params.extend(cursor)
+        
+        async with aiosqlite.connect(self.db_name) as db:
+            db.row_factory = aiosqlite.Row
+            await db.create_function('normalize_text', 1, normalize_search_text, deterministic=True)
+            cursor = await db.execute(f'''
+            SELECT id, name, address FROM places INDEXED BY idx_places_city_name
+            WHERE {where}
+            ORDER BY name {order}, id {order}
+            LIMIT ?
+            ''', (*params, limit))
+            
+            result = [dict(row) for row in await cursor.fetchall()]
+            if backward:
+                result.reverse()
+            return result
+    
+    async def count_places_for_admin(self, city: str, name_filter: Optional[str] = None) -> int:
+        """Подсчитывает заведения города, подходящие под фильтр по названию"""
+        where, params = self._admin_places_filter(city, name_filter)
+        async with aiosqlite.connect(self.db_name) as db:
+            await db.create_function('normalize_text', 1, normalize_search_text, deterministic=True)
+            cursor = await db.execute(f'SELECT COUNT(*) FROM places WHERE {where}', params)
+            return (await cursor.fetchone())[0]
+    
+    async def load_city_timezones(self) -> Dict[str, str]:
+        """Загружает часовые пояса городов и передает их в city_clock"""
+        async with aiosqlite.connect(self.db_name) as db:
+            cursor = await db.execute('SELECT name, timezone FROM cities')
+            timezones = {name: timezone for name, timezone in await cursor.fetchall()}
+        set_city_timezones(timezones)
+        return timezones
+    
+    async def set_city_timezone(self, city: str, timezone: str):
+        """Задает часовой пояс города"""
+        async with aiosqlite.connect(self.db_name) as db:
+            await db.execute('''
+            INSERT INTO cities (name, timezone) VALUES (?, ?)
+            ON CONFLICT(name) DO UPDATE SET timezone = excluded.timezone
+            ''', (city, timezone))
+            
+            await bump_content_version(db)
+            await db.commit()
+        await self.load_city_timezones()
+        data_version.bump()
+    
+    async def set_place_coordinates(self, place_id: int, latitude: float, longitude: float) -> bool:
+        """Сохраняет координаты заведения"""
+        async with aiosqlite.connect(self.db_name) as db:
+            cursor = await db.execute('''
+            UPDATE places SET latitude = ?, longitude = ? WHERE id = ?
+            ''', (latitude, longitude, place_id))
+            
+            await bump_content_version(db)
+            await db.commit()
+        data_version.bump()
+        return cursor.rowcount > 0
+    
+    async def get_place_coordinates(self) -> List[Tuple[int, str, float, float]]:
+        """Получает координаты всех заведений, для которых они известны"""
+        async with aiosqlite.connect(self.db_name) as db:
+            cursor = await db.execute('''
+            SELECT id, city, latitude, longitude FROM places
+            WHERE latitude IS NOT NULL AND longitude IS NOT NULL
+            ''')
+            return [tuple(row) for row in await cursor.fetchall()]
+    
+    async def set_places_coordinates(self, coordinates: List[Tuple[int, float, float]]) -> int:
+        """
+        Сохраняет координаты нескольких заведений одной транзакцией
+        
+        Args:
+            coordinates: Список (ID заведения, широта, долгота)
+        
+        Returns:
+            Количество обновленных заведений
+        """
+        if not coordinates:
+            return 0
+        
+        async with aiosqlite.connect(self.db_name) as db:
+            cursor = await db.executemany('''
+            UPDATE places SET latitude = ?, longitude = ? WHERE id = ?
+            ''', [(latitude, longitude, place_id) for place_id, latitude, longitude in coordinates])
+            
+            await bump_content_version(db)
+            await db.commit()
+        data_version.bump()
+        return cursor.rowcount
+    
+    async def import_places(self, places: List[Dict]) -> Tuple[int, int]:
+        """
+        Записывает пачку заведений из импорта одной транзакцией
+        
+        Заведение ищется по городу, названию и адресу: найденное обновляется,
+        иначе добавляется новое. Ланчи на указанные дни недели и позиции меню
+        указанных категорий заменяются данными из импорта, остальные не трогаются.
+        
+        Args:
+            places: Записи, подготовленные app.utils.importer.normalize_place
+        
+        Returns:
+            Количество добавленных и обновленных заведений
+        """
+        inserted = updated = 0
+        if not places:
+            return inserted, updated
+        
+        async with aiosqlite.connect(self.db_name) as db:
+            for place in places:
+                cursor = await db.execute('''
+                SELECT id FROM places WHERE city = ? AND name = ? AND address = ?
+                ORDER BY id LIMIT 1
+                ''', (place['city'], place['name'], place['address']))
+                row = await cursor.fetchone()
+                
+                if row:
+                    place_id = row[0]
+                    await db.execute('''
+                    UPDATE places SET category = ?, admin_comment = COALESCE(?, admin_comment),
+                                      latitude = COALESCE(?, latitude), longitude = COALESCE(?, longitude)
+                    WHERE id = ?
+                    ''', (place['category'], place['admin_comment'],
+                          place['latitude'], place['longitude'], place_id))
+                    updated += 1
+                else:
+                    cursor = await db.execute('''
+                    INSERT INTO places (name, address, category, city, admin_comment, latitude, longitude)
+                    VALUES (?, ?, ?, ?, ?, ?, ?)
+                    ''', (place['name'], place['address'], place['category'], place['city'],
+                          place['admin_comment'], place['latitude'], place['longitude']))
+                    place_id = cursor.lastrowid
+                    inserted += 1
+                
+                lunches = place['lunches']
+                if lunches:
+                    await db.executemany('''
+                    DELETE FROM business_lunches WHERE place_id = ? AND weekday = ?
+                    ''', [(place_id, weekday) for weekday in {lunch['weekday'] for lunch in lunches}])
+                    await db.executemany('''
+                    INSERT INTO business_lunches (place_id, price, start_time, end_time, description, weekday,
+                                                  city, start_minute, end_minute)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                    ''', [(place_id, lunch['price'], lunch['start_time'], lunch['end_time'],
+                           lunch['description'], lunch['weekday'], place['city'],
+                           parse_time_to_minutes(lunch['start_time']), parse_time_to_minutes(lunch['end_time']))
+                          for lunch in lunches])
+                
+                menu_items = place['menu_items']
+                if menu_items:
+                    await db.executemany('''
+                    DELETE FROM menu_items WHERE place_id = ? AND category = ?
+                    ''', [(place_id, category) for category in {item['category'] for item in menu_items}])
+                    await db.executemany('''
+                    INSERT INTO menu_items (place_id, name, price, category, description,
+                                            normalized_name, normalized_category, city)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                    ''', [(place_id, item['name'], item['price'], item['category'], item['description'],
+                           normalize_search_text(item['name']), normalize_search_text(item['category']),
+                           place['city'])
+                          for item in menu_items])
+                
+                await db.executemany('''
+                INSERT OR IGNORE INTO place_tags (place_id, tag) VALUES (?, ?)
+                ''', [(place_id, tag)
+                      for tag in detect_tags(place['category'], *(item['category'] for item in menu_items))])
+            
+            await db.executemany('''
+            INSERT OR IGNORE INTO cities (name) VALUES (?)
+            ''', [(city,) for city in {place['city'] for place in places}])
+            
+            await bump_content_version(db)
+            await db.commit()
+        data_version.bump()
+        return inserted, updated
+    
+    async def get_places_for_geocoding(self, include_located: bool = False) -> List[Tuple[int, str, str]]:
+        """
+        Получает заведения для геокодирования
+        
+        Args:
+            include_located: Включать заведения, у которых координаты уже есть
+        
+        Returns:
+            Список (ID заведения, город, адрес)
+        """
+        condition = "" if include_located else "WHERE latitude IS NULL OR longitude IS NULL"
+        async with aiosqlite.connect(self.db_name) as db:
+            cursor = await db.execute(f'''
+            SELECT id, city, address FROM places {condition} ORDER BY id
+            ''')
+            return [tuple(row) for row in await cursor.fetchall()]
+    
+    async def get_geocode_cache(self, address_keys: List[str]) -> Dict[str, Optional[Tuple[float, float]]]:
+        """
+        Получает закэшированные координаты для нормализованных адресов
+        
+        Returns:
+            Словарь ключ адреса -> (широта, долгота) или None, если адрес не был найден.
+            Адресов, которых нет в кэше, в словаре нет.
+        """
+        result: Dict[str, Optional[Tuple[float, float]]] = {}
+        keys = list(dict.fromkeys(address_keys))
+        async with aiosqlite.connect(self.db_name) as db:
+            # Порциями, чтобы не упереться в лимит параметров SQLite
+            for i in range(0, len(keys), 500):
+                chunk = keys[i:i + 500]
+                placeholders = ', '.join('?' for _ in chunk)
+                cursor = await db.execute(f'''
+                SELECT address_key, latitude, longitude FROM geocode_cache
+                WHERE address_key IN ({placeholders})
+                ''', chunk)
+                for key, latitude, longitude in await cursor.fetchall():
+                    result[key] = (latitude, longitude) if latitude is not None else None
+        return result
+    
+    async def save_geocode_cache(self, entries: List[Tuple[str, Optional[float], Optional[float], str]]):
+        """
+        Сохраняет результаты геокодирования в кэш
+        
+        Args:
+            entries: Список (ключ адреса, широта, долгота, источник); координаты None - адрес не найден
+        """
+        if not entries:
+            return
+        
+        async with aiosqlite.connect(self.db_name) as db:
+            await db.executemany('''
+            INSERT OR REPLACE INTO geocode_cache (address_key, latitude, longitude, source, updated_at)
+            VALUES (?, ?, ?, ?, CURRENT_TIMESTAMP)
+            ''', entries)
+            
+            await db.commit()
+    
+    async def set_user_location(self, user_id: int, latitude: float, longitude: float):
+        """Сохраняет последнюю геопозицию пользователя"""
+        async with aiosqlite.connect(self.db_name) as db:
+            await db.execute('''
+            UPDATE users SET latitude = ?, longitude = ?, location_updated_at = CURRENT_TIMESTAMP
+            WHERE user_id = ?
+            ''', (latitude, longitude, user_id))
+            
+            await db.commit()
+    
+    async def get_user_location(self, user_id: int) -> Optional[Tuple[float, float]]:
+        """Получает последнюю геопозицию пользователя"""
+        async with aiosqlite.connect(self.db_name) as db:
+            cursor = await db.execute('''
+            SELECT latitude, longitude FROM users
+            WHERE user_id = ? AND latitude IS NOT NULL AND longitude IS NOT NULL
+            ''', (user_id,))
+            
+            row = await cursor.fetchone()
+            return (row[0], row[1]) if row else None
+    
+    async def get_business_lunches_by_place_ids(self, place_ids: List[int], weekday: int) -> Dict[int, Dict[str, Any]]:
+        """
+        Получает заведения и их бизнес-ланчи на день недели одним запросом
+        
+        Ланч на конкретный день важнее ланча "каждый день".
+        
+        Args:
+            place_ids: ID заведений
+            weekday: День недели (1-7)
+        
+        Returns:
+            Словарь ID заведения -> данные заведения и ланча
+        """
+        if not place_ids:
+            return {}
+        
+        placeholders = ', '.join('?' for _ in place_ids)
+        async with aiosqlite.connect(self.db_name) as db:
+            db.row_factory = aiosqlite.Row
+            cursor = await db.execute(f'''
+            SELECT p.id, p.name, p.address, p.city, p.photo_id, p.admin_comment,
+                   p.latitude, p.longitude,
+                   bl.price, bl.start_time, bl.end_time, bl.description, bl.weekday,
+                   bl.start_minute, bl.end_minute
+            FROM places p
+            JOIN business_lunches bl ON p.id = bl.place_id
+            WHERE p.id IN ({placeholders}) AND bl.weekday IN (?, 0)
+            ORDER BY bl.weekday
+            ''', (*place_ids, weekday))
+            
+            result: Dict[int, Dict[str, Any]] = {}
+            for row in await cursor.fetchall():
+                # Строки с weekday = 0 идут первыми и перезаписываются ланчем на конкретный день
+                result[row['id']] = dict(row)
+            return result
+    
+    async def add_place_tags(self, place_id: int, tags: List[str]):
+        """Добавляет теги заведению"""
+        async with aiosqlite.connect(self.db_name) as db:
+            await db.executemany('''
+            INSERT INTO place_tags (place_id, tag, suppressed) VALUES (?, ?, 0)
+            ON CONFLICT(place_id, tag) DO UPDATE SET suppressed = 0
+            ''', [(place_id, tag) for tag in tags])
+            
+            await bump_content_version(db)
+            await db.commit()
+        data_version.bump()
+    
+    async def remove_place_tags(self, place_id: int, tags: List[str]):
+        """Снимает теги заведения; снятый тег не ставится повторно автоматически"""
+        async with aiosqlite.connect(self.db_name) as db:
+            await db.executemany('''
+            INSERT INTO place_tags (place_id, tag, suppressed) VALUES (?, ?, 1)
+            ON CONFLICT(place_id, tag) DO UPDATE SET suppressed = 1
+            ''', [(place_id, tag) for tag in tags])
+            
+            await bump_content_version(db)
+            await db.commit()
+        data_version.bump()
+    
+    async def get_place_tags(self, place_id: int) -> List[str]:
+        """Получает теги заведения"""
+        async with aiosqlite.connect(self.db_name) as db:
+            cursor = await db.execute('''
+            SELECT tag FROM place_tags WHERE place_id = ? AND suppressed = 0 ORDER BY tag
+            ''', (place_id,))
+            
+            rows = await cursor.fetchall()
+            return [row[0] for row in rows]
+    
+    async def iter_places_for_export(self, city: Optional[str] = None,
+                                     chunk_size: int = 500) -> AsyncIterator[List[Dict[str, Any]]]:
+        """
+        Читает заведения со всеми данными пачками по chunk_size для выгрузки
+        
+        Заведения перебираются по курсору ID, ланчи, меню, отзывы и теги читаются
+        отдельным запросом на пачку. Каждая пачка - короткое чтение, поэтому
+        выгрузка большой базы не держит блокировку и занимает постоянную память.
+        
+        Args:
+            city: Выгрузить только этот город (по умолчанию - все)
+            chunk_size: Сколько заведений читать за раз
+        
+        Yields:
+            Списки заведений; у каждого есть lunches, menu_items, reviews и tags
+        """
+        city_filter, city_params = ('AND city = ?', (city,)) if city else ('', ())
+        last_id = 0
+        async with aiosqlite.connect(self.db_name) as db:
+            db.row_factory = aiosqlite.Row
+            while True:
+                cursor = await db.execute(f'''
+                SELECT id, name, address, category, city, admin_comment, latitude, longitude, created_at
+                FROM places
+                WHERE id > ? {city_filter}
+                ORDER BY id
+                LIMIT ?
+                ''', (last_id, *city_params, chunk_size))
+                places = {row['id']: dict(row, lunches=[], menu_items=[], reviews=[], tags=[])
+                          for row in await cursor.fetchall()}
+                if not places:
+                    return
+                last_id = max(places)
+                
+                ids = tuple(places)
+                placeholders = ','.join('?' * len(ids))
+                for key, query in (
+                    ('lunches', f'''
+                    SELECT place_id, weekday, price, start_time, end_time, description
+                    FROM business_lunches WHERE place_id IN ({placeholders}) ORDER BY place_id, weekday, id
+                    '''),
+                    ('menu_items', f'''
+                    SELECT place_id, name, price, category, description
+                    FROM menu_items WHERE place_id IN ({placeholders}) ORDER BY place_id, category, id
+                    '''),
+                    ('reviews', f'''
+                    SELECT place_id, user_id, rating, comment, created_at
+                    FROM reviews WHERE place_id IN ({placeholders}) ORDER BY place_id, id
+                    '''),
+                    ('tags', f'''
+                    SELECT place_id, tag FROM place_tags
+                    WHERE place_id IN ({placeholders}) AND suppressed = 0 ORDER BY place_id, tag
+                    '''),
+                ):
+                    cursor = await db.execute(query, ids)
+                    for row in await cursor.fetchall():
+                        place_rows = places[row['place_id']][key]
+                        place_rows.append(row['tag'] if key == 'tags' else
+                                          {name: row[name] for name in row.keys() if name != 'place_id'})
+                
+                yield list(places.values())
+                if len(places) < chunk_size:
+                    return
+    
+    async def backup(self, target_path: str, pages: int = 256, sleep: float = 0.01,
+                     max_restarts: int = 3) -> int:
+        """
+        Делает копию базы на ходу через backup API SQLite
+        
+        Копирование идет шагами по pages страниц с паузой sleep между шагами,
+        поэтому чтение и запись в базу во время копирования не останавливаются.
+        Запись из другого соединения начинает копирование заново; если это
+        случилось больше max_restarts раз, оставшаяся копия делается одним шагом
+        (одно чтение; в режиме WAL запись при этом тоже не ждет).
+        Копия пишется во временный файл и переименовывается, когда готова.
+        
+        Args:
+            target_path: Файл копии
+            pages: Сколько страниц копировать за шаг
+            sleep: Пауза между шагами в секундах
+            max_restarts: Сколько перезапусков копирования допустимо до копии одним шагом
+        
+        Returns:
+            Размер копии в байтах
+        """
+        partial_path = f"{target_path}.part"
+        if os.path.exists(partial_path):
+            os.remove(partial_path)
+        
+        remaining = [None, 0]  # осталось страниц на прошлом шаге, число перезапусков
+        
+        def watch_restarts(status: int, left: int, total: int):
+            if remaining[0] is not None and left > remaining[0]:
+                remaining[1] += 1
+                if remaining[1] > max_restarts:
+                    raise _BackupRestarted()
+            remaining[0] = left
+        
+        async with aiosqlite.connect(self.db_name) as db:
+            async with aiosqlite.connect(partial_path) as target:
+                try:
+                    await db.backup(target, pages=pages, sleep=sleep, progress=watch_restarts)
+                except _BackupRestarted:
+                    await db.backup(target, pages=-1)
+        os.replace(partial_path, target_path)
+        return os.path.getsize(target_path)
+    
+    async def get_tag_index_snapshot(self) -> Tuple[List[Tuple[int, str]], List[Tuple[int, str]], List[Tuple[int, int, float]]]:
+        """
+        Получает данные для построения индекса тегов в памяти
+        
+        Returns:
+            Кортеж (заведения по городам и названиям, теги заведений, бизнес-ланчи)
+        """
+        async with aiosqlite.connect(self.db_name) as db:
+            cursor = await db.execute('''
+            SELECT id, city FROM places ORDER BY city, name, id
+            ''')
+            places = [tuple(row) for row in await cursor.fetchall()]
+            
+            cursor = await db.execute('SELECT place_id, tag FROM place_tags WHERE suppressed = 0')
+            tags = [tuple(row) for row in await cursor.fetchall()]
+            
+            cursor = await db.execute('SELECT place_id, weekday, price FROM business_lunches')
+            lunches = [tuple(row) for row in await cursor.fetchall()]
+            
+            return places, tags, lunches
+    
     def _get_weekday_name(self, weekday: int) -> str:
         """Возвращает название дня недели по его номеру"""
         weekdays = {
@@ -0,0 +1,149 @@
+import json
+import time
+import zlib
+from collections import OrderedDict
+from typing import Any, Dict, Mapping, Optional, Tuple
+
+import aiosqlite
+from aiogram.fsm.state import State
+from aiogram.fsm.storage.base import BaseStorage, DefaultKeyBuilder, StateType, StorageKey
+
+# Брошенные сценарии (например, /add_lunch без последнего шага) удаляются через сутки
+FSM_TTL = 24 * 60 * 60
+# Данные больше этого размера сжимаются
+COMPRESS_THRESHOLD = 512
+# Как часто (в записях) удалять из файла устаревшие состояния
+PURGE_EVERY = 1000
+
+
+def _pack(data: Mapping[str, Any]) -> Optional[bytes]:
+    """Компактная сериализация данных состояния: JSON без пробелов, большой - со сжатием"""
+    if not data:
+        return None
+    raw = json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode()
+    if len(raw) > COMPRESS_THRESHOLD:
+        return b"z" + zlib.compress(raw)
+    return b"j" + raw
+
+
+def _unpack(blob: Optional[bytes]) -> Dict[str, Any]:
+    if not blob:
+        return {}
+    raw = zlib.decompress(blob[1:]) if blob[:1] == b"z" else blob[1:]
+    return json.loads(raw)
+
+
+class SQLiteStorage(BaseStorage):
+    """
+    Хранилище состояний FSM в SQLite с кэшем в памяти
+
+    Состояния и данные сценариев (/add_lunch, /add_menu, отзывы) переживают
+    перезапуск бота. Чтение идет из LRU-кэша в памяти, в файл обращаемся только
+    при первом чтении ключа; запись сразу уходит и в кэш, и в файл. Сценарии,
+    которые не трогали дольше ttl секунд, считаются брошенными и удаляются.
+    """
+
+    def __init__(self, db_name: str = "fsm.db", ttl: float = FSM_TTL, maxsize: int = 10000):
+        self.db_name = db_name
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._key_builder = DefaultKeyBuilder(with_bot_id=True, with_destiny=True)
+        # ключ -> (состояние, данные, время последней записи)
+        self._cache: "OrderedDict[str, Tuple[Optional[str], Dict[str, Any], float]]" = OrderedDict()
+        self._db: Optional[aiosqlite.Connection] = None
+        self._writes = 0
+
+    async def _connection(self) -> aiosqlite.Connection:
+        if self._db is None:
+            self._db = await aiosqlite.connect(self.db_name)
+            await self._db.execute("PRAGMA journal_mode=WAL")
+            await self._db.execute('''
+            CREATE TABLE IF NOT EXISTS fsm_states (
+                key TEXT PRIMARY KEY,
+                state TEXT,
+                data BLOB,
+                updated_at REAL NOT NULL
+            )
+            ''')
+            await self._db.execute('CREATE INDEX IF NOT EXISTS idx_fsm_states_updated ON fsm_states (updated_at)')
+            await self._db.commit()
+            await self.purge_expired()
+        return self._db
+
+    def _expired(self, updated_at: float) -> bool:
+        return self.ttl > 0 and updated_at < time.time() - self.ttl
+
+    def _remember(self, key: str, entry: Tuple[Optional[str], Dict[str, Any], float]):
+        self._cache[key] = entry
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.maxsize:
+            self._cache.popitem(last=False)
+
+    async def _load(self, key: str) -> Tuple[Optional[str], Dict[str, Any], float]:
+        entry = self._cache.get(key)
+        if entry is None:
+            db = await self._connection()
+            async with db.execute('SELECT state, data, updated_at FROM fsm_states WHERE key = ?', (key,)) as cursor:
+                row = await cursor.fetchone()
+            entry = (row[0], _unpack(row[1]), row[2]) if row else (None, {}, time.time())
+            self._remember(key, entry)
+        else:
+            self._cache.move_to_end(key)
+
+        if entry[0] is not None or entry[1]:
+            if self._expired(entry[2]):
+                entry = (None, {}, time.time())
+                await self._save(key, entry)
+        return entry
+
+    async def _save(self, key: str, entry: Tuple[Optional[str], Dict[str, Any], float]):
+        self._remember(key, entry)
+        db = await self._connection()
+        state, data, updated_at = entry
+        if state is None and not data:
+            await db.execute('DELETE FROM fsm_states WHERE key = ?', (key,))
+        else:
+            await db.execute('''
+            INSERT INTO fsm_states (key, state, data, updated_at) VALUES (?, ?, ?, ?)
+            ON CONFLICT(key) DO UPDATE SET state = excluded.state, data = excluded.data,
+                updated_at = excluded.updated_at
+            ''', (key, state, _pack(data), updated_at))
+        await db.commit()
+
+        self._writes += 1
+        if self._writes % PURGE_EVERY == 0:
+            await self.purge_expired()
+
+    async def purge_expired(self) -> int:
+        """Удаляет из файла брошенные сценарии, возвращает их количество"""
+        if self.ttl <= 0:
+            return 0
+        db = await self._connection()
+        cursor = await db.execute('DELETE FROM fsm_states WHERE updated_at < ?', (time.time() - self.ttl,))
+        await db.commit()
+        return cursor.rowcount
+
+    async def set_state(self, key: StorageKey, state: StateType = None) -> None:
+        storage_key = self._key_builder.build(key)
+        _, data, _ = await self._load(storage_key)
+        value = state.state if isinstance(state, State) else state
+        await self._save(storage_key, (value, data, time.time()))
+
+    async def get_state(self, key: StorageKey) -> Optional[str]:
+        state, _, _ = await self._load(self._key_builder.build(key))
+        return state
+
+    async def set_data(self, key: StorageKey, data: Mapping[str, Any]) -> None:
+        storage_key = self._key_builder.build(key)
+        state, _, _ = await self._load(storage_key)
+        await self._save(storage_key, (state, dict(data), time.time()))
+
+    async def get_data(self, key: StorageKey) -> Dict[str, Any]:
+        _, data, _ = await self._load(self._key_builder.build(key))
+        return data.copy()
+
+    async def close(self) -> None:
+        if self._db is not None:
+            await self._db.close()
+            self._db = None
+        self._cache.clear()
@@ -0,0 +1,16 @@
+import re
+
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+def normalize_search_text(text: str) -> str:
+    """
+    Приводит текст к виду, используемому в поисковых колонках
+
+    SQLite умеет приводить к нижнему регистру только ASCII, поэтому кириллица
+    нормализуется на стороне Python при записи и при поиске.
+    """
+    if not text:
+        return ""
+    text = text.lower().replace("ё", "е")
+    return _WHITESPACE_RE.sub(" ", text).strip()
@@ -0,0 +1,221 @@
+import asyncio
+import heapq
+from math import cos, floor, radians
+from typing import Callable, Collection, Dict, List, Optional, Tuple, TYPE_CHECKING
+
+from loguru import logger
+
+from app.database.tags import OFFLOAD_MIN_PLACES
+from app.database.version import data_version
+from app.utils.geo import EARTH_RADIUS_KM, haversine_km
+from app.utils.jobs import job_executor
+
+try:
+    import numpy as np
+except ImportError:  # без NumPy расстояния считаются поэлементно
+    np = None
+
+if TYPE_CHECKING:
+    from app.database.database import Database
+
+# Размер ячейки сетки в градусах (около 1.1 км по широте)
+CELL_DEG = 0.01
+KM_PER_DEG = 111.32
+
+
+class CityGrid:
+    """Равномерная сетка по широте и долготе с координатами заведений одного города"""
+
+    def __init__(self, cell_deg: float = CELL_DEG):
+        self.cell_deg = cell_deg
+        self.cells: Dict[Tuple[int, int], List[Tuple[int, float, float]]] = {}
+        self.min_cell: Optional[Tuple[int, int]] = None
+        self.max_cell: Optional[Tuple[int, int]] = None
+
+    def _cell(self, lat: float, lon: float) -> Tuple[int, int]:
+        return floor(lat / self.cell_deg), floor(lon / self.cell_deg)
+
+    def add(self, place_id: int, lat: float, lon: float):
+        cell = self._cell(lat, lon)
+        self.cells.setdefault(cell, []).append((place_id, lat, lon))
+        if self.min_cell is None:
+            self.min_cell = self.max_cell = cell
+        else:
+            self.min_cell = (min(self.min_cell[0], cell[0]), min(self.min_cell[1], cell[1]))
+            self.max_cell = (max(self.max_cell[0], cell[0]), max(self.max_cell[1], cell[1]))
+
+    def _ring(self, center: Tuple[int, int], radius: int):
+        """Перебирает ячейки на границе квадрата с заданным радиусом"""
+        ci, cj = center
+        if radius == 0:
+            yield center
+            return
+        for j in range(cj - radius, cj + radius + 1):
+            yield ci - radius, j
+            yield ci + radius, j
+        for i in range(ci - radius + 1, ci + radius):
+            yield i, cj - radius
+            yield i, cj + radius
+
+    def nearest(self, lat: float, lon: float, k: int,
+                allowed: Optional[Callable[[int], bool]] = None) -> List[Tuple[float, int]]:
+        """
+        Находит k ближайших заведений
+
+        Ячейки просматриваются кольцами от ячейки пользователя; поиск останавливается,
+        когда следующее кольцо гарантированно дальше k-го найденного заведения.
+
+        Returns:
+            Список пар (расстояние в км, ID заведения), отсортированный по расстоянию
+        """
+        if self.min_cell is None or k <= 0:
+            return []
+        center = self._cell(lat, lon)
+        # Минимальная ширина ячейки в километрах (по долготе она сужается к полюсам)
+        cell_km = self.cell_deg * KM_PER_DEG * max(cos(radians(abs(lat) + self.cell_deg)), 0.01)
+        max_radius = max(
+            abs(center[0] - self.min_cell[0]), abs(center[0] - self.max_cell[0]),
+            abs(center[1] - self.min_cell[1]), abs(center[1] - self.max_cell[1])
+        )
+
+        best: List[Tuple[float, int]] = []  # куча с обратным знаком расстояния
+        for radius in range(max_radius + 1):
+            if len(best) == k and radius > 0 and (radius - 1) * cell_km > -best[0][0]:
+                break
+            for cell in self._ring(center, radius):
+                for place_id, place_lat, place_lon in self.cells.get(cell, ()):
+                    if allowed is not None and not allowed(place_id):
+                        continue
+                    distance = haversine_km(lat, lon, place_lat, place_lon)
+                    if len(best) < k:
+                        heapq.heappush(best, (-distance, place_id))
+                    elif distance < -best[0][0]:
+                        heapq.heapreplace(best, (-distance, place_id))
+        return sorted((-distance, place_id) for distance, place_id in best)
+
+
+class CityPoints:
+    """
+    Координаты заведений одного города в виде массивов для расчета всех расстояний сразу
+
+    С NumPy формула гаверсинуса считается векторно по всему городу, без него -
+    в цикле по тем же данным.
+    """
+
+    def __init__(self, points: List[Tuple[int, float, float]]):
+        self.place_ids = [place_id for place_id, _, _ in points]
+        lats = [lat for _, lat, _ in points]
+        lons = [lon for _, _, lon in points]
+        if np is not None:
+            # Для векторного расчета координаты хранятся сразу в радианах
+            self.ids = np.array(self.place_ids, dtype=np.int64)
+            self.lats = np.radians(np.array(lats, dtype=np.float64))
+            self.lons = np.radians(np.array(lons, dtype=np.float64))
+            self.cos_lats = np.cos(self.lats)
+        else:
+            self.lats, self.lons = lats, lons
+
+    def distance_order(self, lat: float, lon: float,
+                       allowed: Optional[Collection[int]] = None) -> List[Tuple[float, int]]:
+        """
+        Сортирует заведения города по расстоянию до точки
+
+        Args:
+            allowed: Учитывать только эти ID заведений
+
+        Returns:
+            Список пар (расстояние в км, ID заведения) по возрастанию расстояния
+        """
+        if not self.place_ids:
+            return []
+        if np is None:
+            return sorted(
+                (haversine_km(lat, lon, place_lat, place_lon), place_id)
+                for place_id, place_lat, place_lon in zip(self.place_ids, self.lats, self.lons)
+                if allowed is None or place_id in allowed
+            )
+
+        lat, lon = radians(lat), radians(lon)
+        a = (np.sin((self.lats - lat) / 2) ** 2
+             + cos(lat) * self.cos_lats * np.sin((self.lons - lon) / 2) ** 2)
+        distances = 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+        ids = self.ids
+        if allowed is not None:
+            mask = np.isin(ids, np.fromiter(allowed, dtype=np.int64, count=len(allowed)))
+            ids, distances = ids[mask], distances[mask]
+        order = np.lexsort((ids, distances))
+        return list(zip(distances[order].tolist(), ids[order].tolist()))
+
+
+def build_spatial_index(coordinates: List[Tuple[int, str, float, float]]
+                        ) -> Tuple[Dict[str, CityGrid], Dict[str, CityPoints]]:
+    """
+    Собирает сетки и массивы координат по городам
+
+    Args:
+        coordinates: Четверки (ID заведения, город, широта, долгота)
+    """
+    cities: Dict[str, CityGrid] = {}
+    points: Dict[str, List[Tuple[int, float, float]]] = {}
+    for place_id, city, lat, lon in coordinates:
+        cities.setdefault(city, CityGrid()).add(place_id, lat, lon)
+        points.setdefault(city, []).append((place_id, lat, lon))
+    return cities, {city: CityPoints(city_points) for city, city_points in points.items()}
+
+
+async def build_spatial_index_offloaded(coordinates: List[Tuple[int, str, float, float]]
+                                        ) -> Tuple[Dict[str, CityGrid], Dict[str, CityPoints]]:
+    """Собирает индекс в пуле процессов, небольшие города - сразу в event loop"""
+    if len(coordinates) >= OFFLOAD_MIN_PLACES:
+        try:
+            return await job_executor.run("build_spatial_index", coordinates)
+        except Exception as e:
+            logger.warning(f"Пространственный индекс собирается в event loop: пул задач недоступен ({e!r})")
+    return build_spatial_index(coordinates)
+
+
+class SpatialIndex:
+    """
+    Пространственный индекс заведений в памяти, разбитый по городам
+
+    Перестраивается из базы при изменении версии данных, как и индекс тегов.
+    """
+
+    def __init__(self):
+        self._cities: Dict[str, CityGrid] = {}
+        self._points: Dict[str, CityPoints] = {}
+        self._version = -1
+        self._lock = asyncio.Lock()
+
+    async def refresh(self, db: "Database"):
+        """Перестраивает индекс, если данные изменились с момента последней сборки"""
+        if self._version == data_version.value:
+            return
+        async with self._lock:
+            version = data_version.value
+            if self._version == version:
+                return
+            coordinates = await db.get_place_coordinates()
+            self._cities, self._points = await build_spatial_index_offloaded(coordinates)
+            self._version = version
+
+    async def nearest(self, db: "Database", city: str, lat: float, lon: float, k: int = 5,
+                      allowed: Optional[Callable[[int], bool]] = None) -> List[Tuple[float, int]]:
+        """Находит k ближайших заведений города к точке (lat, lon)"""
+        await self.refresh(db)
+        grid = self._cities.get(city)
+        if grid is None:
+            return []
+        return grid.nearest(lat, lon, k, allowed)
+
+    async def distance_order(self, db: "Database", city: str, lat: float, lon: float,
+                             allowed: Optional[Collection[int]] = None) -> List[Tuple[float, int]]:
+        """Сортирует заведения города с известными координатами по расстоянию до точки"""
+        await self.refresh(db)
+        points = self._points.get(city)
+        if points is None:
+            return []
+        return points.distance_order(lat, lon, allowed)
+
+
+spatial_index = SpatialIndex()
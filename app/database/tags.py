@@ -0,0 +1,220 @@
+import asyncio
+from bisect import bisect_right
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple, TYPE_CHECKING
+
+from loguru import logger
+
+from app.database.search import normalize_search_text
+from app.database.version import data_version
+from app.utils.jobs import job_executor
+
+if TYPE_CHECKING:
+    from app.database.database import Database
+
+# Известные теги заведений и их подписи для пользователя
+KNOWN_TAGS: Dict[str, str] = {
+    "hookah": "💨 Кальяны",
+    "veg": "🥗 Вегетарианское меню",
+    "terrace": "☀️ Летняя веранда",
+    "delivery": "🚚 Доставка",
+}
+
+# Начиная с этого числа заведений индекс собирается в пуле процессов, а не в event loop
+OFFLOAD_MIN_PLACES = 2000
+
+# Ключевые слова в категориях заведений и позиций меню, по которым теги ставятся автоматически
+AUTO_TAG_KEYWORDS: Dict[str, Tuple[str, ...]] = {
+    "hookah": ("кальян",),
+    "veg": ("вегетариан", "веган"),
+}
+
+
+def detect_tags(*texts: Optional[str]) -> Set[str]:
+    """Определяет теги по категориям заведения или позиции меню"""
+    normalized = [normalize_search_text(text) for text in texts if text]
+    return {
+        tag for tag, keywords in AUTO_TAG_KEYWORDS.items()
+        if any(keyword in text for keyword in keywords for text in normalized)
+    }
+
+
+def iter_bits(bitmap: int) -> Iterable[int]:
+    """Перебирает номера установленных битов по возрастанию"""
+    while bitmap:
+        lowest = bitmap & -bitmap
+        yield lowest.bit_length() - 1
+        bitmap ^= lowest
+
+
+class CityFacets:
+    """
+    Битовые карты фасетов для заведений одного города
+
+    Бит i соответствует i-му заведению города в алфавитном порядке, поэтому
+    перебор установленных битов сразу дает заведения, отсортированные по названию.
+    """
+
+    def __init__(self, place_ids: List[int]):
+        self.place_ids = place_ids
+        self.positions = {place_id: i for i, place_id in enumerate(place_ids)}
+        self.tags: Dict[str, int] = {}
+        # День недели (1-7) -> битовая карта заведений с ланчем в этот день
+        self.lunch_days: Dict[int, int] = {}
+        # День недели (1-7) -> отсортированные пары (цена ланча, номер бита)
+        self.lunch_prices: Dict[int, List[Tuple[float, int]]] = {}
+        self._price_cache: Dict[Tuple[int, float], int] = {}
+
+    def lunch_under(self, weekday: int, max_price: float) -> int:
+        """Битовая карта заведений с ланчем в указанный день не дороже max_price"""
+        key = (weekday, max_price)
+        bitmap = self._price_cache.get(key)
+        if bitmap is None:
+            prices = self.lunch_prices.get(weekday, [])
+            bitmap = 0
+            for _, bit in prices[:bisect_right(prices, (max_price, len(self.place_ids)))]:
+                bitmap |= 1 << bit
+            self._price_cache[key] = bitmap
+        return bitmap
+
+
+class TagIndex:
+    """
+    Индекс тегов и фасетов заведений в памяти
+
+    Перестраивается целиком из базы при изменении версии данных. Фильтры вида
+    "кальяны + бизнес-ланч сегодня + до 400₽" считаются пересечением битовых карт.
+    """
+
+    def __init__(self):
+        self._cities: Dict[str, CityFacets] = {}
+        self._version = -1
+        self._lock = asyncio.Lock()
+
+    async def refresh(self, db: "Database"):
+        """Перестраивает индекс, если данные изменились с момента последней сборки"""
+        if self._version == data_version.value:
+            return
+        async with self._lock:
+            version = data_version.value
+            if self._version == version:
+                return
+            places, tags, lunches = await db.get_tag_index_snapshot()
+            self._cities = await build_city_facets_offloaded(places, tags, lunches)
+            self._version = version
+
+    def query(self, city: str, tags: Sequence[str] = (), weekday: Optional[int] = None,
+              max_price: Optional[float] = None) -> int:
+        """
+        Возвращает битовую карту заведений города, подходящих под все фильтры
+
+        Args:
+            city: Город
+            tags: Теги, которые должны быть у заведения
+            weekday: День недели (1-7), в который у заведения должен быть бизнес-ланч
+            max_price: Максимальная цена бизнес-ланча (только вместе с weekday)
+        """
+        facets = self._cities.get(city)
+        if facets is None:
+            return 0
+        bitmap = (1 << len(facets.place_ids)) - 1
+        for tag in tags:
+            bitmap &= facets.tags.get(tag, 0)
+        if weekday is not None:
+            if max_price is not None:
+                bitmap &= facets.lunch_under(weekday, max_price)
+            else:
+                bitmap &= facets.lunch_days.get(weekday, 0)
+        return bitmap
+
+    def page(self, city: str, bitmap: int, offset: int = 0, limit: Optional[int] = None) -> List[int]:
+        """Возвращает ID заведений из битовой карты с учетом смещения и лимита"""
+        facets = self._cities.get(city)
+        if facets is None:
+            return []
+        result = []
+        for i, bit in enumerate(iter_bits(bitmap)):
+            if i < offset:
+                continue
+            if limit is not None and len(result) >= limit:
+                break
+            result.append(facets.place_ids[bit])
+        return result
+
+    async def find_places(self, db: "Database", city: str, tags: Sequence[str] = (),
+                          weekday: Optional[int] = None, max_price: Optional[float] = None,
+                          offset: int = 0, limit: Optional[int] = None) -> Tuple[List[int], int]:
+        """
+        Находит заведения города по фасетам
+
+        Returns:
+            Кортеж (ID заведений на странице, общее количество подходящих заведений)
+        """
+        await self.refresh(db)
+        bitmap = self.query(city, tags, weekday, max_price)
+        return self.page(city, bitmap, offset, limit), bitmap.bit_count()
+
+
+def build_city_facets(places: List[Tuple[int, str]], tags: List[Tuple[int, str]],
+                      lunches: List[Tuple[int, int, float]]) -> Dict[str, CityFacets]:
+    """
+    Собирает битовые карты по городам
+
+    Args:
+        places: Пары (ID заведения, город), отсортированные по городу и названию
+        tags: Пары (ID заведения, тег)
+        lunches: Тройки (ID заведения, день недели, цена)
+    """
+    ids_by_city: Dict[str, List[int]] = {}
+    city_by_place: Dict[int, str] = {}
+    for place_id, city in places:
+        ids_by_city.setdefault(city, []).append(place_id)
+        city_by_place[place_id] = city
+    cities = {city: CityFacets(place_ids) for city, place_ids in ids_by_city.items()}
+
+    for place_id, tag in tags:
+        city = city_by_place.get(place_id)
+        if city is None:
+            continue
+        facets = cities[city]
+        facets.tags[tag] = facets.tags.get(tag, 0) | (1 << facets.positions[place_id])
+
+    # Цена ланча на конкретный день важнее цены ланча "каждый день"
+    daily: Dict[int, float] = {}
+    specific: Dict[Tuple[int, int], float] = {}
+    for place_id, weekday, price in lunches:
+        if place_id not in city_by_place:
+            continue
+        if weekday == 0:
+            daily[place_id] = min(price, daily.get(place_id, price))
+        else:
+            key = (place_id, weekday)
+            specific[key] = min(price, specific.get(key, price))
+
+    for weekday in range(1, 8):
+        for place_id, city in city_by_place.items():
+            price = specific.get((place_id, weekday), daily.get(place_id))
+            if price is None:
+                continue
+            facets = cities[city]
+            bit = facets.positions[place_id]
+            facets.lunch_days[weekday] = facets.lunch_days.get(weekday, 0) | (1 << bit)
+            facets.lunch_prices.setdefault(weekday, []).append((price, bit))
+
+    for facets in cities.values():
+        for prices in facets.lunch_prices.values():
+            prices.sort()
+    return cities
+
+
+tag_index = TagIndex()
+
+
+async def build_city_facets_offloaded(places: List[Tuple[int, str]], tags: List[Tuple[int, str]],
+                                      lunches: List[Tuple[int, int, float]]) -> Dict[str, CityFacets]:
+    """Собирает битовые карты в пуле процессов, небольшие города - сразу в event loop"""
+    if len(places) >= OFFLOAD_MIN_PLACES:
+        try:
+            return await job_executor.run("build_tag_index", places, tags, lunches)
+        except Exception as e:
+            logger.warning(f"Индекс тегов собирается в event loop: пул задач недоступен ({e!r})")
+    return build_city_facets(places, tags, lunches)
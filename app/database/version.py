@@ -0,0 +1,70 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Optional
+
+import aiosqlite
+from loguru import logger
+
+
+class DataVersion:
+    """
+    Счётчик версии данных о заведениях
+
+    Увеличивается при каждом изменении заведений, ланчей, меню, отзывов и тегов.
+    Кэши и индексы в памяти сравнивают сохранённую версию с текущей, чтобы
+    понять, что их нужно перестроить.
+    """
+
+    def __init__(self):
+        self._value = 0
+
+    @property
+    def value(self) -> int:
+        return self._value
+
+    def bump(self) -> int:
+        """Отмечает изменение данных и возвращает новую версию"""
+        self._value += 1
+        return self._value
+
+
+data_version = DataVersion()
+
+
+async def bump_content_version(db: aiosqlite.Connection):
+    """
+    Отмечает в базе изменение данных о заведениях для других процессов
+
+    Выполняется в той же транзакции, что и само изменение, до commit.
+    """
+    await db.execute("UPDATE content_version SET value = value + 1 WHERE id = 1")
+
+
+async def watch_data_version(db_name: str, interval: float = 1.0,
+                             on_change: Optional[Callable[[], Awaitable[Any]]] = None):
+    """
+    Следит за изменениями данных о заведениях из других процессов и увеличивает версию данных
+
+    Опрашивает счетчик content_version, который увеличивают только изменения
+    заведений, ланчей, меню, отзывов, тегов и часовых поясов городов. Запись
+    пользователей, геопозиций и кэша геокодирования кэши не сбрасывает.
+    Нужен в режиме нескольких процессов: изменение в одном воркере сбрасывает
+    кэши и индексы в памяти остальных.
+
+    Args:
+        on_change: Что еще сделать при изменении (например, перечитать часовые пояса городов)
+    """
+    async with aiosqlite.connect(db_name) as db:
+        last = None
+        while True:
+            async with db.execute("SELECT value FROM content_version WHERE id = 1") as cursor:
+                row = await cursor.fetchone()
+            value = row[0] if row else 0
+            if last is not None and value != last:
+                data_version.bump()
+                if on_change is not None:
+                    try:
+                        await on_change()
+                    except Exception as e:
+                        logger.error(f"Ошибка при обновлении данных после изменения в другом процессе: {e}")
+            last = value
+            await asyncio.sleep(interval)
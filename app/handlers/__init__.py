@@ -4,8 +4,10 @@ from app.handlers.menu_search import router as menu_search_router
 from app.handlers.hookah import router as hookah_router
 from app.handlers.reviews import router as reviews_router
 from app.handlers.admin import router as admin_router
+from app.handlers.nearby import router as nearby_router
 
 routers = [
+    nearby_router,
     menu_search_router,
     business_lunch_router,
     hookah_router,
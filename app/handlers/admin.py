@@ -1,12 +1,24 @@
 from aiogram import Router, F
-from aiogram.types import Message, CallbackQuery
+from aiogram.types import Message, CallbackQuery, FSInputFile
 from aiogram.filters import Command
 from aiogram.fsm.context import FSMContext
 from aiogram.fsm.state import State, StatesGroup
 from app.database.database import Database
+from app.database.tags import KNOWN_TAGS
 from app.keyboards import get_admin_city_selection_keyboard, get_places_pagination_keyboard
+from app.utils.geocoding import get_default_geocoder, geocode_address, backfill_place_coordinates
+from app.utils.edit_guard import EditGuardMiddleware
+from app.utils.exporter import default_backup_path, export_to_file
+from app.utils.importer import import_stream, make_parser, telegram_file_chunks
+from app.utils.jobs import job_executor
 from loguru import logger
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+import asyncio
 import json
+import os
+import tempfile
+from datetime import datetime
+from typing import Optional, Tuple
 import math
 
 router = Router()
@@ -151,6 +163,15 @@ async def process_place_comment(message: Message, state: FSMContext):
         
         await message.answer(f"Заведение '{name}' успешно добавлено! ID: {place_id}")
         logger.info(f"Добавлено новое заведение: {name} (ID: {place_id})")
+        
+        # Координаты по локальному справочнику адресов, если он подключен
+        geocoder = await get_default_geocoder()
+        if geocoder:
+            coordinates = await geocode_address(db, geocoder, city, address)
+            if coordinates:
+                await db.set_place_coordinates(place_id, *coordinates)
+            else:
+                await message.answer(f"Адрес не найден в справочнике, задайте координаты командой /set_coords {place_id} <широта> <долгота>")
     except Exception as e:
         await message.answer(f"Произошла ошибка при добавлении заведения: {str(e)}")
         logger.error(f"Ошибка при добавлении заведения: {str(e)}")
@@ -158,6 +179,37 @@ async def process_place_comment(message: Message, state: FSMContext):
     # Сбрасываем состояние
     await state.clear()
 
+# Заголовки списка выбора заведения по префиксу callback_data
+PLACE_PICKER_TITLES = {
+    "admin_lunch": "Выберите заведение для добавления бизнес-ланча:",
+    "admin_menu": "Выберите заведение для добавления позиции меню:",
+}
+PLACES_PER_PAGE = 5
+
+async def _render_place_picker(state: FSMContext, city: str, prefix: str, name_filter: Optional[str] = None,
+                               page: int = 1, cursor: Optional[Tuple[str, int]] = None, backward: bool = False):
+    """
+    Собирает текст и клавиатуру страницы выбора заведения администратором
+    
+    В состоянии сохраняются фильтр и курсоры (название, ID) первого и последнего
+    заведения страницы - от них кнопки "Пред." и "След." берут соседние страницы.
+    """
+    total = await db.count_places_for_admin(city, name_filter)
+    total_pages = max(1, math.ceil(total / PLACES_PER_PAGE))
+    page = min(max(page, 1), total_pages)
+    places = await db.get_places_page_for_admin(city, name_filter, cursor, backward, PLACES_PER_PAGE)
+    await state.update_data(
+        place_filter=name_filter,
+        place_page_edges=[[place["name"], place["id"]] for place in (places[0], places[-1])] if places else None,
+    )
+    
+    text = PLACE_PICKER_TITLES[prefix]
+    if name_filter:
+        text += f"\nНазвание содержит «{name_filter}», найдено: {total}"
+    text += "\n\nЧтобы быстро найти заведение, отправьте часть его названия."
+    
+    return text, get_places_pagination_keyboard(places, page, total_pages, prefix, filtered=bool(name_filter))
+
 # Команда для добавления нового бизнес-ланча через JSON
 @router.message(Command("add_lunch"))
 async def cmd_add_lunch_json(message: Message, state: FSMContext):
@@ -176,66 +228,80 @@ async def cmd_add_lunch_json(message: Message, state: FSMContext):
         await message.answer("Пожалуйста, сначала выберите город с помощью команды /start.")
         return
     
-    # Получаем список заведений для данного города
-    places = await db.get_places_for_admin(city)
-    
-    if not places:
+    if not await db.count_places_for_admin(city):
         await message.answer(f"В городе {city} нет добавленных заведений. Сначала добавьте заведение с помощью /add_place.")
         return
     
-    # Сохраняем список заведений и информацию для пагинации
-    total_places = len(places)
-    items_per_page = 5
-    total_pages = math.ceil(total_places / items_per_page)
-    current_page = 1
-    
-    await state.update_data(
-        places=places,
-        current_page=current_page,
-        total_pages=total_pages,
-        items_per_page=items_per_page
-    )
-    
-    # Отображаем первую страницу заведений
-    await message.answer(
-        "Выберите заведение для добавления бизнес-ланча:",
-        reply_markup=get_places_pagination_keyboard(
-            places, current_page, total_pages, "admin_lunch", items_per_page
-        )
-    )
+    # В состоянии хранятся только фильтр по названию и курсоры, страницы берутся из базы
+    text, markup = await _render_place_picker(state, city, "admin_lunch")
+    await message.answer(text, reply_markup=markup, parse_mode=None)
     
     await state.set_state(AddLunchStates.waiting_for_place_selection)
 
-# Обработчик пагинации для выбора заведения при добавлении бизнес-ланча
-@router.callback_query(F.data.startswith("admin_lunch_page:"))
-async def process_lunch_place_pagination(callback: CallbackQuery, state: FSMContext):
-    page = int(callback.data.split(":")[1])
-    
+# Обработчик пагинации и сброса фильтра при выборе заведения администратором
+@router.callback_query(F.data.startswith("admin_lunch_page:") | F.data.startswith("admin_menu_page:"))
+async def process_place_picker_page(callback: CallbackQuery, state: FSMContext):
+    action, direction, page_part = callback.data.split(":")
+    prefix = action[:-len("_page")]
+    page = int(page_part)
+    
+    city = await db.get_user_city(callback.from_user.id)
     data = await state.get_data()
-    places = data.get("places", [])
-    total_pages = data.get("total_pages", 1)
-    items_per_page = data.get("items_per_page", 5)
-    
-    await state.update_data(current_page=page)
-    
-    await callback.message.edit_text(
-        "Выберите заведение для добавления бизнес-ланча:",
-        reply_markup=get_places_pagination_keyboard(
-            places, page, total_pages, "admin_lunch", items_per_page
-        )
+    name_filter = data.get("place_filter")
+    edges = data.get("place_page_edges")
+    cursor = None
+    if direction == "r":
+        # Сброс фильтра: возвращаемся к первой странице всех заведений
+        name_filter, page = None, 1
+    elif edges:
+        cursor = tuple(edges[0] if direction == "p" else edges[1])
+    
+    text, markup = await _render_place_picker(
+        state, city, prefix, name_filter, page, cursor, backward=direction == "p"
     )
+    await callback.message.edit_text(text, reply_markup=markup, parse_mode=None)
     
     await callback.answer()
 
-# Обработчик выбора заведения для бизнес-ланча
-@router.callback_query(F.data.startswith("admin_lunch:"))
-async def process_lunch_place_selected(callback: CallbackQuery, state: FSMContext):
-    place_id = int(callback.data.split(":")[1])
+# Обработчик поиска заведения по названию при выборе администратором
+@router.message(AddLunchStates.waiting_for_place_selection, F.text)
+@router.message(AddMenuItemStates.waiting_for_place_selection, F.text)
+async def process_place_picker_filter(message: Message, state: FSMContext):
+    if message.text.lower() == "отмена":
+        await message.answer("Операция отменена.")
+        await state.clear()
+        return
+    
+    current_state = await state.get_state()
+    is_lunch = current_state == AddLunchStates.waiting_for_place_selection.state
+    prefix = "admin_lunch" if is_lunch else "admin_menu"
+    city = await db.get_user_city(message.from_user.id)
+    name_filter = message.text.strip()
     
+    places = await db.get_places_page_for_admin(city, name_filter, limit=2)
+    if not places:
+        await message.answer(
+            f"Заведений, в названии которых есть «{name_filter}», не найдено. "
+            f"Отправьте другую часть названия или выберите заведение из списка выше.",
+            parse_mode=None
+        )
+        return
+    
+    # Единственное совпадение - сразу переходим к выбранному заведению
+    if len(places) == 1:
+        select = _select_lunch_place if is_lunch else _select_menu_place
+        await select(places[0]["id"], state, message.answer)
+        return
+    
+    text, markup = await _render_place_picker(state, city, prefix, name_filter)
+    await message.answer(text, reply_markup=markup, parse_mode=None)
+
+async def _select_lunch_place(place_id: int, state: FSMContext, send):
+    """Запоминает заведение для бизнес-ланча и запрашивает JSON (send - edit_text или answer)"""
     # Получаем информацию о выбранном заведении
     place = await db.get_place_by_id(place_id)
     if not place:
-        await callback.message.edit_text("Ошибка: заведение не найдено.")
+        await send("Ошибка: заведение не найдено.")
         await state.clear()
         return
     
@@ -259,7 +325,7 @@ async def process_lunch_place_selected(callback: CallbackQuery, state: FSMContex
   }
 }'''
     
-    await callback.message.edit_text(
+    await send(
         f"Выбрано заведение: {place['name']} ({place['address']})\n\n"
         f"Отправьте информацию о бизнес-ланче в формате JSON.\n"
         f"Пример формата:\n```{json_format}```\n\n"
@@ -267,6 +333,12 @@ async def process_lunch_place_selected(callback: CallbackQuery, state: FSMContex
     )
     
     await state.set_state(AddLunchStates.waiting_for_json)
+
+# Обработчик выбора заведения для бизнес-ланча
+@router.callback_query(F.data.startswith("admin_lunch:"))
+async def process_lunch_place_selected(callback: CallbackQuery, state: FSMContext):
+    place_id = int(callback.data.split(":")[1])
+    await _select_lunch_place(place_id, state, callback.message.edit_text)
     await callback.answer()
 
 # Обработчик отмены операции
@@ -288,63 +360,27 @@ async def process_lunch_json_input(message: Message, state: FSMContext):
     place_id = data.get("place_id")
     place_name = data.get("place_name")
     
-    # Словарь для преобразования названий дней недели в числовой формат
-    weekday_map = {
-        "понедельник": 1,
-        "вторник": 2,
-        "среда": 3,
-        "четверг": 4,
-        "пятница": 5,
-        "суббота": 6,
-        "воскресенье": 7,
-        "каждый день": 0
-    }
-    
     try:
-        # Парсим JSON
-        data = json.loads(message.text)
-        lunch_data = data.get("business_lunch", {})
-        
-        # Получаем общие данные для всех дней
-        price = lunch_data.get("price")
-        if not price:
-            await message.answer("Ошибка: не указана цена бизнес-ланча (price).")
+        # Разбираем JSON в пуле процессов, чтобы большой ввод не задерживал других пользователей.
+        # При ошибке во вводе состояние не сбрасывается: исправленный JSON можно отправить снова
+        try:
+            lunch = await job_executor.run("parse_lunch_json", message.text)
+        except json.JSONDecodeError:
+            await message.answer(
+                "Ошибка: неверный формат JSON. Пожалуйста, проверьте синтаксис и отправьте снова "
+                "или напишите «отмена»."
+            )
             return
-        
-        # Парсим время
-        time_str = lunch_data.get("time", "")
-        if "до" in time_str:
-            try:
-                start_time, end_time = time_str.split("до")
-                start_time = start_time.strip()
-                end_time = end_time.strip()
-            except:
-                await message.answer("Ошибка: неверный формат времени. Используйте формат 'HH:MM до HH:MM'.")
-                return
-        else:
-            await message.answer("Ошибка: неверный формат времени. Используйте формат 'HH:MM до HH:MM'.")
+        except ValueError as e:
+            await message.answer(f"Ошибка: {e}\nИсправьте данные и отправьте снова или напишите «отмена».")
             return
         
-        # Получаем дополнительную информацию
-        additional = lunch_data.get("additional", "")
+        start_time, end_time, price = lunch["start_time"], lunch["end_time"], lunch["price"]
+        for day_name in lunch["unknown_days"]:
+            await message.answer(f"Предупреждение: неизвестный день недели '{day_name}'. Пропускаем.")
         
-        # Обрабатываем информацию по дням недели
-        days = lunch_data.get("days", {})
         added_days = []
-        
-        for day_name, day_data in days.items():
-            # Получаем числовой код дня недели
-            weekday = weekday_map.get(day_name.lower())
-            if weekday is None:
-                await message.answer(f"Предупреждение: неизвестный день недели '{day_name}'. Пропускаем.")
-                continue
-            
-            # Формируем описание ланча для этого дня
-            positions = day_data.get("positions", [])
-            description = "\n".join(positions)
-            if additional:
-                description += f"\n\n{additional}"
-            
+        for weekday, day_name, description in lunch["days"]:
             # Добавляем бизнес-ланч в базу данных
             try:
                 lunch_id = await db.add_business_lunch(
@@ -372,8 +408,6 @@ async def process_lunch_json_input(message: Message, state: FSMContext):
         else:
             await message.answer("⚠️ Не удалось добавить ни одного бизнес-ланча. Проверьте формат данных.")
         
-    except json.JSONDecodeError:
-        await message.answer("Ошибка: неверный формат JSON. Пожалуйста, проверьте синтаксис и отправьте снова.")
     except Exception as e:
         await message.answer(f"Произошла ошибка: {str(e)}")
         logger.error(f"Ошибка при обработке JSON для бизнес-ланча: {str(e)}")
@@ -399,78 +433,40 @@ async def cmd_add_menu_item(message: Message, state: FSMContext):
         await message.answer("Пожалуйста, сначала выберите город с помощью команды /start.")
         return
     
-    # Получаем список заведений для данного города
-    places = await db.get_places_for_admin(city)
-    
-    if not places:
+    if not await db.count_places_for_admin(city):
         await message.answer(f"В городе {city} нет добавленных заведений. Сначала добавьте заведение.")
         return
     
-    # Сохраняем список заведений и информацию для пагинации
-    total_places = len(places)
-    items_per_page = 5
-    total_pages = math.ceil(total_places / items_per_page)
-    current_page = 1
-    
-    await state.update_data(
-        places=places,
-        current_page=current_page,
-        total_pages=total_pages,
-        items_per_page=items_per_page
-    )
-    
-    # Отображаем первую страницу заведений
-    await message.answer(
-        "Выберите заведение для добавления позиции меню:",
-        reply_markup=get_places_pagination_keyboard(
-            places, current_page, total_pages, "admin_menu", items_per_page
-        )
-    )
+    # В состоянии хранятся только фильтр по названию и курсоры, страницы берутся из базы
+    text, markup = await _render_place_picker(state, city, "admin_menu")
+    await message.answer(text, reply_markup=markup, parse_mode=None)
     
     await state.set_state(AddMenuItemStates.waiting_for_place_selection)
 
-# Обработчик пагинации для выбора заведения при добавлении позиции меню
-@router.callback_query(F.data.startswith("admin_menu_page:"))
-async def process_menu_place_pagination(callback: CallbackQuery, state: FSMContext):
-    page = int(callback.data.split(":")[1])
-    
-    data = await state.get_data()
-    places = data.get("places", [])
-    total_pages = data.get("total_pages", 1)
-    items_per_page = data.get("items_per_page", 5)
-    
-    await state.update_data(current_page=page)
-    
-    await callback.message.edit_text(
-        "Выберите заведение для добавления позиции меню:",
-        reply_markup=get_places_pagination_keyboard(
-            places, page, total_pages, "admin_menu", items_per_page
-        )
-    )
-    
-    await callback.answer()
-
-# Обработчик выбора заведения для позиции меню
-@router.callback_query(F.data.startswith("admin_menu:"))
-async def process_menu_place_selected(callback: CallbackQuery, state: FSMContext):
-    place_id = int(callback.data.split(":")[1])
-    
+async def _select_menu_place(place_id: int, state: FSMContext, send):
+    """Запоминает заведение для позиций меню и запрашивает категорию (send - edit_text или answer)"""
     # Получаем информацию о выбранном заведении
     place = await db.get_place_by_id(place_id)
     if not place:
-        await callback.message.edit_text("Ошибка: заведение не найдено.")
+        await send("Ошибка: заведение не найдено.")
         await state.clear()
         return
     
     await state.update_data(place_id=place_id, place_name=place["name"])
     
     # Запрашиваем категорию/тему позиций меню
-    await callback.message.edit_text(
+    await send(
         f"Выбрано заведение: {place['name']} ({place['address']})\n\n"
         f"Введите общую категорию для добавляемых позиций меню (например, 'напитки', 'десерты', 'кальяны'):"
     )
     
     await state.set_state(AddMenuItemStates.waiting_for_menu_category)
+
+# Обработчик выбора заведения для позиции меню
+@router.callback_query(F.data.startswith("admin_menu:"))
+async def process_menu_place_selected(callback: CallbackQuery, state: FSMContext):
+    place_id = int(callback.data.split(":")[1])
+    await _select_menu_place(place_id, state, callback.message.edit_text)
     await callback.answer()
 
 # Новый обработчик для получения категории позиций меню
@@ -537,38 +533,28 @@ async def process_menu_json_input(message: Message, state: FSMContext):
     menu_category = data.get("menu_category", "напиток")  # Используем полученную категорию
     
     try:
-        # Парсим JSON
-        data = json.loads(message.text)
-        menu_items = data.get("menu_items", [])
-        
-        if not menu_items:
-            await message.answer("Ошибка: не найдены позиции меню в JSON.")
+        # Разбираем JSON в пуле процессов, чтобы большой ввод не задерживал других пользователей.
+        # При ошибке во вводе состояние не сбрасывается: исправленный JSON можно отправить снова
+        try:
+            menu_items = await job_executor.run("parse_menu_json", message.text)
+        except json.JSONDecodeError:
+            await message.answer(
+                "Ошибка: неверный формат JSON. Пожалуйста, проверьте синтаксис и отправьте снова "
+                "или напишите «отмена»."
+            )
+            return
+        except ValueError as e:
+            await message.answer(f"Ошибка: {e}\nИсправьте данные и отправьте снова или напишите «отмена».")
             return
         
         added_items = []
         
         for item in menu_items:
-            name = item.get("name")
-            description = item.get("description", "")
-            price = item.get("price")
-            volume = item.get("volume", "")
-            
-            # Добавляем объем в описание, если он указан
-            if volume:
-                if description:
-                    description = f"{description}, {volume}"
-                else:
-                    description = volume
+            name, price, description = item["name"], item["price"], item["description"]
             
             # Используем категорию, указанную пользователем
             category = menu_category
             
-            # Проверяем обязательные поля
-            if not name:
-                continue
-            if not price:
-                continue
-            
             try:
                 # Добавляем позицию меню в базу данных
                 menu_id = await db.add_menu_item(
@@ -595,8 +581,6 @@ async def process_menu_json_input(message: Message, state: FSMContext):
         else:
             await message.answer("⚠️ Не удалось добавить ни одной позиции меню. Проверьте формат данных.")
         
-    except json.JSONDecodeError:
-        await message.answer("Ошибка: неверный формат JSON. Пожалуйста, проверьте синтаксис и отправьте снова.")
     except Exception as e:
         await message.answer(f"Произошла ошибка: {str(e)}")
         logger.error(f"Ошибка при обработке JSON для позиций меню: {str(e)}")
@@ -604,6 +588,357 @@ async def process_menu_json_input(message: Message, state: FSMContext):
     # Сбрасываем состояние
     await state.clear()
 
+# Команды для управления тегами заведений
+@router.message(Command("tag", "untag"))
+async def cmd_place_tags(message: Message):
+    """Обработчик команд /tag и /untag: /tag <ID заведения> <тег> [тег ...]"""
+    user_id = message.from_user.id
+    is_admin = await db.is_admin(user_id)
+    
+    if not is_admin:
+        await message.answer("У вас нет прав для выполнения этой команды. Только администраторы могут изменять теги заведений.")
+        return
+    
+    parts = message.text.split()
+    tags_help = "\n".join(f"{tag} - {title}" for tag, title in KNOWN_TAGS.items())
+    if len(parts) < 3 or not parts[1].isdigit():
+        await message.answer(
+            f"Использование: {parts[0]} <ID заведения> <тег> [тег ...]\n\n"
+            f"Доступные теги:\n{tags_help}"
+        )
+        return
+    
+    place_id = int(parts[1])
+    tags = [tag.lower() for tag in parts[2:]]
+    unknown_tags = [tag for tag in tags if tag not in KNOWN_TAGS]
+    if unknown_tags:
+        await message.answer(
+            f"Неизвестные теги: {', '.join(unknown_tags)}\n\n"
+            f"Доступные теги:\n{tags_help}"
+        )
+        return
+    
+    place = await db.get_place_by_id(place_id)
+    if not place:
+        await message.answer(f"Заведение с ID {place_id} не найдено.")
+        return
+    
+    if parts[0].lstrip("/").startswith("untag"):
+        await db.remove_place_tags(place_id, tags)
+    else:
+        await db.add_place_tags(place_id, tags)
+    
+    place_tags = await db.get_place_tags(place_id)
+    tags_text = ", ".join(KNOWN_TAGS.get(tag, tag) for tag in place_tags) or "нет"
+    await message.answer(f"Теги заведения '{place['name']}': {tags_text}")
+    logger.info(f"Обновлены теги заведения ID:{place_id}: {place_tags}")
+
+# Команда для установки координат заведения
+@router.message(Command("set_coords"))
+async def cmd_set_coords(message: Message):
+    """Обработчик команды /set_coords <ID заведения> <широта> <долгота>"""
+    user_id = message.from_user.id
+    is_admin = await db.is_admin(user_id)
+    
+    if not is_admin:
+        await message.answer("У вас нет прав для выполнения этой команды. Только администраторы могут изменять заведения.")
+        return
+    
+    parts = message.text.replace(",", " ").split()
+    try:
+        place_id, latitude, longitude = int(parts[1]), float(parts[2]), float(parts[3])
+    except (IndexError, ValueError):
+        await message.answer("Использование: /set_coords <ID заведения> <широта> <долгота>\nНапример: /set_coords 5 52.6088 39.5992")
+        return
+    
+    if not (-90 <= latitude <= 90 and -180 <= longitude <= 180):
+        await message.answer("Ошибка: координаты вне допустимого диапазона.")
+        return
+    
+    if not await db.set_place_coordinates(place_id, latitude, longitude):
+        await message.answer(f"Заведение с ID {place_id} не найдено.")
+        return
+    
+    await message.answer(f"Координаты заведения ID {place_id} сохранены: {latitude}, {longitude}")
+    logger.info(f"Обновлены координаты заведения ID:{place_id}: {latitude}, {longitude}")
+
+# Команда для заполнения координат всех заведений по справочнику адресов
+@router.message(Command("geocode"))
+async def cmd_geocode(message: Message):
+    """Обработчик команды /geocode [all]"""
+    user_id = message.from_user.id
+    is_admin = await db.is_admin(user_id)
+    
+    if not is_admin:
+        await message.answer("У вас нет прав для выполнения этой команды. Только администраторы могут изменять заведения.")
+        return
+    
+    geocoder = await get_default_geocoder()
+    if not geocoder:
+        await message.answer("Справочник адресов не подключен. Укажите путь к CSV-файлу в переменной GEOCODER_CSV.")
+        return
+    
+    refresh = message.text.split()[-1] == "all"
+    stats = await backfill_place_coordinates(db, geocoder, refresh=refresh)
+    await message.answer(
+        f"Геокодирование завершено.\n"
+        f"Заведений: {stats['total']}, из кэша: {stats['cached']}, "
+        f"найдено: {stats['geocoded']}, не найдено: {stats['missing']}"
+    )
+    logger.info(f"Геокодирование заведений: {stats}")
+
+# Определяем состояния FSM для импорта заведений из файла
+class ImportStates(StatesGroup):
+    waiting_for_file = State()
+
+# Импорт: максимальный размер файла (ограничение Bot API на скачивание) и частота обновления прогресса
+IMPORT_MAX_FILE_SIZE = 20 * 1024 * 1024
+IMPORT_PROGRESS_INTERVAL = 2.0
+
+# Команда для импорта заведений из файла
+@router.message(Command("import"))
+async def cmd_import(message: Message, state: FSMContext):
+    """Обработчик команды /import: файл можно приложить к команде или прислать следующим сообщением"""
+    user_id = message.from_user.id
+    is_admin = await db.is_admin(user_id)
+    
+    if not is_admin:
+        await message.answer("У вас нет прав для выполнения этой команды. Только администраторы могут добавлять заведения.")
+        return
+    
+    if message.document:
+        await import_places_file(message, state)
+        return
+    
+    await state.set_state(ImportStates.waiting_for_file)
+    await message.answer(
+        "Пришлите файл с заведениями: .json, .jsonl или .csv, можно сжатый .gz (до 20 МБ).\n"
+        "Формат описан в README. Заведения без города получат ваш город.\n"
+        "Для отмены отправьте /cancel"
+    )
+
+@router.message(ImportStates.waiting_for_file, F.document)
+async def import_places_file(message: Message, state: FSMContext):
+    """Импортирует заведения из присланного файла, показывая прогресс"""
+    await state.clear()
+    document = message.document
+    if document.file_size and document.file_size > IMPORT_MAX_FILE_SIZE:
+        await message.answer("Файл слишком большой: Telegram позволяет боту скачивать файлы до 20 МБ.")
+        return
+    try:
+        make_parser(document.file_name)
+    except ValueError as e:
+        await message.answer(f"Ошибка: {e}")
+        return
+    
+    default_city = await db.get_user_city(message.from_user.id)
+    progress_message = await message.answer(f"⏳ Импорт {document.file_name}…")
+    loop = asyncio.get_running_loop()
+    last_update = loop.time()
+    
+    async def report_progress(stats):
+        nonlocal last_update
+        if loop.time() - last_update < IMPORT_PROGRESS_INTERVAL:
+            return
+        last_update = loop.time()
+        await progress_message.edit_text(
+            f"⏳ Импорт {document.file_name}…\n"
+            f"Обработано: {stats['processed']}, добавлено: {stats['inserted']}, "
+            f"обновлено: {stats['updated']}, отклонено: {stats['rejected']}"
+        )
+    
+    stats = None
+    failure = None
+    try:
+        stats = await import_stream(
+            db, telegram_file_chunks(message.bot, document.file_id), document.file_name,
+            default_city=default_city, progress=report_progress
+        )
+    except ValueError as e:
+        failure = str(e)
+    except Exception as e:
+        logger.exception(f"Ошибка импорта файла {document.file_name}")
+        failure = f"не удалось прочитать файл ({e.__class__.__name__})"
+    
+    await db.load_city_timezones()
+    if failure:
+        await progress_message.edit_text(
+            f"❌ Импорт {document.file_name} прерван: {failure}\n"
+            f"Записанные до ошибки пачки заведений сохранены."
+        )
+        return
+    
+    text = (
+        f"✅ Импорт {document.file_name} завершен.\n"
+        f"Обработано: {stats['processed']}, добавлено: {stats['inserted']}, "
+        f"обновлено: {stats['updated']}, отклонено: {stats['rejected']}"
+    )
+    if stats['errors']:
+        text += "\n\nОтклоненные записи:\n" + "\n".join(stats['errors'])
+        if stats['rejected'] > len(stats['errors']):
+            text += f"\n… и еще {stats['rejected'] - len(stats['errors'])}"
+    await progress_message.edit_text(text[:4096])
+    logger.info(f"Импорт {document.file_name} администратором {message.from_user.id}: "
+                f"обработано {stats['processed']}, добавлено {stats['inserted']}, "
+                f"обновлено {stats['updated']}, отклонено {stats['rejected']}")
+
+@router.message(ImportStates.waiting_for_file, Command("cancel"))
+async def import_places_cancel(message: Message, state: FSMContext):
+    """Отменяет ожидание файла для импорта"""
+    await state.clear()
+    await message.answer("Импорт отменен.")
+
+@router.message(ImportStates.waiting_for_file, ~F.text.startswith("/"))
+async def import_places_waiting(message: Message):
+    """Напоминает, что ожидается файл"""
+    await message.answer("Пришлите файл .json, .jsonl или .csv документом, или /cancel для отмены.")
+
+# Выгрузка больше этого размера не отправится в Telegram, для нее есть CLI
+EXPORT_MAX_FILE_SIZE = 50 * 1024 * 1024
+
+# Команда для выгрузки заведений в файл
+@router.message(Command("export"))
+async def cmd_export(message: Message):
+    """Обработчик команды /export [город]: выгружает заведения в JSONL, сжатый gzip"""
+    user_id = message.from_user.id
+    is_admin = await db.is_admin(user_id)
+    
+    if not is_admin:
+        await message.answer("У вас нет прав для выполнения этой команды.")
+        return
+    
+    parts = message.text.split(maxsplit=1)
+    city = parts[1].strip() if len(parts) > 1 else None
+    filename = f"lunch_hunter-{city or 'all'}-{datetime.now():%Y%m%d-%H%M}.jsonl.gz"
+    
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, filename)
+        stats = await export_to_file(db, path, city)
+        if stats['size'] > EXPORT_MAX_FILE_SIZE:
+            await message.answer(
+                f"Выгрузка занимает {stats['size'] / 1024 / 1024:.1f} МБ, Telegram принимает файлы до 50 МБ.\n"
+                f"Выгрузите базу на сервере: python -m app.utils.exporter export",
+                parse_mode=None
+            )
+            return
+        await message.answer_document(
+            FSInputFile(path, filename=filename),
+            caption=(
+                f"📦 Заведений: {stats['places']}, ланчей: {stats['lunches']}, "
+                f"позиций меню: {stats['menu_items']}, отзывов: {stats['reviews']}\n"
+                f"Файл можно загрузить обратно командой /import"
+            ),
+            parse_mode=None
+        )
+    logger.info(f"Выгрузка заведений ({city or 'все города'}) администратором {user_id}: {stats}")
+
+# Команда для резервной копии базы
+@router.message(Command("backup"))
+async def cmd_backup(message: Message):
+    """Обработчик команды /backup: копия базы на сервере без остановки бота"""
+    user_id = message.from_user.id
+    is_admin = await db.is_admin(user_id)
+    
+    if not is_admin:
+        await message.answer("У вас нет прав для выполнения этой команды.")
+        return
+    
+    path = default_backup_path(os.getenv("BACKUP_DIR", "backups"))
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    size = await db.backup(path)
+    await message.answer(f"💾 Копия базы сохранена: {path} ({size / 1024 / 1024:.1f} МБ)", parse_mode=None)
+    logger.info(f"Копия базы {path} ({size} байт) создана администратором {user_id}")
+
+# Команда для установки часового пояса города
+@router.message(Command("timezone"))
+async def cmd_city_timezone(message: Message):
+    """Обработчик команды /timezone <город> <часовой пояс>, например: /timezone Липецк Europe/Moscow"""
+    user_id = message.from_user.id
+    is_admin = await db.is_admin(user_id)
+    
+    if not is_admin:
+        await message.answer("У вас нет прав для выполнения этой команды. Только администраторы могут настраивать города.")
+        return
+    
+    parts = message.text.split()
+    if len(parts) != 3:
+        await message.answer("Использование: /timezone <город> <часовой пояс>\nНапример: /timezone Липецк Europe/Moscow")
+        return
+    
+    city, timezone = parts[1], parts[2]
+    try:
+        ZoneInfo(timezone)
+    except (ZoneInfoNotFoundError, ValueError):
+        await message.answer(f"Неизвестный часовой пояс: {timezone}")
+        return
+    
+    await db.set_city_timezone(city, timezone)
+    await message.answer(f"Часовой пояс города {city}: {timezone}")
+    logger.info(f"Для города {city} установлен часовой пояс {timezone}")
+
+# Команда для просмотра метрик исходящих запросов к Telegram
+@router.message(Command("send_stats"))
+async def cmd_send_stats(message: Message, webhook_handler=None, update_scheduler=None, worker_index=None):
+    """Обработчик команды /send_stats"""
+    user_id = message.from_user.id
+    is_admin = await db.is_admin(user_id)
+    
+    if not is_admin:
+        await message.answer("У вас нет прав для выполнения этой команды.")
+        return
+    
+    scheduler = getattr(message.bot.session, "scheduler", None)
+    if scheduler is None:
+        await message.answer("Планировщик исходящих запросов не подключен.")
+        return
+    
+    stats = scheduler.snapshot()
+    edit_guard = next(
+        (m for m in message.bot.session.middleware if isinstance(m, EditGuardMiddleware)), None
+    )
+    sent = stats['sent'] or 1
+    extra_text = ""
+    if update_scheduler is not None:
+        updates = update_scheduler.snapshot()
+        extra_text += (
+            f"\n\n📥 Апдейты: обработано {updates['handled']:.0f}, "
+            f"в работе {updates['active']} из {update_scheduler.max_concurrency}, в очереди {updates['queued']} "
+            f"(максимум {updates['max_queued']:.0f})\n"
+            f"Ожидание: среднее {updates['avg_wait_seconds'] * 1000:.0f} мс, "
+            f"максимум {updates['max_wait_seconds'] * 1000:.0f} мс"
+        )
+    if webhook_handler is not None:
+        webhook = webhook_handler.snapshot()
+        extra_text += (
+            f"\n\n🌐 Вебхук: получено {webhook['received']:.0f}, обработано {webhook['handled']:.0f}, "
+            f"в работе {webhook['in_progress']} из {webhook_handler.max_concurrency}, "
+            f"ожидание места: {webhook['wait_seconds']:.1f} с"
+        )
+    jobs = job_executor.snapshot()
+    if jobs['jobs']:
+        extra_text += (
+            f"\n\n🧮 Пул задач: процессов {jobs['workers']}, в работе {jobs['active']}, "
+            f"перезапусков {jobs['restarts']}"
+        )
+        for kind, job in jobs['jobs'].items():
+            extra_text += (
+                f"\n{kind}: выполнено {job['done']}, ошибок {job['errors']}, таймаутов {job['timeouts']}, "
+                f"отменено {job['cancelled']}; время среднее {job['avg_run'] * 1000:.0f} мс, "
+                f"максимум {job['max_run'] * 1000:.0f} мс, ожидание {job['avg_wait'] * 1000:.0f} мс"
+            )
+    await message.answer(
+        (f"⚙️ Воркер {worker_index}\n" if worker_index is not None else "") +
+        f"📤 Исходящие запросы к Telegram:\n"
+        f"Отправлено: {stats['sent']:.0f} (кнопки: {stats['sent_callback']:.0f}, "
+        f"ответы: {stats['sent_interactive']:.0f}, рассылки: {stats['sent_bulk']:.0f})\n"
+        f"Среднее ожидание: {stats['wait_seconds'] / sent * 1000:.0f} мс\n"
+        f"Ответов retry_after: {stats['retry_after']:.0f}, неудач: {stats['failed']:.0f}\n"
+        f"В очереди: {stats['queued']}, чатов с лимитом: {stats['chat_buckets']}\n"
+        f"Пропущено редактирований без изменений: {edit_guard.skipped if edit_guard else 0}"
+        + extra_text,
+        parse_mode=None
+    )
+
 # Команда для установки статуса администратора (только для технических целей)
 @router.message(Command("make_admin"))
 async def cmd_make_admin(message: Message):
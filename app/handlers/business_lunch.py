@@ -1,6 +1,6 @@
 from aiogram import Router, F
-from aiogram.types import CallbackQuery
-from app.database import Database
+from aiogram.types import CallbackQuery, InlineKeyboardMarkup
+from app.database import Database, tag_index, spatial_index
 from app.keyboards import (
     get_search_results_keyboard, 
     get_place_details_keyboard, 
@@ -8,14 +8,31 @@ from app.keyboards import (
     get_back_to_place_keyboard,
     get_start_keyboard,
     get_weekday_selection_keyboard,
-    get_all_lunches_keyboard
+    get_all_lunches_keyboard,
+    get_price_limit_keyboard,
+    get_location_request_keyboard,
+    get_place_list_keyboard,
+    lunch_price_callback
 )
 from app.utils import get_yandex_maps_url
-from datetime import datetime
+from app.utils.cache import VersionedCache, render_cache
+from app.utils.clock import city_clock, format_minutes, CityClock
+from app.utils.geo import format_distance
+from app.utils.prefetch import prefetcher
+from typing import List, Optional, Tuple
 import math
 
 router = Router()
 
+# Сколько заведений показывать на странице компактного списка
+LIST_PAGE_SIZE = 8
+
+# Количество заведений с ланчами по (город, дата или день недели)
+_lunch_count_cache = VersionedCache(maxsize=256)
+
+# Порядок заведений по расстоянию по (пользователь, город, день недели, геопозиция)
+_distance_order_cache = VersionedCache(maxsize=1024)
+
 @router.callback_query(F.data == "business_lunch")
 async def callback_business_lunch(callback: CallbackQuery):
     """Обработчик кнопки 'Бизнес-ланчи'"""
@@ -33,11 +50,12 @@ async def callback_business_lunch(callback: CallbackQuery):
         await callback.answer()
         return
     
-    # Получаем текущий день недели
-    current_weekday = datetime.now().isoweekday()  # 1-7 (пн-вс)
+    # Получаем текущий день недели в городе пользователя
+    clock = city_clock(city)
+    current_weekday = clock.weekday()  # 1-7 (пн-вс)
     
     # Получаем количество заведений с бизнес-ланчами на текущий день
-    total = await db.count_business_lunches(city, weekday=current_weekday)
+    total = await _count_lunches(db, city, current_weekday, clock)
     
     if total == 0:
         await callback.message.edit_text(
@@ -47,15 +65,59 @@ async def callback_business_lunch(callback: CallbackQuery):
         await callback.answer()
         return
     
-    # Получаем первую страницу результатов
-    page = 1
-    per_page = 1  # Показываем по одному заведению на странице
-    total_pages = math.ceil(total / per_page)
-    offset = (page - 1) * per_page
+    # Показываем первую страницу
+    screen = await _render_lunch_page(db, city, 1, current_weekday, clock, explicit_weekday=False)
+    
+    if not screen:
+        await callback.message.edit_text(
+            "К сожалению, произошла ошибка при получении данных.",
+            reply_markup=get_start_keyboard()
+        )
+        await callback.answer()
+        return
     
-    places = await db.get_business_lunches(city, limit=per_page, offset=offset, weekday=current_weekday)
+    text, reply_markup = screen
+    await callback.message.edit_text(
+        text,
+        reply_markup=reply_markup,
+        parse_mode="Markdown"
+    )
     
-    if not places:
+    await callback.answer()
+    
+    # Следующая страница (кнопка "След." ведет на страницу с явным днем недели)
+    if total > 1:
+        prefetcher.schedule(user_id, _render_lunch_page, db, city, 2, current_weekday, clock)
+
+@router.callback_query(F.data.startswith("business_lunch_page:"))
+async def callback_business_lunch_page(callback: CallbackQuery):
+    """Обработчик пагинации для бизнес-ланчей"""
+    parts = callback.data.split(":")
+    page = int(parts[1])
+    
+    db = Database()
+    
+    # Получаем город пользователя
+    user_id = callback.from_user.id
+    city = await db.get_user_city(user_id)
+    
+    if not city:
+        await callback.message.edit_text(
+            "Пожалуйста, сначала выберите город, используя команду /start.",
+            reply_markup=get_start_keyboard()
+        )
+        await callback.answer()
+        return
+    
+    # Если указан день недели, используем его, иначе берем текущий в городе пользователя
+    clock = city_clock(city)
+    weekday = int(parts[2]) if len(parts) > 2 else None
+    if weekday is None:
+        weekday = clock.weekday()
+    
+    screen = await _render_lunch_page(db, city, page, weekday, clock)
+    
+    if not screen:
         await callback.message.edit_text(
             "К сожалению, произошла ошибка при получении данных.",
             reply_markup=get_start_keyboard()
@@ -63,6 +125,49 @@ async def callback_business_lunch(callback: CallbackQuery):
         await callback.answer()
         return
     
+    text, reply_markup = screen
+    await callback.message.edit_text(
+        text,
+        reply_markup=reply_markup,
+        parse_mode="Markdown"
+    )
+    
+    await callback.answer()
+    
+    # Обычно следующий клик - на следующую страницу, готовим ее заранее
+    if page < await _count_lunches(db, city, weekday, clock):
+        prefetcher.schedule(user_id, _render_lunch_page, db, city, page + 1, weekday, clock)
+
+async def _render_lunch_page(db: Database, city: str, page: int, weekday: int, clock: CityClock,
+                             explicit_weekday: bool = True) -> Optional[Tuple[str, InlineKeyboardMarkup]]:
+    """
+    Формирует страницу списка бизнес-ланчей (одно заведение) или берет ее из кэша экранов
+    
+    Args:
+        explicit_weekday: День недели выбран пользователем и передается в кнопки навигации
+    
+    Returns:
+        Пара (текст, клавиатура) или None, если на странице нет заведения
+    """
+    is_today = weekday == clock.weekday()
+    cache_key = ("bl_page", city, weekday, page, explicit_weekday, is_today)
+    screen = render_cache.get(cache_key)
+    if screen:
+        return screen
+    
+    # Получаем количество заведений с бизнес-ланчами
+    total = await _count_lunches(db, city, weekday, clock)
+    
+    # Получаем запрошенную страницу результатов
+    per_page = 1  # Показываем по одному заведению на странице
+    total_pages = math.ceil(total / per_page)
+    offset = (page - 1) * per_page
+    
+    places = await db.get_business_lunches(city, limit=per_page, offset=offset, weekday=weekday)
+    
+    if not places:
+        return None
+    
     place = places[0]
     place_id = place['id']
     
@@ -70,44 +175,94 @@ async def callback_business_lunch(callback: CallbackQuery):
     reviews = await db.get_reviews_by_place_id(place_id)
     
     # Формируем полный текст с информацией о заведении
-    text = f"🍽️ *Бизнес-ланч на {_get_weekday_name(current_weekday)}*\n\n"
-    text += f"*{place['name']}*\n"
-    text += f"📍 *Адрес:* {place['address']}\n"
-    text += f"🏙️ *Город:* {place['city']}\n\n"
-    text += f"🍽️ *Бизнес-ланч:*\n"
-    text += f"💰 Цена: {place['price']} руб.\n"
-    text += f"⏰ Время: {place['start_time']} - {place['end_time']}\n"
+    text = _format_lunch_card(place, reviews, weekday)
+    reply_markup = get_full_place_details_keyboard(
+        place_id, page, total_pages, "business_lunch_page",
+        weekday if explicit_weekday else None,
+        show_price_filters=True,
+        open_now=False if is_today else None,
+        distance_sorted=False,
+        list_callback=f"bl_list:{weekday}:{math.ceil(page / LIST_PAGE_SIZE)}"
+    )
     
-    if place['description']:
-        text += f"📝 {place['description']}\n\n"
+    render_cache.set(cache_key, text, reply_markup)
+    return text, reply_markup
+
+@router.callback_query(F.data.startswith("bl_list:"))
+async def callback_business_lunch_list(callback: CallbackQuery):
+    """Обработчик компактного списка бизнес-ланчей (несколько заведений на странице)"""
+    # Формат: bl_list:день:страница
+    _, weekday_part, page_part = callback.data.split(":")
+    weekday = int(weekday_part)
+    page = int(page_part)
     
-    # Добавляем информацию об отзывах
-    if reviews:
-        avg_rating = sum(r['rating'] for r in reviews) / len(reviews)
-        text += f"⭐ *Рейтинг:* {avg_rating:.1f} ({len(reviews)} отзывов)\n"
+    db = Database()
+    
+    # Получаем город пользователя
+    user_id = callback.from_user.id
+    city = await db.get_user_city(user_id)
+    
+    if not city:
+        await callback.message.edit_text(
+            "Пожалуйста, сначала выберите город, используя команду /start.",
+            reply_markup=get_start_keyboard()
+        )
+        await callback.answer()
+        return
+    
+    total = await _count_lunches(db, city, weekday, city_clock(city))
+    
+    if total == 0:
+        await callback.message.edit_text(
+            f"К сожалению, заведений с бизнес-ланчами в городе {city} на {_get_weekday_name(weekday)} пока нет в базе.",
+            reply_markup=get_start_keyboard()
+        )
+        await callback.answer()
+        return
+    
+    total_pages = math.ceil(total / LIST_PAGE_SIZE)
+    page = min(max(page, 1), total_pages)
+    
+    cache_key = ("bl_list", city, weekday, page)
+    screen = render_cache.get(cache_key)
+    if screen:
+        text, reply_markup = screen
     else:
-        text += "⭐ *Рейтинг:* Нет отзывов\n"
+        offset = (page - 1) * LIST_PAGE_SIZE
+        
+        # Вся страница вместе с рейтингами берется одним запросом
+        places = await db.get_business_lunches(
+            city, limit=LIST_PAGE_SIZE, offset=offset, weekday=weekday, with_ratings=True
+        )
+        
+        text = f"🍽️ *Бизнес-ланчи на {_get_weekday_name(weekday)}*\n\n"
+        for position, place in enumerate(places, offset + 1):
+            text += f"{position}. *{place['name']}* — {place['price']:g} руб., {place['start_time']}-{place['end_time']}"
+            if place['review_count']:
+                text += f", ⭐ {place['avg_rating']:.1f}"
+            text += "\n"
+        text += "\nВыберите номер заведения, чтобы открыть карточку."
+        
+        reply_markup = get_place_list_keyboard(
+            list(range(offset + 1, offset + len(places) + 1)), page, total_pages,
+            "business_lunch_page", f"bl_list:{weekday}",
+            cards_callback=f"business_lunch_page:{offset + 1}:{weekday}",
+            item_suffix=f":{weekday}"
+        )
+        render_cache.set(cache_key, text, reply_markup)
     
     await callback.message.edit_text(
         text,
-        reply_markup=get_full_place_details_keyboard(
-            place_id, page, total_pages, "business_lunch_page"
-        ),
+        reply_markup=reply_markup,
         parse_mode="Markdown"
     )
     
     await callback.answer()
 
-@router.callback_query(F.data.startswith("business_lunch_page:"))
-async def callback_business_lunch_page(callback: CallbackQuery):
-    """Обработчик пагинации для бизнес-ланчей"""
-    parts = callback.data.split(":")
-    page = int(parts[1])
-    
-    # Если указан день недели, используем его, иначе берем текущий
-    weekday = int(parts[2]) if len(parts) > 2 else None
-    if weekday is None:
-        weekday = datetime.now().isoweekday()
+@router.callback_query(F.data.startswith("bl_now:"))
+async def callback_business_lunch_now(callback: CallbackQuery):
+    """Обработчик списка бизнес-ланчей, которые идут сейчас или скоро начнутся"""
+    page = int(callback.data.split(":")[1])
     
     db = Database()
     
@@ -123,15 +278,26 @@ async def callback_business_lunch_page(callback: CallbackQuery):
         await callback.answer()
         return
     
-    # Получаем количество заведений с бизнес-ланчами
-    total = await db.count_business_lunches(city, weekday=weekday)
+    clock = city_clock(city)
+    weekday = clock.weekday()
+    now_minute = clock.minute()
+    
+    total = await db.count_business_lunches(city, weekday=weekday, open_at=now_minute)
+    
+    if total == 0:
+        await callback.message.edit_text(
+            f"Сейчас в городе {city} нет идущих бизнес-ланчей, и в ближайшие полчаса ни один не начнётся.",
+            reply_markup=get_start_keyboard()
+        )
+        await callback.answer()
+        return
     
-    # Получаем запрошенную страницу результатов
     per_page = 1  # Показываем по одному заведению на странице
     total_pages = math.ceil(total / per_page)
+    page = min(page, total_pages)
     offset = (page - 1) * per_page
     
-    places = await db.get_business_lunches(city, limit=per_page, offset=offset, weekday=weekday)
+    places = await db.get_business_lunches(city, limit=per_page, offset=offset, weekday=weekday, open_at=now_minute)
     
     if not places:
         await callback.message.edit_text(
@@ -147,35 +313,199 @@ async def callback_business_lunch_page(callback: CallbackQuery):
     # Получаем отзывы
     reviews = await db.get_reviews_by_place_id(place_id)
     
-    # Формируем полный текст с информацией о заведении
-    text = f"🍽️ *Бизнес-ланч на {_get_weekday_name(weekday)}*\n\n"
-    text += f"*{place['name']}*\n"
-    text += f"📍 *Адрес:* {place['address']}\n"
-    text += f"🏙️ *Город:* {place['city']}\n\n"
-    text += f"🍽️ *Бизнес-ланч:*\n"
-    text += f"💰 Цена: {place['price']} руб.\n"
-    text += f"⏰ Время: {place['start_time']} - {place['end_time']}\n"
+    text = _format_lunch_card(place, reviews, weekday, now_minute)
     
-    if place['description']:
-        text += f"📝 {place['description']}\n\n"
+    await callback.message.edit_text(
+        text,
+        reply_markup=get_full_place_details_keyboard(
+            place_id, page, total_pages, "bl_now",
+            show_price_filters=True,
+            open_now=True
+        ),
+        parse_mode="Markdown"
+    )
     
-    # Добавляем информацию об отзывах
-    if reviews:
-        avg_rating = sum(r['rating'] for r in reviews) / len(reviews)
-        text += f"⭐ *Рейтинг:* {avg_rating:.1f} ({len(reviews)} отзывов)\n"
-    else:
-        text += "⭐ *Рейтинг:* Нет отзывов\n"
+    await callback.answer()
+
+@router.callback_query(F.data.startswith("bl_price:"))
+async def callback_business_lunch_price(callback: CallbackQuery):
+    """Обработчик списка бизнес-ланчей, отсортированного по цене"""
+    # Формат: bl_price:день:макс_цена:страница:направление:цена_курсора:id_ланча
+    _, weekday_part, max_price_part, page_part, direction, cursor_price, cursor_id = callback.data.split(":")
+    weekday = int(weekday_part) if weekday_part else None
+    max_price = float(max_price_part) if max_price_part else None
+    page = int(page_part)
+    cursor = (float(cursor_price), int(cursor_id)) if cursor_id else None
+    
+    db = Database()
+    
+    # Получаем город пользователя
+    user_id = callback.from_user.id
+    city = await db.get_user_city(user_id)
+    
+    if not city:
+        await callback.message.edit_text(
+            "Пожалуйста, сначала выберите город, используя команду /start.",
+            reply_markup=get_start_keyboard()
+        )
+        await callback.answer()
+        return
+    
+    display_weekday = weekday if weekday is not None else city_clock(city).weekday()
+    
+    # Страница с курсором однозначно задается callback_data
+    cache_key = ("bl_price", city, display_weekday, callback.data)
+    screen = render_cache.get(cache_key)
+    if screen:
+        text, reply_markup = screen
+        await callback.message.edit_text(text, reply_markup=reply_markup, parse_mode="Markdown")
+        await callback.answer()
+        return
+    
+    total = await db.count_business_lunches_by_price(city, weekday=weekday, max_price=max_price)
+    
+    if total == 0:
+        limit_text = f" до {max_price:g} руб." if max_price is not None else ""
+        await callback.message.edit_text(
+            f"К сожалению, бизнес-ланчей{limit_text} в городе {city} на {_get_weekday_name(display_weekday)} не найдено.",
+            reply_markup=get_start_keyboard()
+        )
+        await callback.answer()
+        return
+    
+    # Показываем по одному заведению на странице, страницы берутся по курсору (цена, id ланча)
+    places = await db.get_business_lunches_by_price(
+        city, weekday=weekday, max_price=max_price,
+        cursor=cursor, backward=direction == "p", limit=1
+    )
+    
+    if not places:
+        await callback.message.edit_text(
+            "К сожалению, произошла ошибка при получении данных.",
+            reply_markup=get_start_keyboard()
+        )
+        await callback.answer()
+        return
+    
+    place = places[0]
+    place_id = place['id']
+    place_cursor = (place['price'], place['lunch_id'])
+    
+    # Получаем отзывы
+    reviews = await db.get_reviews_by_place_id(place_id)
+    
+    text = _format_lunch_card(place, reviews, display_weekday)
+    reply_markup = get_full_place_details_keyboard(
+        place_id, page, total, "bl_price", weekday,
+        nav_callbacks=(
+            lunch_price_callback(weekday, max_price, page - 1, place_cursor, backward=True),
+            lunch_price_callback(weekday, max_price, page + 1, place_cursor)
+        ),
+        show_price_filters=True,
+        price_sorted=True
+    )
+    render_cache.set(cache_key, text, reply_markup)
+    
+    await callback.message.edit_text(
+        text,
+        reply_markup=reply_markup,
+        parse_mode="Markdown"
+    )
+    
+    await callback.answer()
+
+@router.callback_query(F.data.startswith("bl_dist:"))
+async def callback_business_lunch_distance(callback: CallbackQuery):
+    """Обработчик списка бизнес-ланчей, отсортированного по расстоянию от пользователя"""
+    # Формат: bl_dist:день:страница
+    _, weekday_part, page_part = callback.data.split(":")
+    page = int(page_part)
+    
+    db = Database()
+    
+    # Получаем город пользователя
+    user_id = callback.from_user.id
+    city = await db.get_user_city(user_id)
+    
+    if not city:
+        await callback.message.edit_text(
+            "Пожалуйста, сначала выберите город, используя команду /start.",
+            reply_markup=get_start_keyboard()
+        )
+        await callback.answer()
+        return
+    
+    location = await db.get_user_location(user_id)
+    if not location:
+        await callback.message.answer(
+            "📍 Чтобы отсортировать заведения по расстоянию, отправьте свою геопозицию.",
+            reply_markup=get_location_request_keyboard()
+        )
+        await callback.answer()
+        return
+    
+    weekday = int(weekday_part) if weekday_part else city_clock(city).weekday()
+    order = await _get_distance_order(db, user_id, city, weekday, location)
+    
+    if not order:
+        await callback.message.edit_text(
+            f"К сожалению, заведений с бизнес-ланчами в городе {city} на {_get_weekday_name(weekday)} пока нет в базе.",
+            reply_markup=get_start_keyboard()
+        )
+        await callback.answer()
+        return
+    
+    # Страницы берутся из готового порядка, расстояния заново не считаются
+    total_pages = len(order)
+    page = min(max(page, 1), total_pages)
+    distance, place_id = order[page - 1]
+    
+    lunches = await db.get_business_lunches_by_place_ids([place_id], weekday)
+    place = lunches.get(place_id)
+    
+    if not place:
+        await callback.message.edit_text(
+            "К сожалению, произошла ошибка при получении данных.",
+            reply_markup=get_start_keyboard()
+        )
+        await callback.answer()
+        return
+    
+    # Получаем отзывы
+    reviews = await db.get_reviews_by_place_id(place_id)
+    
+    text = _format_lunch_card(place, reviews, weekday, distance_km=distance)
     
     await callback.message.edit_text(
         text,
         reply_markup=get_full_place_details_keyboard(
-            place_id, page, total_pages, "business_lunch_page", weekday
+            place_id, page, total_pages, "bl_dist", weekday,
+            nav_callbacks=(
+                f"bl_dist:{weekday_part}:{page - 1}",
+                f"bl_dist:{weekday_part}:{page + 1}"
+            ),
+            show_price_filters=True,
+            distance_sorted=True
         ),
         parse_mode="Markdown"
     )
     
     await callback.answer()
 
+@router.callback_query(F.data.startswith("price_limit:"))
+async def callback_price_limit(callback: CallbackQuery):
+    """Обработчик кнопки 'Цена до…' для бизнес-ланчей"""
+    weekday_part = callback.data.split(":")[1]
+    weekday = int(weekday_part) if weekday_part else None
+    
+    await callback.message.edit_text(
+        "💸 *Выберите максимальную цену бизнес-ланча:*",
+        reply_markup=get_price_limit_keyboard(weekday=weekday),
+        parse_mode="Markdown"
+    )
+    
+    await callback.answer()
+
 @router.callback_query(F.data.startswith("select_day:"))
 async def callback_select_day(callback: CallbackQuery):
     """Обработчик выбора дня недели"""
@@ -183,10 +513,13 @@ async def callback_select_day(callback: CallbackQuery):
     place_id = int(parts[1])
     page = int(parts[2])
     
+    # Текущий день недели отмечаем по часовому поясу города пользователя
+    city = await Database().get_user_city(callback.from_user.id)
+    
     await callback.message.edit_text(
         "📅 *Выберите день недели:*",
         reply_markup=get_weekday_selection_keyboard(
-            place_id, page, "business_lunch_day"
+            place_id, page, "business_lunch_day", city_clock(city).weekday()
         ),
         parse_mode="Markdown"
     )
@@ -211,6 +544,15 @@ async def callback_place_details(callback: CallbackQuery):
     # Если указан день недели, используем его, иначе берем текущий
     weekday = int(parts[2]) if len(parts) > 2 else None
     
+    # Карточку на конкретный день берем из кэша экранов ("сегодня" зависит от даты)
+    cache_key = ("place", place_id, weekday)
+    screen = render_cache.get(cache_key) if weekday else None
+    if screen:
+        text, reply_markup = screen
+        await callback.message.edit_text(text, reply_markup=reply_markup, parse_mode="Markdown")
+        await callback.answer()
+        return
+    
     db = Database()
     
     # Получаем информацию о заведении
@@ -250,9 +592,13 @@ async def callback_place_details(callback: CallbackQuery):
     else:
         text += "⭐ *Рейтинг:* Нет отзывов\n\n"
     
+    reply_markup = get_place_details_keyboard(place_id)
+    if weekday:
+        render_cache.set(cache_key, text, reply_markup)
+    
     await callback.message.edit_text(
         text,
-        reply_markup=get_place_details_keyboard(place_id),
+        reply_markup=reply_markup,
         parse_mode="Markdown"
     )
     
@@ -403,6 +749,87 @@ async def callback_all_lunches(callback: CallbackQuery):
     
     await callback.answer()
 
+async def _count_lunches(db: Database, city: str, weekday: int, clock: CityClock) -> int:
+    """
+    Возвращает количество заведений с бизнес-ланчами из кэша
+    
+    Ключ для сегодняшнего списка содержит местную дату города, поэтому он
+    сменяется в полночь по времени города, а не сервера.
+    """
+    day_key = clock.today() if weekday == clock.weekday() else weekday
+    cache_key = (city, day_key)
+    total = _lunch_count_cache.get(cache_key)
+    if total is None:
+        total = await db.count_business_lunches(city, weekday=weekday)
+        _lunch_count_cache.set(cache_key, total)
+    return total
+
+async def _get_distance_order(db: Database, user_id: int, city: str, weekday: int,
+                              location: Tuple[float, float]) -> List[Tuple[Optional[float], int]]:
+    """
+    Возвращает заведения с бизнес-ланчами на день недели по возрастанию расстояния от пользователя
+    
+    Порядок считается один раз для геопозиции пользователя и кэшируется до изменения
+    данных о заведениях. Заведения без координат идут в конце списка по алфавиту.
+    
+    Returns:
+        Список пар (расстояние в км или None, ID заведения)
+    """
+    cache_key = (user_id, city, weekday, location)
+    order = _distance_order_cache.get(cache_key)
+    if order is None:
+        await tag_index.refresh(db)
+        lunch_place_ids = tag_index.page(city, tag_index.query(city, weekday=weekday))
+        order = await spatial_index.distance_order(db, city, *location, allowed=set(lunch_place_ids))
+        located = {place_id for _, place_id in order}
+        order += [(None, place_id) for place_id in lunch_place_ids if place_id not in located]
+        _distance_order_cache.set(cache_key, order)
+    return order
+
+def _format_lunch_card(place: dict, reviews: list, weekday: int, now_minute: Optional[int] = None,
+                       distance_km: Optional[float] = None) -> str:
+    """
+    Формирует текст карточки заведения с бизнес-ланчем
+    
+    Args:
+        place: Заведение с данными бизнес-ланча
+        reviews: Отзывы о заведении
+        weekday: День недели (1-7)
+        now_minute: Текущее время в минутах от полуночи, чтобы показать статус ланча
+        distance_km: Расстояние от пользователя до заведения
+    """
+    text = f"🍽️ *Бизнес-ланч на {_get_weekday_name(weekday)}*\n\n"
+    text += f"*{place['name']}*\n"
+    text += f"📍 *Адрес:* {place['address']}\n"
+    if distance_km is not None:
+        text += f"🚶 *До заведения:* {format_distance(distance_km)}\n"
+    text += f"🏙️ *Город:* {place['city']}\n\n"
+    text += f"🍽️ *Бизнес-ланч:*\n"
+    text += f"💰 Цена: {place['price']} руб.\n"
+    text += f"⏰ Время: {place['start_time']} - {place['end_time']}\n"
+    
+    start_minute, end_minute = place.get('start_minute'), place.get('end_minute')
+    if now_minute is not None and start_minute is not None and end_minute is not None:
+        # Ланч вроде 22:00 - 02:00 идет через полночь
+        through_midnight = end_minute < start_minute
+        if start_minute <= now_minute < end_minute or through_midnight and (
+                now_minute >= start_minute or now_minute < end_minute):
+            text += f"🟢 Идёт сейчас, до {format_minutes(end_minute)}\n"
+        elif now_minute < start_minute:
+            text += f"🕐 Начнётся через {start_minute - now_minute} мин.\n"
+    
+    if place['description']:
+        text += f"📝 {place['description']}\n\n"
+    
+    # Добавляем информацию об отзывах
+    if reviews:
+        avg_rating = sum(r['rating'] for r in reviews) / len(reviews)
+        text += f"⭐ *Рейтинг:* {avg_rating:.1f} ({len(reviews)} отзывов)\n"
+    else:
+        text += "⭐ *Рейтинг:* Нет отзывов\n"
+    
+    return text
+
 def _get_weekday_name(weekday: int) -> str:
     """Возвращает название дня недели по его номеру"""
     weekdays = {
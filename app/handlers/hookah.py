@@ -1,11 +1,12 @@
 from aiogram import Router, F
 from aiogram.types import CallbackQuery
-from app.database import Database
+from app.database import Database, tag_index
 from app.keyboards import (
-    get_search_results_keyboard, 
-    get_start_keyboard, 
+    get_search_results_keyboard,
+    get_start_keyboard,
     get_full_place_details_keyboard
 )
+from app.utils.cache import render_cache
 import math
 
 router = Router()
@@ -13,149 +14,100 @@ router = Router()
 @router.callback_query(F.data == "hookah")
 async def callback_hookah(callback: CallbackQuery):
     """Обработчик кнопки 'Кальяны'"""
+    await _show_hookah_page(callback, page=1)
+
+@router.callback_query(F.data.startswith("hookah_page:"))
+async def callback_hookah_page(callback: CallbackQuery):
+    """Обработчик пагинации для кальянов"""
+    # Формат: hookah_page:page (старые кнопки: hookah_page:query:page)
+    page = int(callback.data.split(":")[-1])
+    await _show_hookah_page(callback, page)
+
+async def _show_hookah_page(callback: CallbackQuery, page: int):
+    """Показывает страницу со списком заведений с кальянами"""
     db = Database()
-    
-    # Для кальянов используем ту же логику, что и для бизнес-ланчей,
-    # но ищем заведения с категорией "кальян"
-    query = "кальян"
+
     # Получаем город пользователя
     user_id = callback.from_user.id
-    db = Database()
     city = await db.get_user_city(user_id)
-    total = await db.count_search_results(query, city)
-    
-    if total == 0:
-        await callback.message.edit_text(
-            "К сожалению, заведений с кальянами пока нет в базе.",
-            reply_markup=get_start_keyboard()
-        )
+
+    # Готовая страница из кэша экранов
+    cache_key = ("hookah", city, page)
+    screen = render_cache.get(cache_key)
+    if screen:
+        text, reply_markup = screen
+        await callback.message.edit_text(text, reply_markup=reply_markup, parse_mode="Markdown")
         await callback.answer()
         return
-    
-    # Получаем первую страницу результатов
-    page = 1
+
+    # Заведения с кальянами берем из индекса тегов
     per_page = 1  # Показываем по одному заведению на странице
-    total_pages = math.ceil(total / per_page)
     offset = (page - 1) * per_page
-    
-    places = await db.search_places_by_menu(query,city=city, limit=per_page, offset=offset)
-    
-    if not places:
+    place_ids, total = await tag_index.find_places(
+        db, city, ["hookah"], offset=offset, limit=per_page
+    )
+
+    if total == 0:
         await callback.message.edit_text(
-            "К сожалению, произошла ошибка при получении данных.",
+            "К сожалению, заведений с кальянами пока нет в базе.",
             reply_markup=get_start_keyboard()
         )
         await callback.answer()
         return
-    
-    place = places[0]
-    place_id = place['id']
-    
-    # Получаем позиции меню для заведения, связанные с кальянами
-    menu_items = await db.get_menu_items_by_place_id(place_id)
-    hookah_items = [item for item in menu_items if "кальян" in item['category'].lower()]
-    
-    # Получаем отзывы
-    reviews = await db.get_reviews_by_place_id(place_id)
-    
-    # Формируем полный текст с информацией о заведении
-    text = f"💨 *Заведения с кальянами*\n\n"
-    text += f"*{place['name']}*\n"
-    text += f"📍 *Адрес:* {place['address']}\n\n"
-    
-    # Показываем кальяны в меню
-    text += f"*Кальяны в меню:*\n"
-    for item in hookah_items[:3]:  # Показываем только первые 3 позиции
-        text += f"• {item['name']} - {item['price']} руб.\n"
-    
-    if len(hookah_items) > 3:
-        text += f"...и еще {len(hookah_items) - 3} видов кальянов\n"
-    
-    text += "\n"
-    
-    # Добавляем информацию об отзывах
-    if reviews:
-        avg_rating = sum(r['rating'] for r in reviews) / len(reviews)
-        text += f"⭐ *Рейтинг:* {avg_rating:.1f} ({len(reviews)} отзывов)\n"
-    else:
-        text += "⭐ *Рейтинг:* Нет отзывов\n"
-    
-    await callback.message.edit_text(
-        text,
-        reply_markup=get_full_place_details_keyboard(
-            place_id, page, total_pages, f"hookah_page:{query}"
-        ),
-        parse_mode="Markdown"
-    )
-    
-    await callback.answer()
 
-@router.callback_query(F.data.startswith("hookah_page:"))
-async def callback_hookah_page(callback: CallbackQuery):
-    """Обработчик пагинации для кальянов"""
-    # Формат: hookah_page:query:page
-    parts = callback.data.split(":")
-    query = parts[1]
-    page = int(parts[2])
-    
-    db = Database()
-    user_id = callback.from_user.id
-    city = await db.get_user_city(user_id)
-    total = await db.count_search_results(query, city)
-    
-    # Получаем запрошенную страницу результатов
-    per_page = 1  # Показываем по одному заведению на странице
     total_pages = math.ceil(total / per_page)
-    offset = (page - 1) * per_page
-    
-    places = await db.search_places_by_menu(query, city=city, limit=per_page, offset=offset)
-    
-    if not places:
+    place = await db.get_place_by_id(place_ids[0]) if place_ids else None
+
+    if not place:
         await callback.message.edit_text(
             "К сожалению, произошла ошибка при получении данных.",
             reply_markup=get_start_keyboard()
         )
         await callback.answer()
         return
-    
-    place = places[0]
+
     place_id = place['id']
-    
-    # Получаем позиции меню для заведения, связанные с кальянами
-    menu_items = await db.get_menu_items_by_place_id(place_id)
-    hookah_items = [item for item in menu_items if "кальян" in item['category'].lower()]
-    
+
+    # Получаем первые позиции меню для заведения, связанные с кальянами
+    hookah_items, hookah_total = await db.get_matching_menu_items(
+        place_id, "кальян", limit=3, category_only=True
+    )
+
     # Получаем отзывы
     reviews = await db.get_reviews_by_place_id(place_id)
-    
+
     # Формируем полный текст с информацией о заведении
     text = f"💨 *Заведения с кальянами*\n\n"
     text += f"*{place['name']}*\n"
     text += f"📍 *Адрес:* {place['address']}\n\n"
-    
+
     # Показываем кальяны в меню
-    text += f"*Кальяны в меню:*\n"
-    for item in hookah_items[:3]:  # Показываем только первые 3 позиции
-        text += f"• {item['name']} - {item['price']} руб.\n"
-    
-    if len(hookah_items) > 3:
-        text += f"...и еще {len(hookah_items) - 3} видов кальянов\n"
-    
-    text += "\n"
-    
+    if hookah_items:
+        text += f"*Кальяны в меню:*\n"
+        for item in hookah_items:  # Показываем только первые 3 позиции
+            text += f"• {item['name']} - {item['price']} руб.\n"
+
+        if hookah_total > 3:
+            text += f"...и еще {hookah_total - 3} видов кальянов\n"
+
+        text += "\n"
+
     # Добавляем информацию об отзывах
     if reviews:
         avg_rating = sum(r['rating'] for r in reviews) / len(reviews)
         text += f"⭐ *Рейтинг:* {avg_rating:.1f} ({len(reviews)} отзывов)\n"
     else:
         text += "⭐ *Рейтинг:* Нет отзывов\n"
-    
+
+    reply_markup = get_full_place_details_keyboard(
+        place_id, page, total_pages, "hookah_page"
+    )
+    render_cache.set(cache_key, text, reply_markup)
+
     await callback.message.edit_text(
         text,
-        reply_markup=get_full_place_details_keyboard(
-            place_id, page, total_pages, f"hookah_page:{query}"
-        ),
+        reply_markup=reply_markup,
         parse_mode="Markdown"
     )
-    
-    await callback.answer() 
\ No newline at end of file
+
+    await callback.answer()
@@ -1,5 +1,5 @@
 from aiogram import Router, F
-from aiogram.types import CallbackQuery, Message
+from aiogram.types import CallbackQuery, Message, InlineKeyboardMarkup
 from aiogram.filters import StateFilter
 from aiogram.fsm.state import State, StatesGroup
 from aiogram.fsm.context import FSMContext
@@ -11,8 +11,15 @@ from app.keyboards import (
     get_menu_search_pagination_keyboard,
     get_menu_categories_keyboard,
     get_menu_items_by_category_keyboard,
-    get_back_to_place_keyboard
+    get_back_to_place_keyboard,
+    get_price_limit_keyboard,
+    get_price_comparison_keyboard,
+    menu_price_callback
 )
+from app.database.search import normalize_search_text
+from app.utils.cache import VersionedCache, render_cache
+from app.utils.prefetch import prefetcher
+from typing import Optional, Tuple
 import math
 
 router = Router()
@@ -20,6 +27,16 @@ router = Router()
 class MenuSearch(StatesGroup):
     waiting_for_query = State()
 
+# Кэш таблиц сравнения цен по (город, запрос)
+_price_comparison_cache = VersionedCache(maxsize=512)
+
+# Количество найденных заведений по (город, запрос)
+_search_count_cache = VersionedCache(maxsize=1024)
+
+# Количество найденных заведений для сортировки по цене по (город, запрос, макс_цена)
+_price_count_cache = VersionedCache(maxsize=1024)
+COMPARISON_SIZE = 10
+
 @router.callback_query(F.data == "menu_search")
 async def callback_menu_search(callback: CallbackQuery, state: FSMContext):
     """Обработчик кнопки 'Поиск по меню'"""
@@ -60,7 +77,7 @@ async def process_menu_search(message: Message, state: FSMContext):
         return
     
     # Выполняем поиск
-    total = await db.count_search_results(query, city)
+    total = await _count_search_results(db, city, query)
     
     if total == 0:
         await message.answer(
@@ -71,15 +88,13 @@ async def process_menu_search(message: Message, state: FSMContext):
         await state.clear()
         return
     
-    # Получаем первую страницу результатов
-    page = 1
-    per_page = 1  # Показываем по одному заведению на странице
-    total_pages = math.ceil(total / per_page)
-    offset = (page - 1) * per_page
+    # Запрос сохраняется один раз при вводе, кнопки страниц передают его ID
+    query_id = await db.get_search_query_id(query)
     
-    places = await db.search_places_by_menu(query, city, limit=per_page, offset=offset)
+    # Получаем первую страницу результатов
+    screen = await _render_search_page(db, city, query, query_id, 1)
     
-    if not places:
+    if not screen:
         await message.answer(
             "К сожалению, произошла ошибка при получении данных.",
             reply_markup=get_start_keyboard()
@@ -87,60 +102,36 @@ async def process_menu_search(message: Message, state: FSMContext):
         await state.clear()
         return
     
-    place = places[0]
-    place_id = place['id']
-    
-    # Получаем позиции меню для заведения, соответствующие запросу
-    menu_items = await db.get_menu_items_by_place_id(place_id)
-    matching_items = [item for item in menu_items if query.lower() in item['name'].lower() or query.lower() in item['category'].lower()]
-    
-    # Получаем отзывы
-    reviews = await db.get_reviews_by_place_id(place_id)
-    
-    # Формируем полный текст с информацией о заведении
-    text = f"🔍 *Результаты поиска по запросу:* {query}\n\n"
-    text += f"*{place['name']}*\n"
-    text += f"📍 *Адрес:* {place['address']}\n\n"
-    
-    # Показываем найденные позиции меню
-    text += f"*Найденные позиции меню:*\n"
-    for item in matching_items[:3]:  # Показываем только первые 3 позиции
-        text += f"• {item['name']} - {item['price']} руб. ({item['category']})\n"
-    
-    if len(matching_items) > 3:
-        text += f"...и еще {len(matching_items) - 3} позиций\n"
-    
-    text += "\n"
-    
-    # Добавляем информацию об отзывах
-    if reviews:
-        avg_rating = sum(r['rating'] for r in reviews) / len(reviews)
-        text += f"⭐ *Рейтинг:* {avg_rating:.1f} ({len(reviews)} отзывов)\n"
-    else:
-        text += "⭐ *Рейтинг:* Нет отзывов\n"
-    
+    text, reply_markup = screen
     await message.answer(
         text,
-        reply_markup=get_menu_search_pagination_keyboard(
-            places, page, total_pages, query, place_id
-        ),
+        reply_markup=reply_markup,
         parse_mode="Markdown"
     )
     
     # Очищаем состояние
     await state.clear()
+    
+    # Готовим заранее вторую страницу результатов
+    if total > 1:
+        prefetcher.schedule(user_id, _render_search_page, db, city, query, query_id, 2)
 
 @router.callback_query(F.data.startswith("menu_search_page:"))
 async def callback_menu_search_page(callback: CallbackQuery):
     """Обработчик пагинации для результатов поиска по меню"""
-    # Формат: menu_search_page:query:page
+    # Формат: menu_search_page:id_запроса:страница
     parts = callback.data.split(":")
-    query = parts[1]
+    query_id = int(parts[1])
     page = int(parts[2])
     
+    db = Database()
+    query = await db.get_search_query(query_id)
+    if query is None:
+        await callback.answer("Поиск устарел, повторите запрос", show_alert=True)
+        return
+    
     # Получаем город пользователя
     user_id = callback.from_user.id
-    db = Database()
     city = await db.get_user_city(user_id)
     
     if not city:
@@ -151,7 +142,54 @@ async def callback_menu_search_page(callback: CallbackQuery):
         await callback.answer()
         return
     
-    total = await db.count_search_results(query, city)
+    screen = await _render_search_page(db, city, query, query_id, page)
+    
+    if not screen:
+        await callback.message.edit_text(
+            "К сожалению, произошла ошибка при получении данных.",
+            reply_markup=get_start_keyboard()
+        )
+        await callback.answer()
+        return
+    
+    text, reply_markup = screen
+    await callback.message.edit_text(
+        text,
+        reply_markup=reply_markup,
+        parse_mode="Markdown"
+    )
+    
+    await callback.answer()
+    
+    # Обычно следующий клик - на следующую страницу, готовим ее заранее
+    if page < await _count_search_results(db, city, query):
+        prefetcher.schedule(user_id, _render_search_page, db, city, query, query_id, page + 1)
+
+async def _count_search_results(db: Database, city: str, query: str) -> int:
+    """Возвращает количество заведений, найденных по запросу, из кэша"""
+    cache_key = (city, normalize_search_text(query))
+    total = _search_count_cache.get(cache_key)
+    if total is None:
+        total = await db.count_search_results(query, city)
+        _search_count_cache.set(cache_key, total)
+    return total
+
+async def _render_search_page(db: Database, city: str, query: str, query_id: int,
+                              page: int) -> Optional[Tuple[str, InlineKeyboardMarkup]]:
+    """
+    Формирует страницу результатов поиска по меню (одно заведение) или берет ее из кэша экранов
+    
+    query_id - ID запроса из Database.get_search_query_id для callback_data кнопок
+    
+    Returns:
+        Пара (текст, клавиатура) или None, если на странице нет заведения
+    """
+    cache_key = ("menu_search", city, query, page)
+    screen = render_cache.get(cache_key)
+    if screen:
+        return screen
+    
+    total = await _count_search_results(db, city, query)
     
     # Получаем запрошенную страницу результатов
     per_page = 1  # Показываем по одному заведению на странице
@@ -161,64 +199,38 @@ async def callback_menu_search_page(callback: CallbackQuery):
     places = await db.search_places_by_menu(query, city, limit=per_page, offset=offset)
     
     if not places:
-        await callback.message.edit_text(
-            "К сожалению, произошла ошибка при получении данных.",
-            reply_markup=get_start_keyboard()
-        )
-        await callback.answer()
-        return
+        return None
     
     place = places[0]
     place_id = place['id']
     
-    # Получаем позиции меню для заведения, соответствующие запросу
-    menu_items = await db.get_menu_items_by_place_id(place_id)
-    matching_items = [item for item in menu_items if query.lower() in item['name'].lower() or query.lower() in item['category'].lower()]
+    # Получаем первые позиции меню для заведения, соответствующие запросу
+    matching_items, matching_total = await db.get_matching_menu_items(place_id, query, limit=3)
     
     # Получаем отзывы
     reviews = await db.get_reviews_by_place_id(place_id)
     
     # Формируем полный текст с информацией о заведении
-    text = f"🔍 *Результаты поиска по запросу:* {query}\n\n"
-    text += f"*{place['name']}*\n"
-    text += f"📍 *Адрес:* {place['address']}\n\n"
-    
-    # Показываем найденные позиции меню
-    text += f"*Найденные позиции меню:*\n"
-    for item in matching_items[:3]:  # Показываем только первые 3 позиции
-        text += f"• {item['name']} - {item['price']} руб. ({item['category']})\n"
-    
-    if len(matching_items) > 3:
-        text += f"...и еще {len(matching_items) - 3} позиций\n"
-    
-    text += "\n"
-    
-    # Добавляем информацию об отзывах
-    if reviews:
-        avg_rating = sum(r['rating'] for r in reviews) / len(reviews)
-        text += f"⭐ *Рейтинг:* {avg_rating:.1f} ({len(reviews)} отзывов)\n"
-    else:
-        text += "⭐ *Рейтинг:* Нет отзывов\n"
-    
-    await callback.message.edit_text(
-        text,
-        reply_markup=get_menu_search_pagination_keyboard(
-            places, page, total_pages, query, place_id
-        ),
-        parse_mode="Markdown"
+    text = _format_search_card(place, query, matching_items, matching_total, reviews)
+    reply_markup = get_menu_search_pagination_keyboard(
+        places, page, total_pages, place_id, query_id
     )
     
-    await callback.answer()
+    render_cache.set(cache_key, text, reply_markup)
+    return text, reply_markup
 
 @router.callback_query(F.data.startswith("menu_all_items:"))
 async def callback_menu_all_items(callback: CallbackQuery):
     """Обработчик для просмотра всех позиций меню по запросу"""
-    # Формат: menu_all_items:place_id:query
+    # Формат: menu_all_items:place_id:id_запроса
     parts = callback.data.split(":")
     place_id = int(parts[1])
-    query = parts[2]
     
     db = Database()
+    query = await db.get_search_query(int(parts[2]))
+    if query is None:
+        await callback.answer("Поиск устарел, повторите запрос", show_alert=True)
+        return
     
     # Получаем информацию о заведении
     place = await db.get_place_by_id(place_id)
@@ -226,9 +238,8 @@ async def callback_menu_all_items(callback: CallbackQuery):
         await callback.answer("Заведение не найдено", show_alert=True)
         return
     
-    # Получаем все позиции меню для заведения
-    menu_items = await db.get_menu_items_by_place_id(place_id)
-    matching_items = [item for item in menu_items if query.lower() in item['name'].lower() or query.lower() in item['category'].lower()]
+    # Получаем все позиции меню заведения, соответствующие запросу
+    matching_items, _ = await db.get_matching_menu_items(place_id, query)
     
     if not matching_items:
         await callback.answer("Позиции меню не найдены", show_alert=True)
@@ -331,4 +342,202 @@ async def callback_menu_category(callback: CallbackQuery):
         parse_mode="Markdown"
     )
     
-    await callback.answer() 
\ No newline at end of file
+    await callback.answer() 
+
+@router.callback_query(F.data.startswith("menu_price:"))
+async def callback_menu_price(callback: CallbackQuery):
+    """Обработчик поиска по меню с сортировкой по цене"""
+    # Формат: menu_price:id_запроса:макс_цена:страница:направление:цена_курсора:id_заведения
+    _, query_id_part, max_price_part, page_part, direction, cursor_price, cursor_id = callback.data.split(":")
+    query_id = int(query_id_part)
+    max_price = float(max_price_part) if max_price_part else None
+    page = int(page_part)
+    cursor = (float(cursor_price), int(cursor_id)) if cursor_id else None
+    
+    db = Database()
+    query = await db.get_search_query(query_id)
+    if query is None:
+        await callback.answer("Поиск устарел, повторите запрос", show_alert=True)
+        return
+    
+    # Получаем город пользователя
+    user_id = callback.from_user.id
+    city = await db.get_user_city(user_id)
+    
+    if not city:
+        await callback.message.edit_text(
+            "Пожалуйста, сначала выберите город с помощью команды /start.",
+            reply_markup=get_start_keyboard()
+        )
+        await callback.answer()
+        return
+    
+    # Страница с курсором однозначно задается callback_data
+    cache_key = ("menu_price", city, callback.data)
+    screen = render_cache.get(cache_key)
+    if screen:
+        text, reply_markup = screen
+        await callback.message.edit_text(text, reply_markup=reply_markup, parse_mode="Markdown")
+        await callback.answer()
+        return
+    
+    count_key = (city, normalize_search_text(query), max_price)
+    total = _price_count_cache.get(count_key)
+    if total is None:
+        total = await db.count_search_results_by_price(query, city, max_price=max_price)
+        _price_count_cache.set(count_key, total)
+    
+    if total == 0:
+        limit_text = f" до {max_price:g} руб." if max_price is not None else ""
+        await callback.message.edit_text(
+            f"По запросу *{query}*{limit_text} ничего не найдено. Попробуйте другой запрос.",
+            reply_markup=get_start_keyboard(),
+            parse_mode="Markdown"
+        )
+        await callback.answer()
+        return
+    
+    # Показываем по одному заведению на странице, страницы берутся по курсору (цена, id заведения)
+    places = await db.search_places_by_menu_price(
+        query, city, max_price=max_price,
+        cursor=cursor, backward=direction == "p", limit=1
+    )
+    
+    if not places:
+        await callback.message.edit_text(
+            "К сожалению, произошла ошибка при получении данных.",
+            reply_markup=get_start_keyboard()
+        )
+        await callback.answer()
+        return
+    
+    place = places[0]
+    place_id = place['id']
+    place_cursor = (place['min_price'], place_id)
+    
+    # Получаем первые позиции меню для заведения, соответствующие запросу
+    matching_items, matching_total = await db.get_matching_menu_items(place_id, query, limit=3)
+    
+    # Получаем отзывы
+    reviews = await db.get_reviews_by_place_id(place_id)
+    
+    text = _format_search_card(place, query, matching_items, matching_total, reviews)
+    reply_markup = get_menu_search_pagination_keyboard(
+        places, page, total, place_id, query_id,
+        nav_callbacks=(
+            menu_price_callback(query_id, max_price, page - 1, place_cursor, backward=True),
+            menu_price_callback(query_id, max_price, page + 1, place_cursor)
+        ),
+        price_sorted=True
+    )
+    render_cache.set(cache_key, text, reply_markup)
+    
+    await callback.message.edit_text(
+        text,
+        reply_markup=reply_markup,
+        parse_mode="Markdown"
+    )
+    
+    await callback.answer()
+
+@router.callback_query(F.data.startswith("menu_price_limit:"))
+async def callback_menu_price_limit(callback: CallbackQuery):
+    """Обработчик кнопки 'Цена до…' для поиска по меню"""
+    query_id = int(callback.data.split(":", 1)[1])
+    query = await Database().get_search_query(query_id)
+    if query is None:
+        await callback.answer("Поиск устарел, повторите запрос", show_alert=True)
+        return
+    
+    await callback.message.edit_text(
+        f"💸 *Выберите максимальную цену для запроса* {query}*:*",
+        reply_markup=get_price_limit_keyboard(query_id=query_id),
+        parse_mode="Markdown"
+    )
+    
+    await callback.answer()
+
+@router.callback_query(F.data.startswith("menu_compare:"))
+async def callback_menu_compare(callback: CallbackQuery):
+    """Обработчик сравнения цен на позицию меню по всем заведениям города"""
+    # Формат: menu_compare:id_запроса
+    query_id = int(callback.data.split(":", 1)[1])
+    
+    db = Database()
+    query = await db.get_search_query(query_id)
+    if query is None:
+        await callback.answer("Поиск устарел, повторите запрос", show_alert=True)
+        return
+    
+    # Получаем город пользователя
+    user_id = callback.from_user.id
+    city = await db.get_user_city(user_id)
+    
+    if not city:
+        await callback.message.edit_text(
+            "Пожалуйста, сначала выберите город с помощью команды /start.",
+            reply_markup=get_start_keyboard()
+        )
+        await callback.answer()
+        return
+    
+    cache_key = (city, normalize_search_text(query))
+    text = _price_comparison_cache.get(cache_key)
+    if text is None:
+        items = await db.compare_menu_prices(query, city, limit=COMPARISON_SIZE)
+        text = _format_price_comparison(query, city, items) if items else ""
+        _price_comparison_cache.set(cache_key, text)
+    
+    if not text:
+        await callback.answer("Позиции меню не найдены", show_alert=True)
+        return
+    
+    await callback.message.edit_text(
+        text,
+        reply_markup=get_price_comparison_keyboard(query_id),
+        parse_mode="Markdown"
+    )
+    
+    await callback.answer()
+
+def _format_price_comparison(query: str, city: str, items: list) -> str:
+    """Формирует компактную таблицу самых дешёвых позиций меню в городе"""
+    text = f"📊 *Где дешевле всего «{query}» в городе {city}:*\n\n```\n"
+    for i, item in enumerate(items, 1):
+        details = item['place_name']
+        if item['description']:
+            details += f" · {item['description']}"
+        text += f"{i:>2}. {item['price']:>6g} ₽  {_shorten(item['name'], 24)}\n"
+        text += f"    {_shorten(details, 34)}\n"
+    text += "```"
+    return text
+
+def _shorten(value: str, width: int) -> str:
+    """Обрезает строку до заданной ширины для табличного вывода"""
+    value = value.replace("`", "'")
+    return value if len(value) <= width else value[:width - 1] + "…"
+
+def _format_search_card(place: dict, query: str, matching_items: list, matching_total: int, reviews: list) -> str:
+    """Формирует текст карточки заведения для результатов поиска по меню"""
+    text = f"🔍 *Результаты поиска по запросу:* {query}\n\n"
+    text += f"*{place['name']}*\n"
+    text += f"📍 *Адрес:* {place['address']}\n\n"
+    
+    # Показываем найденные позиции меню
+    text += f"*Найденные позиции меню:*\n"
+    for item in matching_items:  # Показываем только первые 3 позиции
+        text += f"• {item['name']} - {item['price']} руб. ({item['category']})\n"
+    
+    if matching_total > 3:
+        text += f"...и еще {matching_total - 3} позиций\n"
+    
+    text += "\n"
+    
+    # Добавляем информацию об отзывах
+    if reviews:
+        avg_rating = sum(r['rating'] for r in reviews) / len(reviews)
+        text += f"⭐ *Рейтинг:* {avg_rating:.1f} ({len(reviews)} отзывов)\n"
+    else:
+        text += "⭐ *Рейтинг:* Нет отзывов\n"
+    
+    return text
@@ -0,0 +1,76 @@
+from aiogram import Router, F
+from aiogram.types import CallbackQuery, Message
+from app.database import Database, tag_index, spatial_index
+from app.keyboards import (
+    get_start_keyboard,
+    get_location_request_keyboard,
+    get_nearby_places_keyboard
+)
+from app.utils.clock import city_clock
+from app.utils.geo import format_distance
+
+router = Router()
+
+# Сколько ближайших заведений показывать
+NEARBY_COUNT = 5
+
+@router.callback_query(F.data == "nearby")
+async def callback_nearby(callback: CallbackQuery):
+    """Обработчик кнопки 'Ланчи рядом'"""
+    await callback.message.answer(
+        "📍 Отправьте свою геопозицию, и я покажу ближайшие заведения с бизнес-ланчами на сегодня.",
+        reply_markup=get_location_request_keyboard()
+    )
+    await callback.answer()
+
+@router.message(F.location)
+async def process_location(message: Message):
+    """Обработчик геопозиции пользователя: показывает ближайшие бизнес-ланчи"""
+    db = Database()
+    user_id = message.from_user.id
+    city = await db.get_user_city(user_id)
+    
+    if not city:
+        await message.answer(
+            "Пожалуйста, сначала выберите город, используя команду /start."
+        )
+        return
+    
+    latitude = message.location.latitude
+    longitude = message.location.longitude
+    await db.set_user_location(user_id, latitude, longitude)
+    
+    # Кандидаты - заведения города с бизнес-ланчем сегодня из индекса фасетов
+    weekday = city_clock(city).weekday()
+    await tag_index.refresh(db)
+    lunch_place_ids = set(tag_index.page(city, tag_index.query(city, weekday=weekday)))
+    
+    nearest = await spatial_index.nearest(
+        db, city, latitude, longitude, k=NEARBY_COUNT, allowed=lunch_place_ids.__contains__
+    )
+    
+    if not nearest:
+        await message.answer(
+            f"К сожалению, рядом с вами нет заведений с бизнес-ланчами на сегодня в городе {city}.",
+            reply_markup=get_start_keyboard()
+        )
+        return
+    
+    lunches = await db.get_business_lunches_by_place_ids([place_id for _, place_id in nearest], weekday)
+    
+    text = "📍 *Ближайшие бизнес-ланчи на сегодня:*\n\n"
+    places = []
+    for i, (distance, place_id) in enumerate(nearest, 1):
+        lunch = lunches.get(place_id)
+        if not lunch:
+            continue
+        distance_text = format_distance(distance)
+        places.append({'id': place_id, 'name': lunch['name'], 'distance': distance_text})
+        text += f"{i}. *{lunch['name']}* — {distance_text}\n"
+        text += f"   💰 {lunch['price']} руб., ⏰ {lunch['start_time']} - {lunch['end_time']}\n"
+    
+    await message.answer(
+        text,
+        reply_markup=get_nearby_places_keyboard(places),
+        parse_mode="Markdown"
+    )
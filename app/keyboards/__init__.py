@@ -13,7 +13,14 @@ from app.keyboards.inline import (
     get_places_pagination_keyboard,
     get_menu_search_pagination_keyboard,
     get_menu_categories_keyboard,
-    get_menu_items_by_category_keyboard
+    get_menu_items_by_category_keyboard,
+    get_price_limit_keyboard,
+    get_price_comparison_keyboard,
+    get_location_request_keyboard,
+    get_nearby_places_keyboard,
+    get_place_list_keyboard,
+    lunch_price_callback,
+    menu_price_callback
 )
 
 __all__ = [
@@ -31,5 +38,12 @@ __all__ = [
     'get_places_pagination_keyboard',
     'get_menu_search_pagination_keyboard',
     'get_menu_categories_keyboard',
-    'get_menu_items_by_category_keyboard'
+    'get_menu_items_by_category_keyboard',
+    'get_price_limit_keyboard',
+    'get_price_comparison_keyboard',
+    'get_location_request_keyboard',
+    'get_nearby_places_keyboard',
+    'get_place_list_keyboard',
+    'lunch_price_callback',
+    'menu_price_callback'
 ] 
\ No newline at end of file
@@ -1,10 +1,53 @@
 from aiogram.utils.keyboard import InlineKeyboardBuilder
-from aiogram.types import InlineKeyboardButton, ReplyKeyboardMarkup, KeyboardButton
-from typing import List, Optional, Dict, Any
+from aiogram.types import InlineKeyboardButton, InlineKeyboardMarkup, ReplyKeyboardMarkup, KeyboardButton
+from typing import List, Optional, Dict, Any, Sequence, Tuple
 from datetime import datetime
+from functools import lru_cache
 
-def get_city_selection_keyboard():
-    """Клавиатура для выбора города"""
+# Варианты ограничения цены для фильтров "до X₽"
+PRICE_LIMITS = (300, 400, 500, 700)
+
+# Сколько вариантов каждой клавиатуры с параметрами хранить в памяти
+KEYBOARD_CACHE_SIZE = 1024
+
+def _cached_keyboard(build):
+    """
+    Кэширует готовую клавиатуру по аргументам (lru_cache на KEYBOARD_CACHE_SIZE вариантов)
+    
+    Все вызовы с одними аргументами получают один и тот же объект. aiogram
+    исходящие клавиатуры не изменяет, поэтому и обработчики их не меняют.
+    """
+    return lru_cache(maxsize=KEYBOARD_CACHE_SIZE)(build)
+
+def _price_cursor_part(cursor: Optional[Tuple[float, int]], backward: bool) -> str:
+    """Курсор для callback_data: цена пишется через repr, чтобы float читался обратно без потерь"""
+    if not cursor:
+        return "::"
+    return f"{'p' if backward else 'n'}:{cursor[0]!r}:{cursor[1]}"
+
+def lunch_price_callback(weekday: Optional[int], max_price: Optional[float], page: int = 1,
+                         cursor: Optional[Tuple[float, int]] = None, backward: bool = False) -> str:
+    """
+    Формирует callback_data для списка бизнес-ланчей, отсортированного по цене
+    
+    Формат: bl_price:день:макс_цена:страница:направление:цена_курсора:id_ланча
+    """
+    return f"bl_price:{weekday or ''}:{max_price or ''}:{page}:{_price_cursor_part(cursor, backward)}"
+
+def menu_price_callback(query_id: int, max_price: Optional[float], page: int = 1,
+                        cursor: Optional[Tuple[float, int]] = None, backward: bool = False) -> str:
+    """
+    Формирует callback_data для поиска по меню с сортировкой по цене
+    
+    Запрос передается коротким ID (см. Database.get_search_query_id), чтобы
+    callback_data не превысила 64 байта.
+    
+    Формат: menu_price:id_запроса:макс_цена:страница:направление:цена_курсора:id_заведения
+    """
+    return f"menu_price:{query_id}:{max_price or ''}:{page}:{_price_cursor_part(cursor, backward)}"
+
+def _build_city_selection_keyboard():
+    """Собирает клавиатуру для выбора города"""
     builder = InlineKeyboardBuilder()
     
     builder.row(
@@ -18,8 +61,8 @@ def get_city_selection_keyboard():
     
     return builder.as_markup()
 
-def get_admin_city_selection_keyboard():
-    """Клавиатура для выбора города при добавлении заведения"""
+def _build_admin_city_selection_keyboard():
+    """Собирает клавиатуру для выбора города при добавлении заведения"""
     builder = InlineKeyboardBuilder()
     
     builder.row(
@@ -33,8 +76,8 @@ def get_admin_city_selection_keyboard():
     
     return builder.as_markup()
 
-def get_start_keyboard():
-    """Клавиатура для стартового меню"""
+def _build_start_keyboard():
+    """Собирает клавиатуру для стартового меню"""
     builder = InlineKeyboardBuilder()
     
     builder.row(
@@ -45,6 +88,10 @@ def get_start_keyboard():
         InlineKeyboardButton(text="🔍 Поиск по меню", callback_data="menu_search"),
         width=1
     )
+    builder.row(
+        InlineKeyboardButton(text="📍 Ланчи рядом", callback_data="nearby"),
+        width=1
+    )
     builder.row(
         InlineKeyboardButton(text="💨 Кальяны", callback_data="hookah"),
         width=1
@@ -56,6 +103,65 @@ def get_start_keyboard():
     
     return builder.as_markup()
 
+def _build_location_request_keyboard():
+    """Собирает клавиатуру с кнопкой отправки геопозиции"""
+    return ReplyKeyboardMarkup(
+        keyboard=[[KeyboardButton(text="📍 Отправить геопозицию", request_location=True)]],
+        resize_keyboard=True,
+        one_time_keyboard=True
+    )
+
+# Клавиатуры без параметров собираются один раз при импорте и общие для всех вызовов
+_CITY_SELECTION_KEYBOARD = _build_city_selection_keyboard()
+_ADMIN_CITY_SELECTION_KEYBOARD = _build_admin_city_selection_keyboard()
+_START_KEYBOARD = _build_start_keyboard()
+_LOCATION_REQUEST_KEYBOARD = _build_location_request_keyboard()
+
+def get_city_selection_keyboard() -> InlineKeyboardMarkup:
+    """Клавиатура для выбора города"""
+    return _CITY_SELECTION_KEYBOARD
+
+def get_admin_city_selection_keyboard() -> InlineKeyboardMarkup:
+    """Клавиатура для выбора города при добавлении заведения"""
+    return _ADMIN_CITY_SELECTION_KEYBOARD
+
+def get_start_keyboard() -> InlineKeyboardMarkup:
+    """Клавиатура для стартового меню"""
+    return _START_KEYBOARD
+
+def get_location_request_keyboard() -> ReplyKeyboardMarkup:
+    """Клавиатура с кнопкой отправки геопозиции"""
+    return _LOCATION_REQUEST_KEYBOARD
+
+def get_nearby_places_keyboard(places: List[Dict[str, Any]]):
+    """
+    Клавиатура со списком ближайших заведений
+    
+    Args:
+        places: Заведения с полями id, name и distance (текст расстояния)
+    """
+    builder = InlineKeyboardBuilder()
+    
+    for i, place in enumerate(places, 1):
+        builder.row(
+            InlineKeyboardButton(
+                text=f"{i}. {place['name']} — {place['distance']}",
+                callback_data=f"place:{place['id']}"
+            ),
+            width=1
+        )
+    
+    builder.row(
+        InlineKeyboardButton(
+            text="« Главное меню",
+            callback_data="start"
+        ),
+        width=1
+    )
+    
+    return builder.as_markup()
+
+@_cached_keyboard
 def get_place_details_keyboard(place_id: int, has_route: bool = True):
     """Клавиатура для детальной информации о заведении"""
     builder = InlineKeyboardBuilder()
@@ -123,6 +229,7 @@ def get_place_details_keyboard(place_id: int, has_route: bool = True):
     
     return builder.as_markup()
 
+@_cached_keyboard
 def get_review_keyboard(place_id: int):
     """Клавиатура для оценки заведения"""
     builder = InlineKeyboardBuilder()
@@ -243,7 +350,96 @@ def get_search_results_keyboard(places: List[dict], page: int, total_pages: int,
     
     return builder.as_markup()
 
-def get_full_place_details_keyboard(place_id: int, page: int, total_pages: int, callback_prefix: str, weekday: Optional[int] = None):
+def get_place_list_keyboard(positions: Sequence[int], page: int, total_pages: int,
+                            item_callback_prefix: str, page_callback_prefix: str,
+                            cards_callback: Optional[str] = None, item_suffix: str = ""):
+    """
+    Клавиатура для компактного списка заведений
+    
+    Args:
+        positions: Порядковые номера заведений на странице (в общем списке)
+        page: Текущая страница списка
+        total_pages: Общее количество страниц списка
+        item_callback_prefix: Префикс callback_data для открытия карточки заведения по номеру
+        page_callback_prefix: Префикс callback_data для страниц списка
+        cards_callback: callback_data кнопки возврата к просмотру карточками
+        item_suffix: Дополнительные параметры в конце callback_data карточки (например, ":день")
+    """
+    return _build_place_list_keyboard(
+        tuple(positions), page, total_pages, item_callback_prefix, page_callback_prefix,
+        cards_callback, item_suffix
+    )
+
+@_cached_keyboard
+def _build_place_list_keyboard(positions: Tuple[int, ...], page: int, total_pages: int,
+                               item_callback_prefix: str, page_callback_prefix: str,
+                               cards_callback: Optional[str], item_suffix: str):
+    """Собирает клавиатуру компактного списка для неизменяемого набора номеров"""
+    builder = InlineKeyboardBuilder()
+    
+    # Номера заведений, по пять кнопок в ряд
+    builder.row(*[
+        InlineKeyboardButton(
+            text=str(position),
+            callback_data=f"{item_callback_prefix}:{position}{item_suffix}"
+        )
+        for position in positions
+    ], width=5)
+    
+    nav_buttons = []
+    if page > 1:
+        nav_buttons.append(
+            InlineKeyboardButton(
+                text="« Пред.",
+                callback_data=f"{page_callback_prefix}:{page - 1}"
+            )
+        )
+    
+    nav_buttons.append(
+        InlineKeyboardButton(
+            text=f"{page}/{total_pages}",
+            callback_data="pagination_info"
+        )
+    )
+    
+    if page < total_pages:
+        nav_buttons.append(
+            InlineKeyboardButton(
+                text="След. »",
+                callback_data=f"{page_callback_prefix}:{page + 1}"
+            )
+        )
+    
+    builder.row(*nav_buttons)
+    
+    if cards_callback:
+        builder.row(
+            InlineKeyboardButton(
+                text="🗂 Показать карточками",
+                callback_data=cards_callback
+            ),
+            width=1
+        )
+    
+    builder.row(
+        InlineKeyboardButton(
+            text="« Главное меню",
+            callback_data="start"
+        ),
+        width=1
+    )
+    
+    return builder.as_markup()
+
+@_cached_keyboard
+def get_full_place_details_keyboard(place_id: int, page: int, total_pages: int, callback_prefix: str,
+                                   weekday: Optional[int] = None,
+                                   nav_callbacks: Optional[Tuple[Optional[str], Optional[str]]] = None,
+                                   show_price_filters: bool = False,
+                                   price_sorted: bool = False,
+                                   open_now: Optional[bool] = None,
+                                   distance_sorted: Optional[bool] = None,
+                                   list_callback: Optional[str] = None):
     """
     Клавиатура для полной информации о заведении с навигацией по списку
     
@@ -253,6 +449,12 @@ def get_full_place_details_keyboard(place_id: int, page: int, total_pages: int,
         total_pages: Общее количество страниц
         callback_prefix: Префикс для callback_data
         weekday: День недели (1-7) или None для текущего дня
+        nav_callbacks: Готовые callback_data для кнопок "Пред." и "След." (для списков с курсором)
+        show_price_filters: Показывать кнопки сортировки и фильтра по цене
+        price_sorted: Список уже отсортирован по цене
+        open_now: Состояние фильтра "идёт сейчас" (None - не показывать переключатель)
+        distance_sorted: Список отсортирован по расстоянию (None - не показывать кнопку)
+        list_callback: callback_data кнопки перехода к компактному списку (None - не показывать)
     """
     builder = InlineKeyboardBuilder()
     
@@ -270,30 +472,83 @@ def get_full_place_details_keyboard(place_id: int, page: int, total_pages: int,
     
     # Добавляем навигационные кнопки
     nav_buttons = []
+    if nav_callbacks is not None:
+        prev_data, next_data = nav_callbacks
+    else:
+        prev_data = f"{callback_prefix}:{page - 1}{weekday_param}"
+        next_data = f"{callback_prefix}:{page + 1}{weekday_param}"
     
-    if page > 1:
+    if page > 1 and prev_data:
         nav_buttons.append(
             InlineKeyboardButton(
                 text="« Пред. заведение",
-                callback_data=f"{callback_prefix}:{page - 1}{weekday_param}"
+                callback_data=prev_data
             )
         )
     
-    if page < total_pages:
+    if page < total_pages and next_data:
         nav_buttons.append(
             InlineKeyboardButton(
                 text="След. заведение »",
-                callback_data=f"{callback_prefix}:{page + 1}{weekday_param}"
+                callback_data=next_data
             )
         )
     
     # builder.adjust(2)
     builder.row(*nav_buttons)
     
+    # Добавляем кнопки сортировки и фильтра по цене
+    if show_price_filters:
+        if price_sorted or distance_sorted:
+            sort_button = InlineKeyboardButton(
+                text="🔤 По алфавиту",
+                callback_data=f"business_lunch_page:1{weekday_param}"
+            )
+        else:
+            sort_button = InlineKeyboardButton(
+                text="💰 Сначала дешёвые",
+                callback_data=lunch_price_callback(weekday, None)
+            )
+        builder.row(
+            sort_button,
+            InlineKeyboardButton(
+                text="💸 Цена до…",
+                callback_data=f"price_limit:{weekday or ''}"
+            )
+        )
+    
+    # Переход к компактному списку
+    if list_callback:
+        builder.row(
+            InlineKeyboardButton(
+                text="📋 Показать списком",
+                callback_data=list_callback
+            ),
+            width=1
+        )
+    
+    # Сортировка по расстоянию от пользователя
+    if distance_sorted is False:
+        builder.row(
+            InlineKeyboardButton(
+                text="📍 Сначала ближайшие",
+                callback_data=f"bl_dist:{weekday or ''}:1"
+            ),
+            width=1
+        )
+    
+    # Переключатель фильтра "идёт сейчас"
+    if open_now is not None:
+        builder.row(
+            InlineKeyboardButton(
+                text="📋 Все ланчи на сегодня" if open_now else "🟢 Идёт сейчас",
+                callback_data="business_lunch_page:1" if open_now else "bl_now:1"
+            ),
+            width=1
+        )
+    
     # Добавляем кнопки дней недели, если не передан конкретный день
     if weekday is None:
-        # Получаем текущий день недели
-        current_weekday = datetime.now().isoweekday()
         builder.row(
             InlineKeyboardButton(
                 text="📅 Выбрать день недели",
@@ -313,7 +568,52 @@ def get_full_place_details_keyboard(place_id: int, page: int, total_pages: int,
     
     return builder.as_markup()
 
-def get_weekday_selection_keyboard(place_id: int, page: int, callback_prefix: str):
+@_cached_keyboard
+def get_price_limit_keyboard(weekday: Optional[int] = None, query_id: Optional[int] = None):
+    """
+    Клавиатура для выбора максимальной цены
+    
+    Args:
+        weekday: День недели (1-7) или None для текущего дня (для бизнес-ланчей)
+        query_id: ID поискового запроса (для поиска по меню)
+    """
+    builder = InlineKeyboardBuilder()
+    
+    def build_callback(max_price: Optional[int]) -> str:
+        if query_id is not None:
+            return menu_price_callback(query_id, max_price)
+        return lunch_price_callback(weekday, max_price)
+    
+    for limit in PRICE_LIMITS:
+        builder.add(
+            InlineKeyboardButton(
+                text=f"до {limit}₽",
+                callback_data=build_callback(limit)
+            )
+        )
+    
+    builder.adjust(2)
+    
+    builder.row(
+        InlineKeyboardButton(
+            text="💰 Без ограничения, сначала дешёвые",
+            callback_data=build_callback(None)
+        ),
+        width=1
+    )
+    
+    builder.row(
+        InlineKeyboardButton(
+            text="« Главное меню",
+            callback_data="start"
+        ),
+        width=1
+    )
+    
+    return builder.as_markup()
+
+def get_weekday_selection_keyboard(place_id: int, page: int, callback_prefix: str,
+                                   current_weekday: Optional[int] = None):
     """
     Клавиатура для выбора дня недели
     
@@ -321,7 +621,17 @@ def get_weekday_selection_keyboard(place_id: int, page: int, callback_prefix: st
         place_id: ID заведения
         page: Текущая страница для возврата
         callback_prefix: Префикс для callback_data
+        current_weekday: Текущий день недели в городе пользователя (1-7)
     """
+    # Текущий день недели определяется до кэша, чтобы "сегодня" не устаревало
+    if current_weekday is None:
+        current_weekday = datetime.now().isoweekday()
+    
+    return _build_weekday_selection_keyboard(place_id, page, callback_prefix, current_weekday)
+
+@_cached_keyboard
+def _build_weekday_selection_keyboard(place_id: int, page: int, callback_prefix: str, current_weekday: int):
+    """Собирает клавиатуру выбора дня недели для известного текущего дня"""
     builder = InlineKeyboardBuilder()
     
     weekdays = {
@@ -334,9 +644,6 @@ def get_weekday_selection_keyboard(place_id: int, page: int, callback_prefix: st
         7: "Воскресенье"
     }
     
-    # Текущий день недели
-    current_weekday = datetime.now().isoweekday()
-    
     # Добавляем кнопки для всех дней недели
     for weekday, name in weekdays.items():
         text = name
@@ -383,6 +690,7 @@ def get_all_lunches_keyboard(place_id: int, lunches: List[Dict[str, Any]]):
     
     return builder.as_markup()
 
+@_cached_keyboard
 def get_back_to_place_keyboard(place_id: int):
     """Клавиатура для возврата к информации о заведении"""
     builder = InlineKeyboardBuilder()
@@ -397,26 +705,33 @@ def get_back_to_place_keyboard(place_id: int):
     
     return builder.as_markup()
 
+def admin_places_page_callback(callback_prefix: str, page: int, backward: bool = False) -> str:
+    """
+    Формирует callback_data страницы выбора заведения администратором
+    
+    Курсоры (название, ID) по краям текущей страницы хранятся в состоянии FSM:
+    название заведения в callback_data может не уместиться.
+    
+    Формат: префикс_page:направление:страница
+    """
+    return f"{callback_prefix}_page:{'p' if backward else 'n'}:{page}"
+
 def get_places_pagination_keyboard(places: List[dict], page: int, total_pages: int, 
-                                  callback_prefix: str, items_per_page: int = 5):
+                                  callback_prefix: str, filtered: bool = False):
     """
     Клавиатура для выбора заведения с пагинацией для административных команд
     
     Args:
-        places: Список заведений
+        places: Заведения текущей страницы
         page: Текущая страница
         total_pages: Общее количество страниц
         callback_prefix: Префикс для callback_data ('admin_lunch' или 'admin_menu')
-        items_per_page: Количество элементов на странице
+        filtered: Список отфильтрован по названию (показать кнопку сброса фильтра)
     """
     builder = InlineKeyboardBuilder()
     
-    # Вычисляем индексы начала и конца для текущей страницы
-    start_idx = (page - 1) * items_per_page
-    end_idx = min(start_idx + items_per_page, len(places))
-    
     # Отображаем заведения на текущей странице
-    for i, place in enumerate(places[start_idx:end_idx], start_idx + 1):
+    for place in places:
         builder.row(
             InlineKeyboardButton(
                 text=f"{place['name']} ({place['address']})",
@@ -425,14 +740,14 @@ def get_places_pagination_keyboard(places: List[dict], page: int, total_pages: i
             width=1
         )
     
-    # Добавляем навигационные кнопки
+    # Добавляем навигационные кнопки: соседние страницы берутся по курсору
     navigation_buttons = []
     
-    if page > 1:
+    if page > 1 and places:
         navigation_buttons.append(
             InlineKeyboardButton(
                 text="« Пред.",
-                callback_data=f"{callback_prefix}_page:{page - 1}"
+                callback_data=admin_places_page_callback(callback_prefix, page - 1, backward=True)
             )
         )
     
@@ -443,16 +758,25 @@ def get_places_pagination_keyboard(places: List[dict], page: int, total_pages: i
         )
     )
     
-    if page < total_pages:
+    if page < total_pages and places:
         navigation_buttons.append(
             InlineKeyboardButton(
                 text="След. »",
-                callback_data=f"{callback_prefix}_page:{page + 1}"
+                callback_data=admin_places_page_callback(callback_prefix, page + 1)
             )
         )
     
     builder.row(*navigation_buttons)
     
+    if filtered:
+        builder.row(
+            InlineKeyboardButton(
+                text="✖️ Сбросить фильтр",
+                callback_data=f"{callback_prefix}_page:r:1"
+            ),
+            width=1
+        )
+    
     # Добавляем кнопку отмены
     builder.row(
         InlineKeyboardButton(
@@ -464,7 +788,10 @@ def get_places_pagination_keyboard(places: List[dict], page: int, total_pages: i
     
     return builder.as_markup()
 
-def get_menu_search_pagination_keyboard(places: List[dict], page: int, total_pages: int, query: str, place_id: int):
+def get_menu_search_pagination_keyboard(places: List[dict], page: int, total_pages: int, place_id: int,
+                                        query_id: int,
+                                        nav_callbacks: Optional[Tuple[Optional[str], Optional[str]]] = None,
+                                        price_sorted: bool = False):
     """
     Клавиатура для пагинации при поиске по меню
     
@@ -472,16 +799,35 @@ def get_menu_search_pagination_keyboard(places: List[dict], page: int, total_pag
         places: Список заведений
         page: Текущая страница
         total_pages: Общее количество страниц
-        query: Поисковый запрос
         place_id: ID текущего заведения
+        query_id: ID поискового запроса для callback_data кнопок (запрос целиком может не уместиться в 64 байта)
+        nav_callbacks: Готовые callback_data для кнопок "Пред." и "След." (для списков с курсором)
+        price_sorted: Результаты отсортированы по цене
     """
+    return _build_menu_search_pagination_keyboard(
+        page, total_pages, place_id, query_id, nav_callbacks, price_sorted
+    )
+
+@_cached_keyboard
+def _build_menu_search_pagination_keyboard(page: int, total_pages: int, place_id: int, query_id: int,
+                                           nav_callbacks: Optional[Tuple[Optional[str], Optional[str]]],
+                                           price_sorted: bool):
+    """Собирает клавиатуру поиска по меню (список заведений в ней не используется)"""
     builder = InlineKeyboardBuilder()
     
     # Добавляем кнопки для просмотра всех позиций по запросу и всех категорий меню
     builder.row(
         InlineKeyboardButton(
             text="📋 Все позиции по запросу",
-            callback_data=f"menu_all_items:{place_id}:{query}"
+            callback_data=f"menu_all_items:{place_id}:{query_id}"
+        ),
+        width=1
+    )
+    
+    builder.row(
+        InlineKeyboardButton(
+            text="📊 Сравнить цены по городу",
+            callback_data=f"menu_compare:{query_id}"
         ),
         width=1
     )
@@ -504,12 +850,17 @@ def get_menu_search_pagination_keyboard(places: List[dict], page: int, total_pag
     
     # Добавляем навигационные кнопки между заведениями
     nav_buttons = []
+    if nav_callbacks is not None:
+        prev_data, next_data = nav_callbacks
+    else:
+        prev_data = f"menu_search_page:{query_id}:{page - 1}"
+        next_data = f"menu_search_page:{query_id}:{page + 1}"
     
-    if page > 1:
+    if page > 1 and prev_data:
         nav_buttons.append(
             InlineKeyboardButton(
                 text="« Пред. заведение",
-                callback_data=f"menu_search_page:{query}:{page - 1}"
+                callback_data=prev_data
             )
         )
     
@@ -520,16 +871,35 @@ def get_menu_search_pagination_keyboard(places: List[dict], page: int, total_pag
         )
     )
     
-    if page < total_pages:
+    if page < total_pages and next_data:
         nav_buttons.append(
             InlineKeyboardButton(
                 text="След. заведение »",
-                callback_data=f"menu_search_page:{query}:{page + 1}"
+                callback_data=next_data
             )
         )
     
     builder.row(*nav_buttons)
     
+    # Добавляем кнопки сортировки и фильтра по цене
+    if price_sorted:
+        sort_button = InlineKeyboardButton(
+            text="🔤 По алфавиту",
+            callback_data=f"menu_search_page:{query_id}:1"
+        )
+    else:
+        sort_button = InlineKeyboardButton(
+            text="💰 Сначала дешёвые",
+            callback_data=menu_price_callback(query_id, None)
+        )
+    builder.row(
+        sort_button,
+        InlineKeyboardButton(
+            text="💸 Цена до…",
+            callback_data=f"menu_price_limit:{query_id}"
+        )
+    )
+    
     # Кнопка возврата в главное меню
     builder.row(
         InlineKeyboardButton(
@@ -541,6 +911,34 @@ def get_menu_search_pagination_keyboard(places: List[dict], page: int, total_pag
     
     return builder.as_markup()
 
+@_cached_keyboard
+def get_price_comparison_keyboard(query_id: int):
+    """
+    Клавиатура для таблицы сравнения цен
+    
+    Args:
+        query_id: ID поискового запроса (см. Database.get_search_query_id)
+    """
+    builder = InlineKeyboardBuilder()
+    
+    builder.row(
+        InlineKeyboardButton(
+            text="« К результатам поиска",
+            callback_data=f"menu_search_page:{query_id}:1"
+        ),
+        width=1
+    )
+    
+    builder.row(
+        InlineKeyboardButton(
+            text="« Главное меню",
+            callback_data="start"
+        ),
+        width=1
+    )
+    
+    return builder.as_markup()
+
 def get_menu_categories_keyboard(place_id: int, categories: List[str]):
     """
     Клавиатура для отображения категорий меню заведения
@@ -571,6 +969,7 @@ def get_menu_categories_keyboard(place_id: int, categories: List[str]):
     
     return builder.as_markup()
 
+@_cached_keyboard
 def get_menu_items_by_category_keyboard(place_id: int, category: str):
     """
     Клавиатура для отображения позиций меню по категории
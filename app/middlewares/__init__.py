@@ -0,0 +1,4 @@
+from app.middlewares.fast_ack import FastAckMiddleware
+from app.middlewares.throttling import CallbackDedupMiddleware, UserThrottleMiddleware
+
+__all__ = ['CallbackDedupMiddleware', 'FastAckMiddleware', 'UserThrottleMiddleware']
@@ -0,0 +1,100 @@
+import asyncio
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional, Set
+
+from aiogram import BaseMiddleware
+from aiogram.client.session.middlewares.base import BaseRequestMiddleware
+from aiogram.methods import AnswerCallbackQuery, SendMessage
+from aiogram.types import CallbackQuery, TelegramObject
+from loguru import logger
+
+
+class FastAckMiddleware(BaseMiddleware):
+    """
+    Сразу отвечает на нажатие кнопки, не дожидаясь обработчика
+
+    Часики на кнопке пропадают сразу, а не после запросов к базе и edit_text.
+    Для отдельных кнопок можно задать короткое всплывающее сообщение
+    (toasts: префикс callback_data -> текст).
+
+    Telegram принимает только один ответ на нажатие, поэтому поздние вызовы
+    callback.answer(...) в обработчиках перехватывает request_middleware:
+    - пустой ответ и обычное всплывающее сообщение ничего не делают
+    - предупреждение (show_alert=True) отправляется в чат отдельным сообщением
+    Если обработчик успел ответить раньше быстрого ответа, остается его ответ.
+    """
+
+    def __init__(self, toasts: Optional[Dict[str, str]] = None, follow_up_alerts: bool = True,
+                 maxsize: int = 10000):
+        self.toasts = toasts or {}
+        self.follow_up_alerts = follow_up_alerts
+        self.maxsize = maxsize
+        # id нажатия -> (чат, уже отвечено)
+        self._callbacks: "OrderedDict[str, list]" = OrderedDict()
+        self._tasks: Set[asyncio.Task] = set()
+        self.acked = 0
+        self.suppressed = 0
+        self.follow_ups = 0
+        self.request_middleware = _LateAnswerMiddleware(self)
+
+    def _toast(self, data: Optional[str]) -> Optional[str]:
+        if not data:
+            return None
+        for prefix, text in self.toasts.items():
+            if data.startswith(prefix):
+                return text
+        return None
+
+    async def _ack(self, event: CallbackQuery, text: Optional[str]):
+        try:
+            await event.answer(text)
+        except Exception as e:
+            logger.warning(f"Не удалось ответить на нажатие {event.id}: {e}")
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: Dict[str, Any]
+    ) -> Any:
+        if not isinstance(event, CallbackQuery):
+            return await handler(event, data)
+
+        chat_id = event.message.chat.id if event.message else None
+        self._callbacks[event.id] = [chat_id, False]
+        while len(self._callbacks) > self.maxsize:
+            self._callbacks.popitem(last=False)
+
+        # Ответ уходит параллельно с обработчиком и не задерживает его
+        task = asyncio.create_task(self._ack(event, self._toast(event.data)))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        self.acked += 1
+        return await handler(event, data)
+
+
+class _LateAnswerMiddleware(BaseRequestMiddleware):
+    """Пропускает только первый ответ на нажатие, остальные гасит или превращает в сообщение"""
+
+    def __init__(self, owner: FastAckMiddleware):
+        self.owner = owner
+
+    async def __call__(self, make_request, bot, method):
+        if not isinstance(method, AnswerCallbackQuery):
+            return await make_request(bot, method)
+
+        state = self.owner._callbacks.get(method.callback_query_id)
+        if state is None:
+            return await make_request(bot, method)
+        if not state[1]:
+            state[1] = True
+            return await make_request(bot, method)
+
+        chat_id = state[0]
+        if method.show_alert and method.text and chat_id is not None and self.owner.follow_up_alerts:
+            self.owner.follow_ups += 1
+            await make_request(bot, SendMessage(chat_id=chat_id, text=method.text, parse_mode=None))
+            return True
+
+        self.owner.suppressed += 1
+        return True
@@ -0,0 +1,97 @@
+from typing import Any, Awaitable, Callable, Dict, Hashable, Set
+
+from aiogram import BaseMiddleware
+from aiogram.types import CallbackQuery, TelegramObject
+
+from app.utils.rate_limit import TokenBucket
+
+# Ограничение на пользователя по умолчанию: апдейтов в секунду и размер всплеска
+USER_RATE = 2.0
+USER_BURST = 5
+
+SLOW_DOWN_TEXT = "Не так быстро 🙂 Подождите секунду"
+
+
+class CallbackDedupMiddleware(BaseMiddleware):
+    """
+    Отбрасывает повторные нажатия кнопки, пока первое еще обрабатывается
+
+    Нажатие определяется тройкой (пользователь, сообщение, callback_data). Если
+    такое же нажатие уже обрабатывается, повтор сразу закрывается пустым ответом
+    (чтобы у кнопки пропали часики) и в обработчик не попадает.
+    """
+
+    def __init__(self):
+        self._in_flight: Set[Hashable] = set()
+        self.dropped = 0
+
+    @staticmethod
+    def _key(event: CallbackQuery) -> Hashable:
+        message_id = event.message.message_id if event.message else event.inline_message_id
+        return event.from_user.id, message_id, event.data
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: Dict[str, Any]
+    ) -> Any:
+        if not isinstance(event, CallbackQuery):
+            return await handler(event, data)
+
+        key = self._key(event)
+        if key in self._in_flight:
+            self.dropped += 1
+            await event.answer()
+            return None
+
+        self._in_flight.add(key)
+        try:
+            return await handler(event, data)
+        finally:
+            self._in_flight.discard(key)
+
+
+class UserThrottleMiddleware(BaseMiddleware):
+    """
+    Ограничивает частоту апдейтов от одного пользователя
+
+    У каждого пользователя свое ведро токенов. Лишние нажатия кнопок получают
+    всплывающее сообщение "не так быстро", лишние сообщения молча отбрасываются -
+    до обработчиков и запросов к базе дело не доходит.
+    """
+
+    def __init__(self, rate: float = USER_RATE, burst: int = USER_BURST, max_buckets: int = 10000):
+        self.rate = rate
+        self.burst = burst
+        self.max_buckets = max_buckets
+        self._buckets: Dict[int, TokenBucket] = {}
+        self.throttled = 0
+
+    def _bucket(self, user_id: int) -> TokenBucket:
+        bucket = self._buckets.get(user_id)
+        if bucket is None:
+            if len(self._buckets) >= self.max_buckets:
+                self._buckets = {key: value for key, value in self._buckets.items() if not value.idle()}
+            bucket = self._buckets[user_id] = TokenBucket(self.rate, self.burst)
+        return bucket
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: Dict[str, Any]
+    ) -> Any:
+        user = getattr(event, "from_user", None)
+        if user is None:
+            return await handler(event, data)
+
+        bucket = self._bucket(user.id)
+        if bucket.delay() > 0:
+            self.throttled += 1
+            if isinstance(event, CallbackQuery):
+                await event.answer(SLOW_DOWN_TEXT)
+            return None
+
+        bucket.consume()
+        return await handler(event, data)
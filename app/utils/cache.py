@@ -0,0 +1,116 @@
+import sys
+from collections import OrderedDict
+from typing import Any, Hashable, Optional, Tuple
+
+from app.database.version import data_version
+
+
+class VersionedCache:
+    """
+    LRU-кэш результатов, привязанных к версии данных
+
+    Запись считается устаревшей, если после её сохранения данные о заведениях
+    изменились (см. app/database/version.py).
+    """
+
+    def __init__(self, maxsize: int = 1024):
+        self.maxsize = maxsize
+        self._items: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Возвращает значение из кэша или None, если его нет или оно устарело"""
+        entry = self._items.get(key)
+        if entry is None or entry[0] != data_version.value:
+            self.misses += 1
+            return None
+        self._items.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    def set(self, key: Hashable, value: Any):
+        """Сохраняет значение для текущей версии данных"""
+        self._items[key] = (data_version.value, value)
+        self._items.move_to_end(key)
+        while len(self._items) > self.maxsize:
+            self._items.popitem(last=False)
+
+    def clear(self):
+        self._items.clear()
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+
+def _markup_size(markup: Any) -> int:
+    """Примерный размер клавиатуры в байтах: тексты и callback_data кнопок"""
+    if markup is None:
+        return 0
+    size = sys.getsizeof(markup)
+    for row in getattr(markup, "inline_keyboard", ()):
+        for button in row:
+            size += sys.getsizeof(button) + sys.getsizeof(button.text) + sys.getsizeof(button.callback_data or "")
+    return size
+
+
+class RenderCache:
+    """
+    LRU-кэш готовых экранов бота: текст сообщения и клавиатура
+
+    Ключ описывает экран (вид, город, заведение, день недели, страница), а версия
+    данных проверяется при каждом обращении: после любого изменения заведений,
+    ланчей, меню или отзывов кэш целиком сбрасывается. Размер ограничен и по числу
+    записей, и по примерному объему занятой памяти.
+    """
+
+    def __init__(self, maxsize: int = 2048, max_bytes: int = 8 * 1024 * 1024):
+        self.maxsize = maxsize
+        self.max_bytes = max_bytes
+        self._items: "OrderedDict[Hashable, Tuple[str, Any, int]]" = OrderedDict()
+        self._version = data_version.value
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    def _check_version(self):
+        if self._version != data_version.value:
+            self.clear()
+            self._version = data_version.value
+
+    def get(self, key: Hashable) -> Optional[Tuple[str, Any]]:
+        """Возвращает пару (текст, клавиатура) или None"""
+        self._check_version()
+        entry = self._items.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self._items.move_to_end(key)
+        self.hits += 1
+        return entry[0], entry[1]
+
+    def set(self, key: Hashable, text: str, markup: Any = None):
+        """Сохраняет готовый экран для текущей версии данных"""
+        self._check_version()
+        size = sys.getsizeof(key) + sys.getsizeof(text) + _markup_size(markup)
+        if size > self.max_bytes:
+            return
+        old = self._items.pop(key, None)
+        if old is not None:
+            self.bytes -= old[2]
+        self._items[key] = (text, markup, size)
+        self.bytes += size
+        while len(self._items) > self.maxsize or self.bytes > self.max_bytes:
+            _, (_, _, evicted_size) = self._items.popitem(last=False)
+            self.bytes -= evicted_size
+
+    def clear(self):
+        self._items.clear()
+        self.bytes = 0
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+
+# Общий кэш экранов для всех обработчиков
+render_cache = RenderCache()
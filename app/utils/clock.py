@@ -0,0 +1,86 @@
+import re
+from datetime import date, datetime
+from functools import lru_cache
+from typing import Dict, Optional
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+# Через сколько минут начинающийся ланч тоже считается "идущим сейчас"
+LUNCH_SOON_MINUTES = 30
+
+_TIME_RE = re.compile(r"^\s*(\d{1,2})\s*[:.]\s*(\d{2})")
+
+
+def parse_time_to_minutes(value: Optional[str]) -> Optional[int]:
+    """
+    Переводит время вида "12:00" в количество минут от полуночи
+
+    Returns:
+        Минуты от полуночи или None, если строку не удалось разобрать
+    """
+    match = _TIME_RE.match(value or "")
+    if not match:
+        return None
+    hours, minutes = int(match.group(1)), int(match.group(2))
+    if hours == 24 and minutes == 0:
+        return 24 * 60
+    if hours > 23 or minutes > 59:
+        return None
+    return hours * 60 + minutes
+
+
+def format_minutes(minutes: int) -> str:
+    """Переводит минуты от полуночи в строку вида "12:00\""""
+    return f"{minutes // 60:02d}:{minutes % 60:02d}"
+
+
+def minute_of_day(now: Optional[datetime] = None) -> int:
+    """Возвращает текущее время в минутах от полуночи"""
+    now = now or datetime.now()
+    return now.hour * 60 + now.minute
+
+
+# Часовой пояс для городов, для которых он не задан в таблице cities
+DEFAULT_TIMEZONE = "Europe/Moscow"
+
+_city_timezones: Dict[str, str] = {}
+
+
+class CityClock:
+    """Часы города: текущая дата, день недели и время в его часовом поясе"""
+
+    def __init__(self, city: str, timezone: str):
+        self.city = city
+        self.timezone = timezone
+        self.tz = ZoneInfo(timezone)
+
+    def now(self) -> datetime:
+        return datetime.now(self.tz)
+
+    def today(self) -> date:
+        """Текущая дата в городе"""
+        return self.now().date()
+
+    def weekday(self) -> int:
+        """Текущий день недели в городе (1 - пн, 7 - вс)"""
+        return self.now().isoweekday()
+
+    def minute(self) -> int:
+        """Текущее время в городе в минутах от полуночи"""
+        return minute_of_day(self.now())
+
+
+def set_city_timezones(timezones: Dict[str, str]):
+    """Обновляет часовые пояса городов (загружаются из таблицы cities)"""
+    _city_timezones.clear()
+    _city_timezones.update(timezones)
+    city_clock.cache_clear()
+
+
+@lru_cache(maxsize=256)
+def city_clock(city: Optional[str]) -> CityClock:
+    """Возвращает часы города с учетом его часового пояса"""
+    timezone = _city_timezones.get(city or "", DEFAULT_TIMEZONE)
+    try:
+        return CityClock(city, timezone)
+    except ZoneInfoNotFoundError:
+        return CityClock(city, DEFAULT_TIMEZONE)
@@ -0,0 +1,79 @@
+import hashlib
+from collections import OrderedDict
+from typing import Any, Hashable, Optional, Tuple
+
+from aiogram.client.session.middlewares.base import BaseRequestMiddleware
+from aiogram.exceptions import TelegramBadRequest
+from aiogram.methods import EditMessageReplyMarkup, EditMessageText, SendMessage
+from aiogram.types import Message
+
+
+def _digest(*parts: Any) -> str:
+    """Короткий хэш содержимого сообщения"""
+    return hashlib.blake2b(repr(parts).encode(), digest_size=16).hexdigest()
+
+
+def _markup_digest(markup: Any) -> str:
+    if markup is None:
+        return _digest(None)
+    return _digest(markup.model_dump_json(exclude_none=True))
+
+
+class EditGuardMiddleware(BaseRequestMiddleware):
+    """
+    Пропускает редактирование сообщения, если текст и клавиатура не меняются
+
+    Для каждого сообщения (chat_id, message_id) хранится хэш текста и хэш
+    клавиатуры, которые сейчас показаны пользователю. Повторное нажатие той же
+    кнопки или возврат к тому же экрану не уходит в Telegram: запрос сразу
+    считается выполненным. Ошибка Telegram "message is not modified" тоже
+    считается успехом.
+    """
+
+    def __init__(self, maxsize: int = 50000):
+        self.maxsize = maxsize
+        self._shown: "OrderedDict[Hashable, Tuple[Optional[str], str]]" = OrderedDict()
+        self.skipped = 0
+
+    def _remember(self, key: Hashable, text_hash: Optional[str], markup_hash: str):
+        self._shown[key] = (text_hash, markup_hash)
+        self._shown.move_to_end(key)
+        while len(self._shown) > self.maxsize:
+            self._shown.popitem(last=False)
+
+    async def __call__(self, make_request, bot, method):
+        if isinstance(method, SendMessage):
+            result = await make_request(bot, method)
+            if isinstance(result, Message):
+                self._remember(
+                    (result.chat.id, result.message_id),
+                    _digest(method.text, str(method.parse_mode)),
+                    _markup_digest(method.reply_markup)
+                )
+            return result
+
+        if not isinstance(method, (EditMessageText, EditMessageReplyMarkup)) or method.message_id is None:
+            return await make_request(bot, method)
+
+        key = (method.chat_id, method.message_id)
+        shown = self._shown.get(key)
+        markup_hash = _markup_digest(method.reply_markup)
+        if isinstance(method, EditMessageText):
+            text_hash = _digest(method.text, str(method.parse_mode))
+        else:
+            text_hash = shown[0] if shown else None
+
+        if shown is not None and shown == (text_hash, markup_hash):
+            self._shown.move_to_end(key)
+            self.skipped += 1
+            return True
+
+        try:
+            result = await make_request(bot, method)
+        except TelegramBadRequest as e:
+            if "message is not modified" not in e.message:
+                self._shown.pop(key, None)
+                raise
+            result = True
+        self._remember(key, text_hash, markup_hash)
+        return result
@@ -0,0 +1,171 @@
+import argparse
+import asyncio
+import json
+import os
+import sys
+import zlib
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, Optional
+
+from app.database.database import Database
+from app.utils.importer import WEEKDAYS
+
+# Сколько заведений читать из базы за раз
+EXPORT_CHUNK_SIZE = 500
+# Копия базы делается шагами по столько страниц
+BACKUP_PAGES = 256
+
+WEEKDAY_NAMES = {number: name for name, number in WEEKDAYS.items()}
+
+
+def place_to_record(place: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Переводит заведение из базы в запись формата /import
+
+    Время и цена указываются у каждого дня, несколько ланчей в один день
+    выгружаются списком. Отзывы, теги, ID и дата добавления при импорте
+    не читаются и нужны только для резервной копии.
+    """
+    record = {
+        field: place[field]
+        for field in ("id", "name", "address", "category", "city", "admin_comment",
+                      "latitude", "longitude", "created_at")
+        if place[field] is not None
+    }
+
+    days: Dict[str, Any] = {}
+    for lunch in place["lunches"]:
+        day = {
+            "positions": lunch["description"].split("\n") if lunch["description"] else [],
+            "time": f"{lunch['start_time']} до {lunch['end_time']}",
+            "price": lunch["price"],
+        }
+        day_name = WEEKDAY_NAMES.get(lunch["weekday"], str(lunch["weekday"]))
+        if day_name in days:
+            if not isinstance(days[day_name], list):
+                days[day_name] = [days[day_name]]
+            days[day_name].append(day)
+        else:
+            days[day_name] = day
+    if days:
+        record["business_lunch"] = {"days": days}
+
+    menu: Dict[str, list] = {}
+    for item in place["menu_items"]:
+        menu.setdefault(item["category"], []).append({
+            key: value for key, value in item.items() if key != "category" and value not in (None, "")
+        })
+    if menu:
+        record["menu"] = menu
+
+    if place["reviews"]:
+        record["reviews"] = [
+            {key: value for key, value in review.items() if value is not None} for review in place["reviews"]
+        ]
+    if place["tags"]:
+        record["tags"] = place["tags"]
+    return record
+
+
+async def export_places(db: Database, city: Optional[str] = None, stats: Optional[Dict[str, int]] = None,
+                        chunk_size: int = EXPORT_CHUNK_SIZE, level: int = 6) -> AsyncIterator[bytes]:
+    """
+    Выгружает заведения в JSONL, сжатый gzip, частями
+
+    База читается пачками по chunk_size заведений, каждая пачка сразу
+    сжимается и отдается, поэтому память не зависит от размера базы.
+
+    Args:
+        city: Выгрузить только этот город (по умолчанию - все)
+        stats: Словарь, в котором считаются выгруженные заведения, ланчи, позиции меню и отзывы
+    """
+    if stats is None:
+        stats = {}
+    for key in ("places", "lunches", "menu_items", "reviews"):
+        stats.setdefault(key, 0)
+
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    async for places in db.iter_places_for_export(city, chunk_size):
+        lines = []
+        for place in places:
+            lines.append(json.dumps(place_to_record(place), ensure_ascii=False, separators=(",", ":")))
+            stats["places"] += 1
+            stats["lunches"] += len(place["lunches"])
+            stats["menu_items"] += len(place["menu_items"])
+            stats["reviews"] += len(place["reviews"])
+        data = compressor.compress(("\n".join(lines) + "\n").encode())
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+async def export_to_file(db: Database, path: str, city: Optional[str] = None) -> Dict[str, int]:
+    """
+    Выгружает заведения в файл .jsonl.gz
+
+    Файл появляется под своим именем только целиком: выгрузка пишется во
+    временный файл и переименовывается в конце.
+
+    Returns:
+        Статистика выгрузки и размер файла (size)
+    """
+    stats: Dict[str, int] = {}
+    partial_path = f"{path}.part"
+    try:
+        with open(partial_path, "wb") as output:
+            async for chunk in export_places(db, city, stats):
+                output.write(chunk)
+        os.replace(partial_path, path)
+    finally:
+        if os.path.exists(partial_path):
+            os.remove(partial_path)
+    stats["size"] = os.path.getsize(path)
+    return stats
+
+
+def default_backup_path(backup_dir: str) -> str:
+    """Имя файла копии базы с датой и временем"""
+    return os.path.join(backup_dir, f"lunch_hunter-{datetime.now():%Y%m%d-%H%M%S}.db")
+
+
+async def _main():
+    """Выгрузка заведений и копия базы из командной строки"""
+    from dotenv import load_dotenv
+
+    load_dotenv()
+    parser = argparse.ArgumentParser(description="Выгрузка заведений и резервная копия базы")
+    parser.add_argument("--db", default=os.getenv("DATABASE_NAME", "lunch_hunter.db"), help="Файл базы данных")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    export_parser = commands.add_parser("export", help="Выгрузить заведения в JSONL, сжатый gzip")
+    export_parser.add_argument("-o", "--output", default="places.jsonl.gz", help="Файл выгрузки ('-' - stdout)")
+    export_parser.add_argument("--city", help="Выгрузить только этот город")
+
+    backup_parser = commands.add_parser("backup", help="Сделать копию базы на ходу")
+    backup_parser.add_argument("output", nargs="?", help="Файл копии (по умолчанию в BACKUP_DIR)")
+    backup_parser.add_argument("--pages", type=int, default=BACKUP_PAGES, help="Сколько страниц копировать за шаг")
+    args = parser.parse_args()
+
+    db = Database(args.db)
+    if args.command == "export":
+        if args.output == "-":
+            stats: Dict[str, int] = {}
+            async for chunk in export_places(db, args.city, stats):
+                sys.stdout.buffer.write(chunk)
+            sys.stdout.buffer.flush()
+        else:
+            stats = await export_to_file(db, args.output, args.city)
+        print(
+            f"Заведений: {stats['places']}, ланчей: {stats['lunches']}, "
+            f"позиций меню: {stats['menu_items']}, отзывов: {stats['reviews']}",
+            file=sys.stderr
+        )
+    else:
+        output = args.output or default_backup_path(os.getenv("BACKUP_DIR", "backups"))
+        os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+        size = await db.backup(output, pages=args.pages)
+        print(f"Копия базы: {output} ({size / 1024 / 1024:.1f} МБ)", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    asyncio.run(_main())
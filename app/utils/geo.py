@@ -0,0 +1,18 @@
+from math import asin, cos, radians, sin, sqrt
+
+# Средний радиус Земли в километрах
+EARTH_RADIUS_KM = 6371.0088
+
+
+def haversine_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """Расстояние по дуге большого круга между двумя точками в километрах"""
+    lat1, lon1, lat2, lon2 = map(radians, (lat1, lon1, lat2, lon2))
+    a = sin((lat2 - lat1) / 2) ** 2 + cos(lat1) * cos(lat2) * sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * asin(min(1.0, sqrt(a)))
+
+
+def format_distance(distance_km: float) -> str:
+    """Форматирует расстояние для пользователя: "350 м" или "1.2 км\""""
+    if distance_km < 1:
+        return f"{round(distance_km * 1000 / 10) * 10:.0f} м"
+    return f"{distance_km:.1f} км"
@@ -0,0 +1,249 @@
+import argparse
+import asyncio
+import csv
+import os
+import re
+from abc import ABC, abstractmethod
+from typing import Dict, List, Optional, Tuple
+
+from app.database import Database
+from app.database.search import normalize_search_text
+
+# Сокращения в адресах, которые приводятся к одному виду
+ADDRESS_ABBREVIATIONS = {
+    "ул": "улица",
+    "пр": "проспект",
+    "пр-т": "проспект",
+    "просп": "проспект",
+    "пер": "переулок",
+    "пл": "площадь",
+    "б-р": "бульвар",
+    "бул": "бульвар",
+    "ш": "шоссе",
+    "наб": "набережная",
+    "мкр": "микрорайон",
+    "к": "корпус",
+    "корп": "корпус",
+    "стр": "строение",
+}
+
+# Слова, которые не влияют на поиск адреса
+ADDRESS_NOISE = {"г", "город", "д", "дом", "россия"}
+
+# Тип улицы пишут и до, и после названия, в ключе он всегда стоит первым
+STREET_TYPES = {"улица", "проспект", "переулок", "площадь", "бульвар", "шоссе", "набережная", "микрорайон"}
+
+_ADDRESS_PUNCTUATION_RE = re.compile(r"[.,;:№#\"'«»()/]")
+
+Coordinates = Tuple[float, float]
+
+
+def normalize_address(city: str, address: str) -> str:
+    """
+    Приводит адрес к ключу для поиска и кэширования
+
+    "г. Липецк, ул. Ленина, д. 10" и "Ленина улица 10" в Липецке дают один ключ
+    "липецк|улица ленина 10": город отделяется, сокращения раскрываются,
+    служебные слова отбрасываются, а тип улицы переносится в начало. Остальные
+    слова сохраняют порядок, чтобы "Ленина 5 к 2" и "Ленина 2 к 5" не совпали.
+    """
+    city_key = normalize_search_text(city)
+    text = _ADDRESS_PUNCTUATION_RE.sub(" ", normalize_search_text(address))
+    street_types = []
+    words = []
+    for word in text.split():
+        word = ADDRESS_ABBREVIATIONS.get(word, word)
+        if word in ADDRESS_NOISE or word == city_key:
+            continue
+        (street_types if word in STREET_TYPES else words).append(word)
+    return f"{city_key}|{' '.join(street_types + words)}"
+
+
+class Geocoder(ABC):
+    """Базовый интерфейс геокодера: адрес заведения -> координаты"""
+
+    # Название источника, сохраняется в кэш вместе с результатом
+    name = "base"
+
+    @abstractmethod
+    async def geocode(self, city: str, address: str) -> Optional[Coordinates]:
+        """Возвращает (широта, долгота) или None, если адрес не найден"""
+
+
+class StaticGeocoder(Geocoder):
+    """Геокодер по готовому словарю адресов, работает полностью офлайн"""
+
+    name = "static"
+
+    def __init__(self, entries: Optional[Dict[Tuple[str, str], Coordinates]] = None):
+        """
+        Args:
+            entries: Словарь (город, адрес) -> (широта, долгота)
+        """
+        self._coordinates: Dict[str, Coordinates] = {}
+        for (city, address), coordinates in (entries or {}).items():
+            self.add(city, address, *coordinates)
+
+    def add(self, city: str, address: str, latitude: float, longitude: float):
+        """Добавляет адрес в справочник"""
+        self._coordinates[normalize_address(city, address)] = (latitude, longitude)
+
+    def __len__(self) -> int:
+        return len(self._coordinates)
+
+    async def geocode(self, city: str, address: str) -> Optional[Coordinates]:
+        return self._coordinates.get(normalize_address(city, address))
+
+
+class CsvGeocoder(StaticGeocoder):
+    """
+    Геокодер по локальному CSV-файлу с адресами
+
+    Поддерживаются два формата заголовков:
+    - city, address, lat, lon - готовые адреса;
+    - addr:city, addr:street, addr:housenumber, lat, lon - выгрузка адресов из OpenStreetMap.
+    Вместо lat/lon допускаются latitude/longitude.
+    """
+
+    name = "csv"
+
+    def __init__(self, path: str, default_city: str = ""):
+        super().__init__()
+        self.path = path
+        with open(path, newline="", encoding="utf-8") as file:
+            for row in csv.DictReader(file):
+                self._add_row(row, default_city)
+
+    def _add_row(self, row: Dict[str, str], default_city: str):
+        """Добавляет строку CSV в справочник, пропуская неполные строки"""
+        city = row.get("city") or row.get("addr:city") or default_city
+        address = row.get("address")
+        if not address:
+            address = f"{row.get('addr:street') or ''} {row.get('addr:housenumber') or ''}"
+        try:
+            latitude = float(row.get("lat") or row.get("latitude"))
+            longitude = float(row.get("lon") or row.get("longitude"))
+        except (TypeError, ValueError):
+            return
+        if city and address.strip():
+            self.add(city, address, latitude, longitude)
+
+
+_default_geocoder: Optional[CsvGeocoder] = None
+_default_geocoder_lock = asyncio.Lock()
+
+
+async def get_default_geocoder() -> Optional[Geocoder]:
+    """
+    Геокодер из файла GEOCODER_CSV, если он задан в окружении
+
+    Справочник читается один раз и в отдельном потоке, чтобы большой файл
+    не задерживал обработку апдейтов.
+    """
+    global _default_geocoder
+    path = os.getenv("GEOCODER_CSV")
+    if not path or not os.path.exists(path):
+        return None
+    async with _default_geocoder_lock:
+        if _default_geocoder is None or _default_geocoder.path != path:
+            _default_geocoder = await asyncio.to_thread(CsvGeocoder, path)
+    return _default_geocoder
+
+
+async def geocode_address(db: Database, geocoder: Geocoder, city: str, address: str,
+                          refresh: bool = False) -> Optional[Coordinates]:
+    """
+    Находит координаты адреса: сначала в кэше, затем через геокодер
+
+    Args:
+        refresh: Не использовать кэш и заново спросить геокодер
+    """
+    key = normalize_address(city, address)
+    if not refresh:
+        cached = await db.get_geocode_cache([key])
+        if key in cached:
+            return cached[key]
+
+    coordinates = await geocoder.geocode(city, address)
+    latitude, longitude = coordinates if coordinates else (None, None)
+    await db.save_geocode_cache([(key, latitude, longitude, geocoder.name)])
+    return coordinates
+
+
+async def backfill_place_coordinates(db: Database, geocoder: Geocoder, concurrency: int = 8,
+                                     refresh: bool = False) -> Dict[str, int]:
+    """
+    Заполняет координаты заведений по их адресам
+
+    Адреса из кэша берутся одним запросом, остальные геокодируются параллельно,
+    но не более concurrency запросов одновременно. Результаты записываются в БД
+    пачкой после обработки всех адресов.
+
+    Args:
+        refresh: Перегеокодировать все заведения, игнорируя кэш и уже известные координаты
+
+    Returns:
+        Статистика: всего заведений, найдено в кэше, найдено геокодером, не найдено
+    """
+    places = await db.get_places_for_geocoding(include_located=refresh)
+    keys = {place_id: normalize_address(city, address) for place_id, city, address in places}
+    cached = {} if refresh else await db.get_geocode_cache(list(keys.values()))
+
+    stats = {"total": len(places), "cached": 0, "geocoded": 0, "missing": 0}
+    resolved: Dict[str, Optional[Coordinates]] = {}
+    pending: Dict[str, Tuple[str, str]] = {}
+    for place_id, city, address in places:
+        key = keys[place_id]
+        if key in cached:
+            resolved[key] = cached[key]
+        else:
+            pending.setdefault(key, (city, address))
+
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+
+    async def resolve(key: str, city: str, address: str):
+        async with semaphore:
+            resolved[key] = await geocoder.geocode(city, address)
+
+    await asyncio.gather(*(resolve(key, city, address) for key, (city, address) in pending.items()))
+
+    await db.save_geocode_cache([
+        (key, *(resolved[key] or (None, None)), geocoder.name) for key in pending
+    ])
+
+    coordinates: List[Tuple[int, float, float]] = []
+    for place_id, _, _ in places:
+        key = keys[place_id]
+        if resolved.get(key) is None:
+            stats["missing"] += 1
+            continue
+        stats["geocoded" if key in pending else "cached"] += 1
+        coordinates.append((place_id, *resolved[key]))
+
+    await db.set_places_coordinates(coordinates)
+    return stats
+
+
+async def _main():
+    """Заполнение координат заведений из командной строки"""
+    from dotenv import load_dotenv
+
+    load_dotenv()
+    parser = argparse.ArgumentParser(description="Заполнение координат заведений по локальному файлу адресов")
+    parser.add_argument("csv", help="CSV-файл с адресами (city,address,lat,lon или выгрузка OSM)")
+    parser.add_argument("--db", default=os.getenv("DATABASE_NAME", "lunch_hunter.db"), help="Файл базы данных")
+    parser.add_argument("--concurrency", type=int, default=8, help="Сколько адресов геокодировать одновременно")
+    parser.add_argument("--refresh", action="store_true", help="Перегеокодировать все заведения")
+    args = parser.parse_args()
+
+    db = Database(args.db)
+    await db.create_tables()
+    stats = await backfill_place_coordinates(db, CsvGeocoder(args.csv), args.concurrency, args.refresh)
+    print(
+        f"Заведений: {stats['total']}, из кэша: {stats['cached']}, "
+        f"найдено: {stats['geocoded']}, не найдено: {stats['missing']}"
+    )
+
+
+if __name__ == "__main__":
+    asyncio.run(_main())
@@ -0,0 +1,501 @@
+import asyncio
+import codecs
+import csv
+import json
+import re
+import zlib
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Union
+
+from app.utils.clock import parse_time_to_minutes
+
+# Сколько заведений записывать одной транзакцией
+BATCH_SIZE = 200
+# Сколько причин отклонения показывать в отчете
+MAX_ERRORS = 10
+# Размер части файла, которая читается за раз
+CHUNK_SIZE = 64 * 1024
+# Одна запись не может быть больше этого размера (защита от незакрытых скобок и кавычек)
+MAX_RECORD_SIZE = 1024 * 1024
+
+WEEKDAYS = {
+    "понедельник": 1,
+    "вторник": 2,
+    "среда": 3,
+    "четверг": 4,
+    "пятница": 5,
+    "суббота": 6,
+    "воскресенье": 7,
+    "каждый день": 0,
+}
+
+_TIME_RANGE_RE = re.compile(r"^\s*(\d{1,2}:\d{2})\s*(?:до|-|–|—)\s*(\d{1,2}:\d{2})\s*$")
+_PLACES_OBJECT_RE = re.compile(r'\{\s*"places"\s*:\s*\[')
+
+
+class InvalidRecord:
+    """Запись, которую не удалось разобрать (например, строка JSONL с ошибкой)"""
+
+    def __init__(self, reason: str):
+        self.reason = reason
+
+
+ParsedRecord = Union[Dict[str, Any], InvalidRecord]
+
+
+class JsonArrayParser:
+    """
+    Потоковый разбор JSON: массив заведений или объект {"places": [...]}
+
+    Текст подается частями, заведения возвращаются по мере того, как очередной
+    элемент массива прочитан целиком; весь файл в памяти не держится.
+    """
+
+    def __init__(self):
+        self._decoder = json.JSONDecoder()
+        self._buffer = ""
+        self._state = "start"
+
+    def feed(self, text: str) -> List[ParsedRecord]:
+        self._buffer += text
+        return self._drain(final=False)
+
+    def close(self) -> List[ParsedRecord]:
+        records = self._drain(final=True)
+        if self._state == "start" and self._buffer.strip():
+            # Один объект: заведение или {"places": [...]} с другими ключами перед places
+            try:
+                record = json.loads(self._buffer)
+            except json.JSONDecodeError as e:
+                raise ValueError(f"Ошибка в JSON: {e.msg}") from e
+            places = record.get("places") if isinstance(record, dict) else None
+            records.extend(places if isinstance(places, list) else [record])
+        elif self._state == "items":
+            raise ValueError("JSON оборвался: массив заведений не закрыт")
+        return records
+
+    def _drain(self, final: bool) -> List[ParsedRecord]:
+        records: List[ParsedRecord] = []
+        buffer, pos = self._buffer, 0
+        while True:
+            while pos < len(buffer) and (buffer[pos].isspace() or (self._state == "items" and buffer[pos] == ",")):
+                pos += 1
+            if pos >= len(buffer) or self._state == "done":
+                break
+
+            if self._state == "start":
+                if buffer[pos] == "[":
+                    self._state = "items"
+                    pos += 1
+                    continue
+                if buffer[pos] != "{":
+                    raise ValueError("Ожидается массив заведений или объект {\"places\": [...]}")
+                match = _PLACES_OBJECT_RE.match(buffer, pos)
+                if match:
+                    self._state = "items"
+                    pos = match.end()
+                    continue
+                # Иначе это один объект, он разбирается целиком в close()
+                break
+
+            if buffer[pos] == "]":
+                self._state = "done"
+                pos += 1
+                break
+            try:
+                record, pos = self._decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError as e:
+                if final or len(buffer) - pos > MAX_RECORD_SIZE:
+                    raise ValueError(f"Ошибка в JSON: {e.msg}") from e
+                break
+            records.append(record)
+
+        self._buffer = buffer[pos:]
+        return records
+
+
+class JsonLinesParser:
+    """Потоковый разбор JSONL: одно заведение на строку"""
+
+    def __init__(self):
+        self._buffer = ""
+        self._line = 0
+
+    def feed(self, text: str) -> List[ParsedRecord]:
+        self._buffer += text
+        *lines, self._buffer = self._buffer.split("\n")
+        if len(self._buffer) > MAX_RECORD_SIZE:
+            raise ValueError(f"Строка {self._line + len(lines) + 1} слишком длинная")
+        return [record for record in map(self._parse, lines) if record is not None]
+
+    def close(self) -> List[ParsedRecord]:
+        line, self._buffer = self._buffer, ""
+        record = self._parse(line)
+        return [record] if record is not None else []
+
+    def _parse(self, line: str) -> Optional[ParsedRecord]:
+        self._line += 1
+        if not line.strip():
+            return None
+        try:
+            return json.loads(line)
+        except json.JSONDecodeError as e:
+            return InvalidRecord(f"строка {self._line}: ошибка в JSON ({e.msg})")
+
+
+class CsvParser:
+    """
+    Потоковый разбор CSV: строка на день бизнес-ланча или позицию меню
+
+    Строки одного заведения (город, название, адрес) должны идти подряд, они
+    собираются в одну запись того же вида, что и в JSON.
+    Колонки: city, name, address, category, admin_comment, latitude, longitude,
+    day, time, lunch_price, positions (через ";"), additional,
+    menu_category, item, item_price, description, volume.
+    """
+
+    def __init__(self):
+        self._buffer = ""
+        self._header: Optional[List[str]] = None
+        self._group_key = None
+        self._group: Optional[Dict[str, Any]] = None
+
+    def feed(self, text: str) -> List[ParsedRecord]:
+        self._buffer += text
+        records: List[ParsedRecord] = []
+        start = 0
+        while True:
+            end = self._buffer.find("\n", start)
+            if end < 0:
+                break
+            chunk = self._buffer[:end + 1]
+            # Перенос строки внутри кавычек - запись еще не закончилась
+            if chunk.count('"') % 2:
+                start = end + 1
+                continue
+            self._buffer = self._buffer[end + 1:]
+            start = 0
+            records.extend(self._row(chunk))
+        if len(self._buffer) > MAX_RECORD_SIZE:
+            raise ValueError("Слишком длинная строка CSV или незакрытая кавычка")
+        return records
+
+    def close(self) -> List[ParsedRecord]:
+        records = self._row(self._buffer) if self._buffer.strip() else []
+        self._buffer = ""
+        if self._group is not None:
+            records.append(self._group)
+            self._group = None
+        return records
+
+    def _row(self, text: str) -> List[ParsedRecord]:
+        row = next(csv.reader([text.rstrip("\r\n")]), [])
+        if not any(cell.strip() for cell in row):
+            return []
+        if self._header is None:
+            self._header = [cell.strip().lower() for cell in row]
+            return []
+
+        values = {key: value.strip() for key, value in zip(self._header, row)}
+        key = (values.get("city"), values.get("name"), values.get("address"))
+        records: List[ParsedRecord] = []
+        if key != self._group_key:
+            if self._group is not None:
+                records.append(self._group)
+            self._group_key = key
+            self._group = {
+                field: values[field] or None
+                for field in ("city", "name", "address", "category", "admin_comment", "latitude", "longitude")
+                if field in values
+            }
+
+        if values.get("day"):
+            lunch = self._group.setdefault("business_lunch", {"days": {}})
+            lunch["days"][values["day"]] = {
+                "positions": [item.strip() for item in values.get("positions", "").split(";") if item.strip()],
+                "time": values.get("time") or None,
+                "price": values.get("lunch_price") or None,
+            }
+            if values.get("additional"):
+                lunch["additional"] = values["additional"]
+        if values.get("item"):
+            menu = self._group.setdefault("menu", {})
+            menu.setdefault(values.get("menu_category") or "", []).append({
+                "name": values["item"],
+                "price": values.get("item_price"),
+                "description": values.get("description"),
+                "volume": values.get("volume"),
+            })
+        return records
+
+
+def make_parser(filename: str):
+    """Парсер по расширению файла: .json, .jsonl/.ndjson или .csv (любой из них может быть сжат gzip)"""
+    name = (filename or "").lower()
+    if name.endswith(".gz"):
+        name = name[:-3]
+    if name.endswith((".jsonl", ".ndjson")):
+        return JsonLinesParser()
+    if name.endswith(".json"):
+        return JsonArrayParser()
+    if name.endswith(".csv"):
+        return CsvParser()
+    raise ValueError("Поддерживаются файлы .json, .jsonl и .csv (в том числе сжатые .gz)")
+
+
+def _price(value: Any, what: str) -> float:
+    try:
+        price = float(str(value).replace(",", ".").replace(" ", ""))
+    except (TypeError, ValueError):
+        raise ValueError(f"{what}: цена должна быть числом")
+    if price <= 0:
+        raise ValueError(f"{what}: цена должна быть больше нуля")
+    return price
+
+
+def _time_range(value: Any, what: str):
+    match = _TIME_RANGE_RE.match(str(value or ""))
+    if not match or parse_time_to_minutes(match.group(1)) is None or parse_time_to_minutes(match.group(2)) is None:
+        raise ValueError(f"{what}: время должно быть в формате 'HH:MM до HH:MM'")
+    return match.group(1), match.group(2)
+
+
+def _coordinate(value: Any, limit: float, what: str) -> Optional[float]:
+    if value in (None, ""):
+        return None
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"{what} должна быть числом")
+    if not -limit <= number <= limit:
+        raise ValueError(f"{what} вне допустимого диапазона")
+    return number
+
+
+def _menu_item(item: Any, category: str) -> Dict[str, Any]:
+    if not isinstance(item, dict):
+        raise ValueError(f"позиция меню в категории '{category}' должна быть объектом")
+    name = str(item.get("name") or "").strip()
+    if not name:
+        raise ValueError("у позиции меню нет названия")
+    category = str(item.get("category") or category or "").strip()
+    if not category:
+        raise ValueError(f"у позиции меню '{name}' не указана категория")
+    description = str(item.get("description") or "").strip()
+    volume = str(item.get("volume") or "").strip()
+    if volume:
+        # Объем добавляется в описание, как в /add_menu
+        description = f"{description}, {volume}" if description else volume
+    return {
+        "name": name,
+        "price": _price(item.get("price"), f"позиция меню '{name}'"),
+        "category": category,
+        "description": description or None,
+    }
+
+
+def normalize_place(raw: Any, default_city: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Проверяет запись о заведении и приводит ее к виду для Database.import_places
+
+    Формат записи - поля заведения и разделы в форматах /add_lunch и /add_menu:
+    {"name", "address", "category", "city", "admin_comment", "latitude", "longitude",
+     "business_lunch": {"time", "price", "days": {"понедельник": {"positions": [...]}}, "additional"},
+     "menu": {"напитки": [{"name", "price", "description", "volume"}]}
+     или "menu_items": [{"name", "price", "category", ...}] с общей "menu_category"}
+
+    Raises:
+        ValueError: Запись не прошла проверку (текст - причина)
+    """
+    if isinstance(raw, InvalidRecord):
+        raise ValueError(raw.reason)
+    if not isinstance(raw, dict):
+        raise ValueError("запись должна быть объектом")
+
+    place = {field: str(raw.get(field) or "").strip() for field in ("name", "address", "category", "city")}
+    place["city"] = place["city"] or (default_city or "")
+    for field, title in (("name", "название"), ("address", "адрес"), ("category", "категория"), ("city", "город")):
+        if not place[field]:
+            raise ValueError(f"не указано поле {field} ({title})")
+    place["admin_comment"] = str(raw.get("admin_comment") or "").strip() or None
+    place["latitude"] = _coordinate(raw.get("latitude"), 90, "широта")
+    place["longitude"] = _coordinate(raw.get("longitude"), 180, "долгота")
+
+    place["lunches"] = []
+    lunch = raw.get("business_lunch")
+    if lunch:
+        if not isinstance(lunch, dict) or not isinstance(lunch.get("days"), dict):
+            raise ValueError("business_lunch должен содержать days с днями недели")
+        additional = str(lunch.get("additional") or "").strip()
+        for day_name, day_entries in lunch["days"].items():
+            weekday = WEEKDAYS.get(str(day_name).strip().lower())
+            if weekday is None:
+                raise ValueError(f"неизвестный день недели '{day_name}'")
+            # Несколько ланчей в один день задаются списком
+            for day in day_entries if isinstance(day_entries, list) else [day_entries]:
+                day = day or {}
+                if not isinstance(day, dict):
+                    raise ValueError(f"бизнес-ланч ({day_name}) должен быть объектом")
+                positions = day.get("positions") or []
+                if not isinstance(positions, list):
+                    raise ValueError(f"бизнес-ланч ({day_name}): positions должен быть списком")
+                start_time, end_time = _time_range(day.get("time") or lunch.get("time"), day_name)
+                description = "\n".join(str(position) for position in positions)
+                if additional:
+                    description += f"\n\n{additional}"
+                place["lunches"].append({
+                    "weekday": weekday,
+                    "price": _price(day.get("price") or lunch.get("price"), f"бизнес-ланч ({day_name})"),
+                    "start_time": start_time,
+                    "end_time": end_time,
+                    "description": description,
+                })
+
+    place["menu_items"] = []
+    menu = raw.get("menu") or {}
+    if not isinstance(menu, dict):
+        raise ValueError("menu должен быть объектом {категория: [позиции]}")
+    for category, items in menu.items():
+        if not isinstance(items or [], list):
+            raise ValueError(f"menu: категория '{category}' должна быть списком позиций")
+        place["menu_items"].extend(_menu_item(item, category) for item in items or [])
+    menu_items = raw.get("menu_items") or []
+    if not isinstance(menu_items, list):
+        raise ValueError("menu_items должен быть списком позиций")
+    for item in menu_items:
+        place["menu_items"].append(_menu_item(item, raw.get("menu_category")))
+
+    return place
+
+
+async def import_stream(db, chunks: AsyncIterator[bytes], filename: str, default_city: Optional[str] = None,
+                        batch_size: int = BATCH_SIZE,
+                        progress: Optional[Callable[[Dict[str, Any]], Awaitable[None]]] = None) -> Dict[str, Any]:
+    """
+    Импортирует заведения из файла, читая его по частям
+
+    Записи проверяются по одной, корректные записываются пачками по batch_size
+    в одной транзакции (Database.import_places). После каждой пачки вызывается
+    progress(stats).
+
+    Returns:
+        Статистика: processed, inserted, updated, rejected и errors (первые причины отказа)
+    """
+    parser = make_parser(filename)
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    # Файлы .gz (например, выгрузка /export) распаковываются по частям
+    gunzip = zlib.decompressobj(16 + zlib.MAX_WBITS) if filename.lower().endswith(".gz") else None
+    stats: Dict[str, Any] = {"processed": 0, "inserted": 0, "updated": 0, "rejected": 0, "errors": []}
+    batch: List[Dict[str, Any]] = []
+
+    async def flush():
+        if batch:
+            inserted, updated = await db.import_places(batch)
+            stats["inserted"] += inserted
+            stats["updated"] += updated
+            batch.clear()
+        if progress is not None:
+            await progress(stats)
+
+    async def handle(records: List[ParsedRecord]):
+        for raw in records:
+            stats["processed"] += 1
+            try:
+                batch.append(normalize_place(raw, default_city))
+            except ValueError as e:
+                stats["rejected"] += 1
+                if len(stats["errors"]) < MAX_ERRORS:
+                    name = raw.get("name") if isinstance(raw, dict) else None
+                    stats["errors"].append(f"#{stats['processed']}{f' {name}' if name else ''}: {e}")
+            if len(batch) >= batch_size:
+                await flush()
+
+    async for chunk in chunks:
+        if gunzip is not None:
+            chunk = gunzip.decompress(chunk)
+        await handle(parser.feed(decoder.decode(chunk)))
+    await handle(parser.feed(decoder.decode(b"", final=True)))
+    await handle(parser.close())
+    await flush()
+    return stats
+
+
+async def telegram_file_chunks(bot, file_id: str, chunk_size: int = CHUNK_SIZE) -> AsyncIterator[bytes]:
+    """Читает файл из Telegram частями, не загружая его в память целиком"""
+    file = await bot.get_file(file_id)
+    if bot.session.api.is_local:
+        # Локальный Bot API сервер отдает путь к файлу на диске
+        loop = asyncio.get_running_loop()
+        with open(file.file_path, "rb") as source:
+            while chunk := await loop.run_in_executor(None, source.read, chunk_size):
+                yield chunk
+        return
+    url = bot.session.api.file_url(bot.token, file.file_path)
+    async for chunk in bot.session.stream_content(url, chunk_size=chunk_size):
+        yield chunk
+
+
+def parse_lunch_message(text: str) -> Dict[str, Any]:
+    """
+    Разбирает JSON бизнес-ланча из /add_lunch (формат описан в README)
+
+    Returns:
+        price, start_time, end_time, days - список (день недели, название дня, описание)
+        и unknown_days - названия дней, которые не удалось распознать
+
+    Raises:
+        json.JSONDecodeError: Неверный синтаксис JSON
+        ValueError: Не указана цена или время в неверном формате (текст - сообщение администратору)
+    """
+    lunch_data = json.loads(text).get("business_lunch", {})
+
+    price = lunch_data.get("price")
+    if not price:
+        raise ValueError("не указана цена бизнес-ланча (price).")
+
+    time_str = lunch_data.get("time", "")
+    if "до" not in time_str or time_str.count("до") != 1:
+        raise ValueError("неверный формат времени. Используйте формат 'HH:MM до HH:MM'.")
+    start_time, end_time = (part.strip() for part in time_str.split("до"))
+
+    additional = lunch_data.get("additional", "")
+    days, unknown_days = [], []
+    for day_name, day_data in lunch_data.get("days", {}).items():
+        weekday = WEEKDAYS.get(day_name.lower())
+        if weekday is None:
+            unknown_days.append(day_name)
+            continue
+        description = "\n".join(day_data.get("positions", []))
+        if additional:
+            description += f"\n\n{additional}"
+        days.append((weekday, day_name, description))
+
+    return {"price": price, "start_time": start_time, "end_time": end_time,
+            "days": days, "unknown_days": unknown_days}
+
+
+def parse_menu_message(text: str) -> List[Dict[str, Any]]:
+    """
+    Разбирает JSON позиций меню из /add_menu (формат описан в README)
+
+    Позиции без названия или цены пропускаются, объем добавляется в описание.
+
+    Raises:
+        json.JSONDecodeError: Неверный синтаксис JSON
+        ValueError: В JSON нет позиций меню
+    """
+    menu_items = json.loads(text).get("menu_items", [])
+    if not menu_items:
+        raise ValueError("не найдены позиции меню в JSON.")
+
+    items = []
+    for item in menu_items:
+        name = item.get("name")
+        price = item.get("price")
+        if not name or not price:
+            continue
+        description = item.get("description", "")
+        volume = item.get("volume", "")
+        if volume:
+            description = f"{description}, {volume}" if description else volume
+        items.append({"name": name, "price": price, "description": description})
+    return items
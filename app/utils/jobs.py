@@ -0,0 +1,202 @@
+import asyncio
+import importlib
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from loguru import logger
+
+# Задачи, которые можно отправить в пул: имя -> "модуль:функция".
+# Функции импортируются уже в процессе пула, поэтому в задачу передаются только имя и аргументы
+JOBS: Dict[str, str] = {
+    "parse_lunch_json": "app.utils.importer:parse_lunch_message",
+    "parse_menu_json": "app.utils.importer:parse_menu_message",
+    "build_tag_index": "app.database.tags:build_city_facets",
+    "build_spatial_index": "app.database.spatial:build_spatial_index",
+}
+
+# Число процессов пула (0 - выполнять задачи в процессе бота) и время на задачу по умолчанию
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", str(min(2, os.cpu_count() or 1))))
+JOB_TIMEOUT = float(os.getenv("JOB_TIMEOUT", "30"))
+
+_functions: Dict[str, Callable] = {}
+
+
+class JobTimeoutError(TimeoutError):
+    """Задача не уложилась в отведенное время и была остановлена"""
+
+
+@dataclass(frozen=True)
+class JobSpec:
+    """Описание задачи для пула: имя из JOBS, аргументы (должны сериализоваться pickle) и таймаут"""
+    kind: str
+    args: Tuple[Any, ...] = ()
+    timeout: Optional[float] = None
+
+
+def _resolve(kind: str) -> Callable:
+    function = _functions.get(kind)
+    if function is None:
+        module_name, _, name = JOBS[kind].partition(":")
+        function = _functions[kind] = getattr(importlib.import_module(module_name), name)
+    return function
+
+
+def _run_job(spec: JobSpec) -> Tuple[Any, float]:
+    """Выполняет задачу в процессе пула и возвращает результат и время выполнения"""
+    started = time.perf_counter()
+    result = _resolve(spec.kind)(*spec.args)
+    return result, time.perf_counter() - started
+
+
+class JobMetrics:
+    """Счетчики задач одного вида"""
+
+    def __init__(self):
+        self.done = 0
+        self.errors = 0
+        self.timeouts = 0
+        self.cancelled = 0
+        self.run_time = 0.0
+        self.max_run_time = 0.0
+        self.wait_time = 0.0
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "done": self.done,
+            "errors": self.errors,
+            "timeouts": self.timeouts,
+            "cancelled": self.cancelled,
+            "avg_run": self.run_time / self.done if self.done else 0.0,
+            "max_run": self.max_run_time,
+            "avg_wait": self.wait_time / self.done if self.done else 0.0,
+        }
+
+
+class JobExecutor:
+    """
+    Выполняет тяжелые для процессора задачи в пуле процессов
+
+    Event loop только отправляет задачу и ждет результат, поэтому разбор большого
+    JSON или пересборка индекса не задерживают апдейты других пользователей.
+    Одновременно в пул отправляется не больше max_pending задач, остальные ждут
+    своей очереди в event loop. Задача, не уложившаяся в таймаут или отмененная
+    во время выполнения, останавливается вместе с процессом пула: пул
+    перезапускается, а задачи, выполнявшиеся в нем, повторяются в новом.
+    """
+
+    def __init__(self, max_workers: int = JOB_WORKERS, default_timeout: float = JOB_TIMEOUT,
+                 max_pending: Optional[int] = None):
+        self.max_workers = max_workers
+        self.default_timeout = default_timeout
+        self.max_pending = max_pending or max(max_workers, 1) * 4
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._metrics: Dict[str, JobMetrics] = {}
+        self.active = 0
+        self.restarts = 0
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            # spawn, как и у воркеров: процесс пула не наследует event loop и соединения бота
+            self._pool = ProcessPoolExecutor(self.max_workers, mp_context=multiprocessing.get_context("spawn"))
+        return self._pool
+
+    def _restart_pool(self, pool: ProcessPoolExecutor):
+        """Останавливает процессы пула, новый пул создается при следующей задаче"""
+        if self._pool is pool:
+            self._pool = None
+            self.restarts += 1
+            logger.warning("Пул задач перезапущен: задача остановлена во время выполнения")
+        # Штатного способа прервать выполняющуюся задачу у ProcessPoolExecutor нет
+        for process in list((pool._processes or {}).values()):
+            process.terminate()
+        pool.shutdown(wait=False)
+
+    async def run(self, kind: str, *args: Any, timeout: Optional[float] = None) -> Any:
+        """Выполняет задачу kind из JOBS с аргументами args"""
+        return await self.submit(JobSpec(kind, args, timeout))
+
+    async def submit(self, spec: JobSpec) -> Any:
+        """
+        Выполняет задачу и возвращает ее результат
+
+        Raises:
+            JobTimeoutError: Задача не уложилась в таймаут
+            Exception: Исключение, которое выбросила сама задача
+        """
+        if spec.kind not in JOBS:
+            raise KeyError(f"Неизвестная задача: {spec.kind}")
+        metrics = self._metrics.setdefault(spec.kind, JobMetrics())
+        timeout = spec.timeout if spec.timeout is not None else self.default_timeout
+        loop = asyncio.get_running_loop()
+        submitted = loop.time()
+        try:
+            result, run_time = await asyncio.wait_for(self._execute(spec), timeout)
+        except asyncio.TimeoutError:
+            metrics.timeouts += 1
+            raise JobTimeoutError(f"Задача {spec.kind} не уложилась в {timeout:g} с")
+        except asyncio.CancelledError:
+            metrics.cancelled += 1
+            raise
+        except Exception:
+            metrics.errors += 1
+            raise
+
+        metrics.done += 1
+        metrics.run_time += run_time
+        metrics.max_run_time = max(metrics.max_run_time, run_time)
+        metrics.wait_time += max(loop.time() - submitted - run_time, 0.0)
+        return result
+
+    async def _execute(self, spec: JobSpec) -> Tuple[Any, float]:
+        if self.max_workers <= 0:
+            return _run_job(spec)
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_pending)
+
+        async with self._slots:
+            self.active += 1
+            try:
+                for attempt in range(2):
+                    pool = self._get_pool()
+                    future = pool.submit(_run_job, spec)
+                    try:
+                        return await asyncio.wrap_future(future)
+                    except asyncio.CancelledError:
+                        if not future.cancel():
+                            # Задача уже выполняется в процессе пула
+                            self._restart_pool(pool)
+                        raise
+                    except BrokenProcessPool:
+                        if self._pool is pool:
+                            # Процесс пула упал сам (например, не хватило памяти)
+                            self._pool = None
+                            raise
+                        if attempt:
+                            raise
+                        # Пул перезапустили из-за другой задачи - повторяем в новом
+            finally:
+                self.active -= 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Метрики пула и задач по видам"""
+        return {
+            "workers": self.max_workers,
+            "active": self.active,
+            "restarts": self.restarts,
+            "jobs": {kind: metrics.snapshot() for kind, metrics in self._metrics.items()},
+        }
+
+    def shutdown(self):
+        """Останавливает пул процессов"""
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+
+job_executor = JobExecutor()
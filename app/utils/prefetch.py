@@ -0,0 +1,67 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+from loguru import logger
+
+
+class Prefetcher:
+    """
+    Фоновая подготовка экранов, которые пользователь, скорее всего, откроет следующими
+
+    У каждого пользователя не больше одной фоновой задачи: новая задача отменяет
+    предыдущую, которая уже не нужна. Общее число задач тоже ограничено, при
+    перегрузке новые задачи просто не запускаются.
+    """
+
+    def __init__(self, max_tasks: int = 100):
+        self.max_tasks = max_tasks
+        self._tasks: Dict[Hashable, asyncio.Task] = {}
+        self.started = 0
+        self.cancelled = 0
+        self.skipped = 0
+
+    def schedule(self, user_id: Hashable, func: Callable[..., Awaitable[Any]], *args: Any) -> bool:
+        """
+        Запускает func(*args) в фоне для пользователя
+
+        Returns:
+            True, если задача запущена
+        """
+        self.cancel(user_id)
+        if len(self._tasks) >= self.max_tasks:
+            self.skipped += 1
+            return False
+
+        task = asyncio.create_task(self._run(func, *args))
+        self._tasks[user_id] = task
+        task.add_done_callback(lambda done: self._forget(user_id, done))
+        self.started += 1
+        return True
+
+    def cancel(self, user_id: Hashable):
+        """Отменяет фоновую задачу пользователя, если она еще выполняется"""
+        task = self._tasks.pop(user_id, None)
+        if task is not None and not task.done():
+            task.cancel()
+            self.cancelled += 1
+
+    def _forget(self, user_id: Hashable, task: asyncio.Task):
+        if self._tasks.get(user_id) is task:
+            del self._tasks[user_id]
+
+    @staticmethod
+    async def _run(func: Callable[..., Awaitable[Any]], *args: Any):
+        try:
+            await func(*args)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            # Ошибка предзагрузки не должна влиять на пользователя: экран соберется при клике
+            logger.warning(f"Ошибка предзагрузки: {e}")
+
+    def __len__(self) -> int:
+        return len(self._tasks)
+
+
+# Предзагрузка следующих страниц списков
+prefetcher = Prefetcher()
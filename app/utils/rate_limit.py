@@ -0,0 +1,177 @@
+import asyncio
+import heapq
+import itertools
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Hashable, Iterator, List, Optional, Tuple
+
+# Очереди исходящих запросов в порядке приоритета
+LANE_CALLBACK = 0     # ответы на нажатия кнопок
+LANE_INTERACTIVE = 1  # отправка и редактирование сообщений в ответ пользователю
+LANE_BULK = 2         # рассылки
+LANE_NAMES = {LANE_CALLBACK: "callback", LANE_INTERACTIVE: "interactive", LANE_BULK: "bulk"}
+
+# Ограничения Telegram: около 30 сообщений в секунду всего и 1 в секунду в один чат
+GLOBAL_RATE = 30.0
+CHAT_RATE = 1.0
+CHAT_BURST = 3
+
+_lane_override: ContextVar[Optional[int]] = ContextVar("outbound_lane", default=None)
+
+
+@contextmanager
+def bulk_lane() -> Iterator[None]:
+    """Отправлять запросы внутри блока с низким приоритетом (для рассылок)"""
+    token = _lane_override.set(LANE_BULK)
+    try:
+        yield
+    finally:
+        _lane_override.reset(token)
+
+
+def current_lane_override() -> Optional[int]:
+    """Приоритет, заданный для текущего контекста, или None"""
+    return _lane_override.get()
+
+
+class TokenBucket:
+    """
+    Ведро токенов: rate запросов в секунду со всплеском до capacity
+
+    Токены можно брать в долг: reserve() сразу списывает токен и возвращает,
+    сколько нужно подождать, поэтому ожидающие обслуживаются по порядку прихода.
+    """
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+
+    def _refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def delay(self) -> float:
+        """Через сколько секунд будет доступен токен"""
+        now = time.monotonic()
+        self._refill(now)
+        wait = max(0.0, self.paused_until - now)
+        if self.tokens < 1:
+            wait = max(wait, (1 - self.tokens) / self.rate)
+        return wait
+
+    def consume(self):
+        """Списывает токен (можно уйти в минус)"""
+        self._refill(time.monotonic())
+        self.tokens -= 1
+
+    def reserve(self) -> float:
+        """Списывает токен и возвращает время ожидания до его наступления"""
+        wait = self.delay()
+        self.tokens -= 1
+        return wait
+
+    def pause(self, seconds: float):
+        """Запрещает запросы на seconds секунд (после ответа Telegram с retry_after)"""
+        now = time.monotonic()
+        self.paused_until = max(self.paused_until, now + seconds)
+        self._refill(now)
+        self.tokens = min(self.tokens, 0)
+
+    def idle(self) -> bool:
+        """Ведро полное и не на паузе - его можно удалить без потери состояния"""
+        return self.delay() == 0 and self.tokens >= self.capacity
+
+
+class OutboundScheduler:
+    """
+    Планировщик исходящих запросов к Telegram API
+
+    Запрос сначала ждет токен своего чата, затем встает в общую очередь с
+    приоритетами: общий лимит раздается сначала ответам на нажатия кнопок, затем
+    ответам пользователям и только потом рассылкам.
+    """
+
+    def __init__(self, global_rate: float = GLOBAL_RATE, chat_rate: float = CHAT_RATE,
+                 chat_burst: int = CHAT_BURST, max_chat_buckets: int = 10000):
+        self.global_bucket = TokenBucket(global_rate, global_rate)
+        self.chat_rate = chat_rate
+        self.chat_burst = chat_burst
+        self.max_chat_buckets = max_chat_buckets
+        self._chat_buckets: Dict[Hashable, TokenBucket] = {}
+        self._queue: List[Tuple[int, int, asyncio.Future]] = []
+        self._counter = itertools.count()
+        self._wakeup: Optional[asyncio.Event] = None
+        self._worker: Optional[asyncio.Task] = None
+        self.metrics: Dict[str, float] = {
+            "sent": 0, "retry_after": 0, "failed": 0, "wait_seconds": 0.0,
+            **{f"sent_{name}": 0 for name in LANE_NAMES.values()},
+        }
+
+    def _chat_bucket(self, chat_id: Hashable) -> TokenBucket:
+        bucket = self._chat_buckets.get(chat_id)
+        if bucket is None:
+            if len(self._chat_buckets) >= self.max_chat_buckets:
+                self._chat_buckets = {
+                    key: value for key, value in self._chat_buckets.items() if not value.idle()
+                }
+            bucket = self._chat_buckets[chat_id] = TokenBucket(self.chat_rate, self.chat_burst)
+        return bucket
+
+    async def acquire(self, lane: int, chat_id: Optional[Hashable] = None):
+        """Ждет разрешения на отправку запроса в чат chat_id с приоритетом lane"""
+        started = time.monotonic()
+        if chat_id is not None:
+            wait = self._chat_bucket(chat_id).reserve()
+            if wait > 0:
+                await asyncio.sleep(wait)
+
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._queue, (lane, next(self._counter), future))
+        self._ensure_worker()
+        self._wakeup.set()
+        await future
+
+        self.metrics["wait_seconds"] += time.monotonic() - started
+        self.metrics["sent"] += 1
+        self.metrics[f"sent_{LANE_NAMES.get(lane, lane)}"] += 1
+
+    def retry_after(self, seconds: float, chat_id: Optional[Hashable] = None):
+        """Учитывает ответ Telegram "слишком много запросов": ставит на паузу чат или все запросы"""
+        self.metrics["retry_after"] += 1
+        bucket = self._chat_bucket(chat_id) if chat_id is not None else self.global_bucket
+        bucket.pause(seconds)
+
+    def _ensure_worker(self):
+        if self._worker is None or self._worker.done():
+            self._wakeup = asyncio.Event()
+            self._worker = asyncio.create_task(self._run())
+
+    async def _run(self):
+        """Раздает токены общего лимита ожидающим запросам в порядке приоритета"""
+        while True:
+            if not self._queue:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+            wait = self.global_bucket.delay()
+            if wait > 0:
+                await asyncio.sleep(wait)
+                continue
+            _, _, future = heapq.heappop(self._queue)
+            if future.done():
+                continue
+            self.global_bucket.consume()
+            future.set_result(None)
+
+    def snapshot(self) -> Dict[str, float]:
+        """Текущие метрики планировщика"""
+        return {**self.metrics, "queued": len(self._queue), "chat_buckets": len(self._chat_buckets)}
+
+    async def close(self):
+        if self._worker is not None:
+            self._worker.cancel()
+            self._worker = None
@@ -285,6 +285,15 @@ async def seed_database():
         description="Традиционная итальянская лазанья с мясным соусом"
     )
     
+    # Добавляем координаты заведений
+    print("Добавление координат заведений...")
+    await db.set_place_coordinates(place1_id, 52.6103, 39.5946)
+    await db.set_place_coordinates(place2_id, 52.6052, 39.6021)
+    await db.set_place_coordinates(place3_id, 52.6150, 39.5880)
+    await db.set_place_coordinates(place4_id, 56.3591, 41.3197)
+    await db.set_place_coordinates(place5_id, 56.3562, 41.3121)
+    await db.set_place_coordinates(place6_id, 56.3498, 41.3255)
+    
     # Добавляем отзывы
     print("Добавление тестовых отзывов...")
     
@@ -0,0 +1,64 @@
+import asyncio
+from typing import Any, Optional
+
+from aiogram.client.session.aiohttp import AiohttpSession
+from aiogram.exceptions import TelegramRetryAfter
+from aiogram.methods import AnswerCallbackQuery, AnswerInlineQuery, GetUpdates
+from loguru import logger
+
+from app.utils.rate_limit import (
+    LANE_CALLBACK, LANE_INTERACTIVE, OutboundScheduler, current_lane_override
+)
+
+# Сколько раз повторять запрос после ответа Telegram с retry_after
+MAX_RETRIES = 3
+
+
+class ThrottledSession(AiohttpSession):
+    """
+    HTTP-сессия бота, которая пропускает все запросы к Telegram API через планировщик
+
+    Обработчики по-прежнему вызывают message.answer, edit_text и callback.answer
+    напрямую: ограничения скорости, приоритеты и повтор после retry_after
+    применяются здесь.
+    """
+
+    def __init__(self, scheduler: Optional[OutboundScheduler] = None, **kwargs: Any):
+        super().__init__(**kwargs)
+        self.scheduler = scheduler or OutboundScheduler()
+
+    @staticmethod
+    def _lane(method: Any) -> int:
+        override = current_lane_override()
+        if override is not None:
+            return override
+        if isinstance(method, (AnswerCallbackQuery, AnswerInlineQuery)):
+            return LANE_CALLBACK
+        return LANE_INTERACTIVE
+
+    async def make_request(self, bot, method, timeout=None):
+        # Долгий опрос обновлений не должен стоять в очереди за рассылкой
+        if isinstance(method, GetUpdates):
+            return await super().make_request(bot, method, timeout)
+
+        lane = self._lane(method)
+        chat_id = getattr(method, "chat_id", None)
+
+        for attempt in range(MAX_RETRIES + 1):
+            await self.scheduler.acquire(lane, chat_id)
+            try:
+                return await super().make_request(bot, method, timeout)
+            except TelegramRetryAfter as e:
+                self.scheduler.retry_after(e.retry_after, chat_id)
+                if attempt == MAX_RETRIES:
+                    self.scheduler.metrics["failed"] += 1
+                    raise
+                logger.warning(
+                    f"Telegram просит подождать {e.retry_after} с перед {type(method).__name__} "
+                    f"(чат {chat_id}, попытка {attempt + 1})"
+                )
+                await asyncio.sleep(e.retry_after)
+
+    async def close(self):
+        await self.scheduler.close()
+        await super().close()
@@ -0,0 +1,99 @@
+import asyncio
+import os
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncGenerator, Dict, Hashable, List
+
+from aiogram.fsm.storage.base import BaseEventIsolation, StorageKey
+
+# Сколько апдейтов разных пользователей обрабатывается одновременно
+MAX_CONCURRENCY = 32
+# Сколько апдейтов принимается в обработку на одно место (остальные ждут в очереди у пользователей)
+INTAKE_PER_SLOT = 4
+
+
+def intake_limit() -> int:
+    """
+    Сколько апдейтов может быть принято в обработку одновременно: в работе и в очереди у пользователей
+
+    Ограничивает число задач, которые поллинг и воркеры создают под апдейты,
+    чтобы всплеск апдейтов не копил задачи без предела. Задается UPDATE_INTAKE_LIMIT,
+    по умолчанию - INTAKE_PER_SLOT апдейтов на каждое из UPDATE_CONCURRENCY мест.
+    """
+    concurrency = int(os.getenv("UPDATE_CONCURRENCY", str(MAX_CONCURRENCY)))
+    return int(os.getenv("UPDATE_INTAKE_LIMIT", str(concurrency * INTAKE_PER_SLOT)))
+
+
+class UserOrderedScheduler(BaseEventIsolation):
+    """
+    Планировщик апдейтов: параллельно между пользователями, строго по порядку внутри пользователя
+
+    Подключается как events_isolation диспетчера, поэтому ожидание происходит до
+    чтения состояния FSM: шаги сценариев в admin.py и reviews.py всегда видят
+    состояние, записанное предыдущим апдейтом того же пользователя.
+
+    Апдейт сначала ждет своей очереди у пользователя (очередь FIFO), затем одно
+    из max_concurrency мест обработки. Места занимают только апдейты, которые
+    действительно выполняются, поэтому долгий импорт у администратора занимает
+    одно место и не задерживает остальных пользователей.
+    """
+
+    def __init__(self, max_concurrency: int = MAX_CONCURRENCY):
+        self.max_concurrency = max_concurrency
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        # ключ пользователя -> [блокировка, апдейтов в очереди и в работе]
+        self._users: Dict[Hashable, List] = {}
+        self.waiting = 0
+        self.active = 0
+        self.metrics: Dict[str, float] = {
+            "handled": 0, "wait_seconds": 0.0, "max_wait_seconds": 0.0, "max_queued": 0,
+        }
+
+    @staticmethod
+    def _user_key(key: StorageKey) -> Hashable:
+        return key.bot_id, key.chat_id, key.user_id, key.thread_id
+
+    @asynccontextmanager
+    async def lock(self, key: StorageKey) -> AsyncGenerator[None, None]:
+        user_key = self._user_key(key)
+        entry = self._users.get(user_key)
+        if entry is None:
+            entry = self._users[user_key] = [asyncio.Lock(), 0]
+        entry[1] += 1
+        self.waiting += 1
+        self.metrics["max_queued"] = max(self.metrics["max_queued"], self.waiting)
+        started = time.monotonic()
+        waiting = True
+        try:
+            async with entry[0], self._semaphore:
+                waiting = False
+                waited = time.monotonic() - started
+                self.waiting -= 1
+                self.active += 1
+                self.metrics["wait_seconds"] += waited
+                self.metrics["max_wait_seconds"] = max(self.metrics["max_wait_seconds"], waited)
+                try:
+                    yield
+                finally:
+                    self.active -= 1
+                    self.metrics["handled"] += 1
+        finally:
+            if waiting:
+                self.waiting -= 1
+            entry[1] -= 1
+            if entry[1] == 0:
+                self._users.pop(user_key, None)
+
+    def snapshot(self) -> Dict[str, float]:
+        """Текущие метрики: очередь, обработка и ожидание"""
+        handled = self.metrics["handled"] or 1
+        return {
+            **self.metrics,
+            "queued": self.waiting,
+            "active": self.active,
+            "users": len(self._users),
+            "avg_wait_seconds": self.metrics["wait_seconds"] / handled,
+        }
+
+    async def close(self) -> None:
+        self._users.clear()
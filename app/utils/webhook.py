@@ -0,0 +1,92 @@
+import asyncio
+import secrets
+import time
+from typing import Any, Dict, Optional
+
+from aiogram import Bot, Dispatcher
+from aiogram.webhook.aiohttp_server import SimpleRequestHandler, setup_application
+from aiohttp import web
+from loguru import logger
+
+# Сколько апдейтов обрабатывается одновременно в режиме вебхука
+MAX_CONCURRENCY = 64
+
+
+class BoundedRequestHandler(SimpleRequestHandler):
+    """
+    Обработчик вебхука с ограничением числа одновременно обрабатываемых апдейтов
+
+    Telegram получает ответ сразу, а апдейт обрабатывается в фоне. Когда заняты
+    все max_concurrency мест, ответ Telegram задерживается до освобождения места:
+    так число фоновых задач и память ограничены, а Telegram сам притормаживает
+    доставку.
+    """
+
+    def __init__(self, dispatcher: Dispatcher, bot: Bot, max_concurrency: int = MAX_CONCURRENCY,
+                 secret_token: Optional[str] = None, **data: Any):
+        super().__init__(dispatcher, bot, handle_in_background=True, secret_token=secret_token, **data)
+        self.max_concurrency = max_concurrency
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self.metrics: Dict[str, float] = {"received": 0, "handled": 0, "wait_seconds": 0.0}
+
+    async def _handle_request_background(self, bot: Bot, request: web.Request) -> web.Response:
+        update = await request.json(loads=bot.session.json_loads)
+        self.metrics["received"] += 1
+
+        started = time.monotonic()
+        await self._semaphore.acquire()
+        self.metrics["wait_seconds"] += time.monotonic() - started
+
+        task = asyncio.create_task(self._background_feed_update(bot=bot, update=update))
+        self._background_feed_update_tasks.add(task)
+        task.add_done_callback(self._background_feed_update_tasks.discard)
+        task.add_done_callback(self._release)
+        return web.json_response({}, dumps=bot.session.json_dumps)
+
+    def _release(self, task: asyncio.Task):
+        self._semaphore.release()
+        self.metrics["handled"] += 1
+
+    def snapshot(self) -> Dict[str, float]:
+        """Текущие метрики вебхука"""
+        return {**self.metrics, "in_progress": len(self._background_feed_update_tasks)}
+
+
+async def run_webhook(dp: Dispatcher, bot: Bot, base_url: str, path: str = "/webhook",
+                      secret: Optional[str] = None, host: str = "0.0.0.0", port: int = 8080,
+                      max_concurrency: int = MAX_CONCURRENCY):
+    """
+    Запускает бота в режиме вебхука: aiohttp-сервер и регистрация вебхука в Telegram
+
+    Args:
+        base_url: Внешний адрес сервера (https://example.com), к нему добавляется path
+        secret: Секрет для заголовка X-Telegram-Bot-Api-Secret-Token;
+            если не задан, генерируется при каждом запуске
+        max_concurrency: Сколько апдейтов обрабатывать одновременно
+    """
+    secret = secret or secrets.token_urlsafe(32)
+
+    app = web.Application()
+    handler = BoundedRequestHandler(dp, bot, max_concurrency=max_concurrency, secret_token=secret)
+    handler.register(app, path=path)
+    setup_application(app, dp, bot=bot)
+    # Метрики вебхука доступны обработчикам (например, /send_stats)
+    dp["webhook_handler"] = handler
+
+    await bot.set_webhook(
+        f"{base_url.rstrip('/')}{path}",
+        secret_token=secret,
+        drop_pending_updates=True,
+        allowed_updates=dp.resolve_used_update_types(),
+        max_connections=min(max_concurrency, 100),
+    )
+
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, host, port)
+    await site.start()
+    logger.info(f"Вебхук слушает {host}:{port}{path}, одновременно до {max_concurrency} апдейтов")
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await runner.cleanup()
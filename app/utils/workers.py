@@ -0,0 +1,195 @@
+import asyncio
+import multiprocessing
+import os
+import secrets
+from concurrent.futures import ThreadPoolExecutor
+from queue import Full
+from typing import Any, Dict, List, Optional
+
+from aiogram import Bot
+from aiohttp import web
+from loguru import logger
+
+from app.utils.update_scheduler import intake_limit
+
+# Поля апдейта, в которых Telegram передает автора события
+_USER_FIELDS = (
+    "message", "edited_message", "callback_query", "inline_query", "chosen_inline_result",
+    "shipping_query", "pre_checkout_query", "poll_answer", "my_chat_member", "chat_member",
+    "chat_join_request", "business_message", "edited_business_message", "message_reaction",
+)
+
+
+def shard_of(update: Dict[str, Any], workers: int) -> int:
+    """
+    Номер воркера для апдейта: все апдейты одного пользователя попадают в один воркер
+
+    Так состояние FSM, лимиты и кэши пользователя живут в одном процессе.
+    """
+    for field in _USER_FIELDS:
+        event = update.get(field)
+        if not event:
+            continue
+        user = event.get("from") or event.get("user")
+        if user:
+            return user["id"] % workers
+        chat = event.get("chat") or (event.get("message") or {}).get("chat")
+        if chat:
+            return chat["id"] % workers
+    return update.get("update_id", 0) % workers
+
+
+class UpdateDistributor:
+    """
+    Раздает апдейты воркерам через локальные очереди процессов
+
+    Очередь каждого воркера ограничена queue_size апдейтами (по умолчанию
+    intake_limit()). Когда воркер не успевает, put ждет места в очереди, и
+    прием апдейтов притормаживает вместо того, чтобы копить их в памяти.
+    """
+
+    def __init__(self, workers: int, queue_size: Optional[int] = None):
+        self._context = multiprocessing.get_context("spawn")
+        queue_size = queue_size or intake_limit()
+        self.queues = [self._context.Queue(maxsize=queue_size) for _ in range(workers)]
+        # Один поток на очередь: ожидание места не занимает event loop, а порядок апдейтов сохраняется
+        self._senders = [
+            ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"lunch-put-{index}") for index in range(workers)
+        ]
+        self.processes: List[multiprocessing.Process] = []
+        self.distributed = [0] * workers
+
+    def start(self, db_name: str):
+        for index, queue in enumerate(self.queues):
+            process = self._context.Process(
+                target=worker_main, args=(index, len(self.queues), queue, db_name),
+                name=f"lunch-worker-{index}", daemon=True,
+            )
+            process.start()
+            self.processes.append(process)
+        logger.info(f"Запущено воркеров: {len(self.processes)}")
+
+    async def put(self, update: Dict[str, Any]):
+        """Отдает апдейт воркеру, дожидаясь места в его очереди"""
+        shard = shard_of(update, len(self.queues))
+        self.distributed[shard] += 1
+        await asyncio.get_running_loop().run_in_executor(self._senders[shard], self.queues[shard].put, update)
+
+    def stop(self, timeout: float = 10.0):
+        for sender in self._senders:
+            sender.shutdown(wait=False, cancel_futures=True)
+        for queue in self.queues:
+            try:
+                queue.put(None, timeout=timeout)
+            except Full:
+                # Воркер завис и не разбирает очередь - он будет остановлен ниже
+                pass
+        for process in self.processes:
+            process.join(timeout)
+            if process.is_alive():
+                process.terminate()
+
+
+async def receive_polling(bot: Bot, distributor: UpdateDistributor, allowed_updates: Optional[List[str]]):
+    """Получает апдейты долгим опросом и раздает их воркерам"""
+    await bot.delete_webhook(drop_pending_updates=True)
+    offset = None
+    while True:
+        try:
+            updates = await bot.get_updates(offset=offset, timeout=30, allowed_updates=allowed_updates)
+        except Exception as e:
+            logger.error(f"Ошибка получения апдейтов: {e}")
+            await asyncio.sleep(1)
+            continue
+        for update in updates:
+            # Пока воркер не разберет очередь, следующий опрос не начнется
+            await distributor.put(update.model_dump(mode="json", by_alias=True, exclude_none=True))
+            offset = update.update_id + 1
+
+
+async def receive_webhook(bot: Bot, distributor: UpdateDistributor, allowed_updates: Optional[List[str]],
+                          base_url: str, path: str = "/webhook", secret: Optional[str] = None,
+                          host: str = "0.0.0.0", port: int = 8080):
+    """Принимает апдейты вебхуком и раздает их воркерам, не разбирая JSON в модели"""
+    secret = secret or secrets.token_urlsafe(32)
+
+    async def handle(request: web.Request) -> web.Response:
+        token = request.headers.get("X-Telegram-Bot-Api-Secret-Token", "")
+        if not secrets.compare_digest(token, secret):
+            return web.Response(body="Unauthorized", status=401)
+        # Ответ задерживается, пока в очереди воркера нет места: Telegram притормаживает доставку
+        await distributor.put(await request.json())
+        return web.json_response({})
+
+    app = web.Application()
+    app.router.add_post(path, handle)
+    await bot.set_webhook(
+        f"{base_url.rstrip('/')}{path}",
+        secret_token=secret,
+        drop_pending_updates=True,
+        allowed_updates=allowed_updates,
+    )
+
+    runner = web.AppRunner(app)
+    await runner.setup()
+    await web.TCPSite(runner, host, port).start()
+    logger.info(f"Вебхук слушает {host}:{port}{path} и раздает апдейты {len(distributor.queues)} воркерам")
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await runner.cleanup()
+
+
+async def _feed_update(dp, bot: Bot, update: Dict[str, Any]):
+    try:
+        await dp.feed_raw_update(bot, update)
+    except Exception as e:
+        logger.exception(f"Ошибка обработки апдейта {update.get('update_id')}: {e}")
+
+
+def worker_main(index: int, workers: int, queue: multiprocessing.Queue, db_name: str):
+    """Точка входа процесса-воркера"""
+    try:
+        asyncio.run(_run_worker(index, workers, queue, db_name))
+    except KeyboardInterrupt:
+        pass
+
+
+async def _run_worker(index: int, workers: int, queue: multiprocessing.Queue, db_name: str):
+    # Обработчики создают Database() без имени файла: она берется из DATABASE_NAME
+    os.environ["DATABASE_NAME"] = db_name
+    from app.bot import create_bot, create_dispatcher
+    from app.database import Database
+    from app.database.version import watch_data_version
+
+    bot = create_bot(rate_share=workers)
+    dp = create_dispatcher(bot)
+    dp["worker_index"] = index
+    db = Database(db_name)
+    await db.load_city_timezones()
+    # Изменения данных в других процессах сбрасывают кэши, смена часового пояса перечитывается
+    watcher = asyncio.create_task(watch_data_version(db_name, on_change=db.load_city_timezones))
+    loop = asyncio.get_running_loop()
+    tasks = set()
+    # Следующий апдейт берется из очереди, только когда есть свободное место
+    intake = asyncio.Semaphore(intake_limit())
+    logger.info(f"Воркер {index} (pid {os.getpid()}) готов")
+
+    try:
+        await dp.emit_startup(bot=bot)
+        while True:
+            await intake.acquire()
+            update = await loop.run_in_executor(None, queue.get)
+            if update is None:
+                break
+            # Задачи создаются в порядке очереди, порядок внутри пользователя держит UserOrderedScheduler
+            task = asyncio.create_task(_feed_update(dp, bot, update))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+            task.add_done_callback(lambda _: intake.release())
+        if tasks:
+            await asyncio.wait(tasks, timeout=10)
+    finally:
+        watcher.cancel()
+        await dp.emit_shutdown(bot=bot)
+        await bot.session.close()
@@ -2,12 +2,15 @@ import asyncio
 # import logging
 import os
 from dotenv import load_dotenv
-from aiogram import Bot, Dispatcher
-from aiogram.enums import ParseMode
-from aiogram.fsm.storage.memory import MemoryStorage
-from app.handlers import routers
+
+# Загружаем переменные окружения до импорта модулей бота: они читают настройки при импорте
+load_dotenv()
+
+from app.bot import create_bot, create_dispatcher
 from app.database import Database
-from aiogram.client.default import DefaultBotProperties
+from app.utils.update_scheduler import intake_limit
+from app.utils.webhook import run_webhook
+from app.utils.workers import UpdateDistributor, receive_polling, receive_webhook
 
 from loguru import logger
 # Настраиваем логирование
@@ -17,28 +20,17 @@ logger.add("logs/app.log", rotation="100 MB", retention="10 days",
            format="{time:YYYY-MM-DD HH:mm}:{level}:{file}:{line}:{function}:{message}", level="INFO", filter=debug_only)
 
 
-# Загружаем переменные окружения
-load_dotenv()
-
-
 async def main():
-    # Инициализируем базу данных
-    db = Database(os.getenv("DATABASE_NAME", "lunch_hunter.db"))
+    # Инициализируем базу данных (файл из DATABASE_NAME, ее же используют обработчики и воркеры)
+    db = Database()
     await db.create_tables()
     
+    workers = int(os.getenv("WORKERS", "1"))
     
     # Инициализируем бота и диспетчер
-    bot = Bot(token=os.getenv("BOT_TOKEN"), default=DefaultBotProperties(
-            parse_mode=ParseMode.MARKDOWN,
-        ),)
-    dp = Dispatcher(storage=MemoryStorage())
-    
-    # Регистрируем все роутеры
-    for router in routers:
-        dp.include_router(router)
+    bot = create_bot()
+    dp = create_dispatcher(bot)
     
-    # Пропускаем накопившиеся апдейты и запускаем поллинг
-    await bot.delete_webhook(drop_pending_updates=True)
     bot_info=await bot.get_me()
     
     logger.info(f"""Bot started 
@@ -49,7 +41,42 @@ async def main():
     is_bot: {bot_info.is_bot}
     is_premium: {bot_info.is_premium}
     language_code: {bot_info.language_code}""")
-    await dp.start_polling(bot)
+    
+    webhook_settings = dict(
+        base_url=os.getenv("WEBHOOK_BASE_URL"),
+        path=os.getenv("WEBHOOK_PATH", "/webhook"),
+        secret=os.getenv("WEBHOOK_SECRET"),
+        host=os.getenv("WEBAPP_HOST", "0.0.0.0"),
+        port=int(os.getenv("WEBAPP_PORT", "8080")),
+    )
+    
+    if workers > 1:
+        # Этот процесс только получает апдейты, обрабатывают их воркеры
+        await db.enable_wal()
+        distributor = UpdateDistributor(workers)
+        distributor.start(db.db_name)
+        try:
+            if os.getenv("BOT_MODE", "polling") == "webhook":
+                await receive_webhook(bot, distributor, dp.resolve_used_update_types(), **webhook_settings)
+            else:
+                await receive_polling(bot, distributor, dp.resolve_used_update_types())
+        finally:
+            distributor.stop()
+            await bot.session.close()
+        return
+    
+    if os.getenv("BOT_MODE", "polling") == "webhook":
+        await run_webhook(
+            dp, bot,
+            max_concurrency=int(os.getenv("WEBHOOK_MAX_CONCURRENCY", "64")),
+            **webhook_settings,
+        )
+        return
+    
+    # Пропускаем накопившиеся апдейты и запускаем поллинг.
+    # Поллинг не получает новые апдейты, пока в обработке intake_limit() задач
+    await bot.delete_webhook(drop_pending_updates=True)
+    await dp.start_polling(bot, tasks_concurrency_limit=intake_limit())
 
 if __name__ == "__main__":
     asyncio.run(main()) 
\ No newline at end of file
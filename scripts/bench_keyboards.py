@@ -0,0 +1,74 @@
+"""
+Микробенчмарк клавиатур: сборка заново против готовых и закэшированных клавиатур
+
+Запуск из корня проекта:
+    python scripts/bench_keyboards.py [--updates 20000]
+
+Для каждой клавиатуры выводится время и объем памяти, выделенной за один вызов
+(по tracemalloc), при сборке с нуля и при обращении к кэшу.
+"""
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.keyboards import inline
+
+
+def _measure(func, updates: int):
+    """Возвращает (мкс на вызов, байт на вызов)"""
+    func()
+    start = time.perf_counter()
+    for _ in range(updates):
+        func()
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    results = [func() for _ in range(min(updates, 1000))]
+    allocated = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    return elapsed / updates * 1e6, allocated / len(results)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Сравнение сборки клавиатур с кэшированными")
+    parser.add_argument("--updates", type=int, default=20000, help="Количество вызовов на клавиатуру")
+    args = parser.parse_args()
+
+    cases = [
+        ("start", inline._build_start_keyboard, inline.get_start_keyboard),
+        ("city_selection", inline._build_city_selection_keyboard, inline.get_city_selection_keyboard),
+        ("admin_city_selection", inline._build_admin_city_selection_keyboard,
+         inline.get_admin_city_selection_keyboard),
+        ("place_details", lambda: inline.get_place_details_keyboard.__wrapped__(42),
+         lambda: inline.get_place_details_keyboard(42)),
+        ("weekday_selection", lambda: inline._build_weekday_selection_keyboard.__wrapped__(42, 3, "business_lunch_day", 2),
+         lambda: inline.get_weekday_selection_keyboard(42, 3, "business_lunch_day", 2)),
+        ("full_place_details", lambda: inline.get_full_place_details_keyboard.__wrapped__(
+            42, 3, 30, "business_lunch_page", 2, show_price_filters=True, distance_sorted=False),
+         lambda: inline.get_full_place_details_keyboard(
+            42, 3, 30, "business_lunch_page", 2, show_price_filters=True, distance_sorted=False)),
+        ("menu_search_pagination", lambda: inline._build_menu_search_pagination_keyboard.__wrapped__(
+            3, 30, 42, 7, None, False),
+         lambda: inline.get_menu_search_pagination_keyboard([], 3, 30, 42, 7)),
+    ]
+
+    print(f"{'клавиатура':<24}{'сборка, мкс':>13}{'кэш, мкс':>10}{'сборка, Б':>11}{'кэш, Б':>8}")
+    total_built = total_cached = 0.0
+    for name, build, cached in cases:
+        built_time, built_bytes = _measure(build, args.updates)
+        cached_time, cached_bytes = _measure(cached, args.updates)
+        total_built += built_bytes
+        total_cached += cached_bytes
+        print(f"{name:<24}{built_time:>13.2f}{cached_time:>10.2f}{built_bytes:>11.0f}{cached_bytes:>8.0f}")
+
+    print(f"\nПамяти на апдейт (по одной клавиатуре каждого вида): "
+          f"{total_built:.0f} Б при сборке, {total_cached:.0f} Б из кэша")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,170 @@
+"""
+Фейковый Telegram для локальной проверки режима вебхука
+
+Скрипт поднимает заглушку Bot API (отвечает на все методы и запоминает вызовы)
+и отправляет на вебхук бота апдейты от нескольких пользователей: /start, выбор
+города, бизнес-ланчи, главное меню.
+
+Запуск бота против заглушки:
+    TELEGRAM_API_URL=http://127.0.0.1:8081 BOT_MODE=webhook \\
+    WEBHOOK_BASE_URL=http://127.0.0.1:8080 WEBHOOK_SECRET=test BOT_TOKEN=123:test \\
+    python main.py
+
+Запуск нагрузки (из корня проекта, заглушку нужно запустить до бота):
+    python scripts/fake_telegram.py --users 50 --secret test
+
+В конце выводятся задержки ответа вебхука, время до первого ответа бота на
+каждый апдейт и число вызовов Bot API по методам.
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import statistics
+import time
+from collections import Counter
+from typing import Dict, List
+
+import aiohttp
+from aiohttp import web
+
+BOT_USER = {"id": 123, "is_bot": True, "first_name": "LunchHunter", "username": "lunch_hunter_bot"}
+FLOW = ["/start", "city:Липецк", "business_lunch", "start"]
+
+
+class FakeBotApi:
+    """Заглушка Bot API: отвечает успехом на любой метод и считает вызовы"""
+
+    def __init__(self):
+        self.calls: Counter = Counter()
+        self.webhook: Dict[str, str] = {}
+        self.first_reply: Dict[str, float] = {}
+        self._message_ids = itertools.count(1000)
+
+    async def handle(self, request: web.Request) -> web.Response:
+        method = request.match_info["method"]
+        if request.content_type == "application/json":
+            params = await request.json()
+        else:
+            params = dict(await request.post())
+        self.calls[method] += 1
+
+        key = None
+        if method == "answerCallbackQuery":
+            key = f"cb:{params.get('callback_query_id')}"
+        elif "chat_id" in params:
+            key = f"chat:{params['chat_id']}"
+        if key is not None:
+            self.first_reply.setdefault(key, time.monotonic())
+
+        if method == "getMe":
+            result = BOT_USER
+        elif method == "setWebhook":
+            self.webhook = {"url": params.get("url"), "secret": params.get("secret_token")}
+            result = True
+        elif method == "sendMessage":
+            result = {
+                "message_id": next(self._message_ids),
+                "date": int(time.time()),
+                "chat": {"id": int(params["chat_id"]), "type": "private"},
+                "from": BOT_USER,
+                "text": params.get("text", ""),
+            }
+        else:
+            result = True
+        return web.json_response({"ok": True, "result": result})
+
+
+def make_update(update_id: int, user_id: int, step: str) -> dict:
+    user = {"id": user_id, "is_bot": False, "first_name": f"user{user_id}"}
+    chat = {"id": user_id, "type": "private"}
+    if step.startswith("/"):
+        return {"update_id": update_id, "message": {
+            "message_id": update_id, "date": int(time.time()), "chat": chat, "from": user, "text": step,
+        }}
+    return {"update_id": update_id, "callback_query": {
+        "id": str(update_id), "from": user, "chat_instance": str(user_id), "data": step,
+        "message": {"message_id": 1, "date": int(time.time()), "chat": chat, "from": BOT_USER, "text": "…"},
+    }}
+
+
+async def run_user(session: aiohttp.ClientSession, api: FakeBotApi, url: str, secret: str,
+                   user_id: int, counter: itertools.count, acks: List[float], replies: List[float]):
+    """Проходит сценарий FLOW от имени одного пользователя"""
+    for step in FLOW:
+        update = make_update(next(counter), user_id, step)
+        key = f"chat:{user_id}" if step.startswith("/") else f"cb:{update['update_id']}"
+        api.first_reply.pop(key, None)
+
+        started = time.monotonic()
+        async with session.post(url, json=update,
+                                headers={"X-Telegram-Bot-Api-Secret-Token": secret}) as response:
+            response.raise_for_status()
+        acks.append(time.monotonic() - started)
+
+        # Ждем первого ответа бота на апдейт, прежде чем "нажать" следующую кнопку
+        deadline = started + 10
+        while key not in api.first_reply and time.monotonic() < deadline:
+            await asyncio.sleep(0.005)
+        if key in api.first_reply:
+            replies.append(api.first_reply[key] - started)
+
+
+def _percentiles(values: List[float]) -> str:
+    if not values:
+        return "нет данных"
+    values = sorted(values)
+    p95 = values[min(len(values) - 1, int(len(values) * 0.95))]
+    return (f"медиана {statistics.median(values) * 1000:.1f} мс, "
+            f"p95 {p95 * 1000:.1f} мс, макс {values[-1] * 1000:.1f} мс")
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Нагрузка на вебхук бота через фейковый Telegram")
+    parser.add_argument("--api-port", type=int, default=8081, help="Порт заглушки Bot API")
+    parser.add_argument("--webhook", default=None, help="Адрес вебхука (по умолчанию из setWebhook)")
+    parser.add_argument("--secret", default=None, help="Секрет вебхука (по умолчанию из setWebhook)")
+    parser.add_argument("--users", type=int, default=20, help="Количество пользователей")
+    args = parser.parse_args()
+
+    api = FakeBotApi()
+    app = web.Application()
+    app.router.add_post("/bot{token}/{method}", api.handle)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    await web.TCPSite(runner, "127.0.0.1", args.api_port).start()
+    print(f"Заглушка Bot API: http://127.0.0.1:{args.api_port}")
+
+    url = args.webhook
+    while url is None and not api.webhook:
+        print("Ждем setWebhook от бота…")
+        await asyncio.sleep(1)
+    url = url or api.webhook["url"]
+    secret = args.secret or api.webhook.get("secret") or ""
+
+    acks: List[float] = []
+    replies: List[float] = []
+    counter = itertools.count(1)
+    started = time.monotonic()
+    async with aiohttp.ClientSession() as session:
+        await asyncio.gather(*(
+            run_user(session, api, url, secret, 10_000 + i, counter, acks, replies)
+            for i in range(args.users)
+        ))
+    elapsed = time.monotonic() - started
+
+    # Дожидаемся, пока бот досылает ответы, придержанные ограничением скорости
+    total = -1
+    while total != sum(api.calls.values()):
+        total = sum(api.calls.values())
+        await asyncio.sleep(2)
+
+    print(f"\nАпдейтов: {len(acks)} за {elapsed:.2f} с")
+    print(f"Ответ вебхука: {_percentiles(acks)}")
+    print(f"Первый ответ бота: {_percentiles(replies)} (получено {len(replies)} из {len(acks)})")
+    print("Вызовы Bot API: " + json.dumps(dict(api.calls), ensure_ascii=False))
+    await runner.cleanup()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,38 @@
+import asyncio
+
+import pytest
+
+from app.database.database import Database
+
+
+def run(coro):
+    """Выполняет корутину в отдельном event loop (тесты синхронные, без плагинов pytest)"""
+    return asyncio.run(coro)
+
+
+class FakeCallback:
+    """Нажатие кнопки пользователем: последний показанный текст и ответы на нажатие"""
+
+    class _User:
+        id = 1
+
+    def __init__(self, data: str):
+        self.data = data
+        self.from_user = self._User()
+        self.message = self
+        self.text = None
+        self.answers = []
+
+    async def edit_text(self, text: str, **kwargs):
+        self.text = text
+
+    async def answer(self, text: str = None, **kwargs):
+        self.answers.append(text)
+
+
+@pytest.fixture
+def db(tmp_path):
+    """Пустая база с созданными таблицами во временном каталоге"""
+    database = Database(str(tmp_path / "lunch_hunter.db"))
+    run(database.create_tables())
+    return database
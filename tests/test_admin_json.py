@@ -0,0 +1,82 @@
+import json
+
+from aiogram.fsm.context import FSMContext
+from aiogram.fsm.storage.base import StorageKey
+from aiogram.fsm.storage.memory import MemoryStorage
+
+from app.handlers import admin
+from app.utils.jobs import JobExecutor
+from tests.conftest import run
+
+
+LUNCH = (admin.process_lunch_json_input, admin.AddLunchStates.waiting_for_json)
+MENU = (admin.process_menu_json_input, admin.AddMenuItemStates.waiting_for_json)
+
+
+class FakeMessage:
+    """Сообщение администратора: текст и ответы бота"""
+
+    def __init__(self, text: str):
+        self.text = text
+        self.answers = []
+
+    async def answer(self, text: str, **kwargs):
+        self.answers.append(text)
+
+
+def _send(db, monkeypatch, step, data, text):
+    """Отправляет текст обработчику шага (обработчик, состояние) и возвращает новое состояние и ответы"""
+    handler, state_name = step
+    monkeypatch.setattr(admin, "db", db)
+    monkeypatch.setattr(admin, "job_executor", JobExecutor(max_workers=0))
+
+    async def scenario():
+        state = FSMContext(MemoryStorage(), StorageKey(bot_id=1, chat_id=1, user_id=1))
+        await state.set_state(state_name)
+        await state.set_data(data)
+        message = FakeMessage(text)
+        await handler(message, state)
+        return await state.get_state(), message.answers
+
+    return run(scenario())
+
+
+def test_bad_lunch_json_keeps_state_for_resend(db, monkeypatch):
+    place_id = run(db.add_place("Обед", "ул. Ленина, 1", "Столовая", "Липецк"))
+    data = {"place_id": place_id, "place_name": "Обед"}
+
+    state, answers = _send(db, monkeypatch, LUNCH, data, "{не json")
+    assert state == admin.AddLunchStates.waiting_for_json.state
+    assert "неверный формат JSON" in answers[-1]
+
+    no_price = json.dumps({"business_lunch": {"time": "12:00 до 15:00"}})
+    state, answers = _send(db, monkeypatch, LUNCH, data, no_price)
+    assert state == admin.AddLunchStates.waiting_for_json.state
+    assert "не указана цена" in answers[-1]
+
+
+def test_valid_lunch_json_clears_state(db, monkeypatch):
+    place_id = run(db.add_place("Обед", "ул. Ленина, 1", "Столовая", "Липецк"))
+    data = {"place_id": place_id, "place_name": "Обед"}
+    text = json.dumps({"business_lunch": {
+        "price": 350, "time": "12:00 до 15:00", "days": {"понедельник": {"positions": ["Суп"]}}
+    }}, ensure_ascii=False)
+
+    state, answers = _send(db, monkeypatch, LUNCH, data, text)
+    assert state is None
+    assert answers[-1].startswith("✅")
+    assert run(db.get_business_lunch_by_place_id(place_id, weekday=1))["price"] == 350
+
+
+def test_bad_menu_json_keeps_state_for_resend(db, monkeypatch):
+    place_id = run(db.add_place("Обед", "ул. Ленина, 1", "Столовая", "Липецк"))
+    data = {"place_id": place_id, "place_name": "Обед", "menu_category": "Супы"}
+
+    state, answers = _send(db, monkeypatch, MENU, data, '{"menu_items": []}')
+    assert state == admin.AddMenuItemStates.waiting_for_json.state
+    assert "не найдены позиции меню" in answers[-1]
+
+    text = json.dumps({"menu_items": [{"name": "Борщ", "price": 200}]}, ensure_ascii=False)
+    state, answers = _send(db, monkeypatch, MENU, data, text)
+    assert state is None
+    assert [item["name"] for item in run(db.get_menu_items_by_place_id(place_id))] == ["Борщ"]
@@ -0,0 +1,40 @@
+import aiosqlite
+
+from app.keyboards import inline
+from tests.conftest import run
+
+
+def _names(places):
+    return [place["name"] for place in places]
+
+
+def test_place_picker_pages_survive_deleted_cursor(db):
+    for name in ("Альфа", "Бета", "Гамма", "Дельта", "Ежевика"):
+        run(db.add_place(name, "ул. Мира, 1", "Кафе", "Липецк"))
+
+    first = run(db.get_places_page_for_admin("Липецк", limit=2))
+    assert _names(first) == ["Альфа", "Бета"]
+    cursor = (first[-1]["name"], first[-1]["id"])
+
+    async def delete_place(place_id):
+        async with aiosqlite.connect(db.db_name) as conn:
+            await conn.execute("DELETE FROM places WHERE id = ?", (place_id,))
+            await conn.commit()
+
+    # Заведение-курсор удалили, пока администратор смотрел страницу
+    run(delete_place(first[-1]["id"]))
+    second = run(db.get_places_page_for_admin("Липецк", cursor=cursor, limit=2))
+    assert _names(second) == ["Гамма", "Дельта"]
+
+    back = run(db.get_places_page_for_admin("Липецк", cursor=(second[0]["name"], second[0]["id"]),
+                                            backward=True, limit=2))
+    assert _names(back) == ["Альфа"]
+
+
+def test_place_picker_filter_and_callbacks(db):
+    for name in ("Суши бар", "Суповая", "Пицца"):
+        run(db.add_place(name, "ул. Мира, 1", "Кафе", "Липецк"))
+
+    assert _names(run(db.get_places_page_for_admin("Липецк", "су"))) == ["Суповая", "Суши бар"]
+    assert run(db.count_places_for_admin("Липецк", "су")) == 2
+    assert inline.admin_places_page_callback("admin_lunch", 3, backward=True) == "admin_lunch_page:p:3"
@@ -0,0 +1,54 @@
+from app.database.database import Database
+from app.database.version import data_version
+from app.keyboards import get_start_keyboard
+from app.utils.cache import RenderCache, VersionedCache
+from tests.conftest import run
+
+
+def test_render_cache_is_dropped_on_data_version_change():
+    cache = RenderCache()
+    cache.set(("menu", 1), "Меню", get_start_keyboard())
+    assert cache.get(("menu", 1)) == ("Меню", get_start_keyboard())
+
+    data_version.bump()
+    assert cache.get(("menu", 1)) is None
+    assert len(cache) == 0 and cache.bytes == 0
+
+
+def test_render_cache_evicts_least_recent_by_count_and_size():
+    cache = RenderCache(maxsize=2)
+    cache.set("a", "A")
+    cache.set("b", "B")
+    cache.get("a")
+    cache.set("c", "C")
+    assert (cache.get("a"), cache.get("b"), cache.get("c")) == (("A", None), None, ("C", None))
+
+    cache = RenderCache(max_bytes=2000)
+    cache.set("small", "x")
+    cache.set("large", "я" * 600)
+    cache.set("other", "я" * 600)
+    assert cache.get("small") is None
+    assert cache.get("other") is not None
+    assert cache.bytes <= cache.max_bytes
+    # Экран больше всего кэша не сохраняется и не вытесняет остальные
+    cache.set("huge", "я" * 5000)
+    assert cache.get("huge") is None and cache.get("other") is not None
+
+
+def test_versioned_cache_entries_expire_with_data_version():
+    cache = VersionedCache(maxsize=2)
+    cache.set(("Липецк", "борщ"), 3)
+    assert cache.get(("Липецк", "борщ")) == 3
+    data_version.bump()
+    assert cache.get(("Липецк", "борщ")) is None
+    cache.set(("Липецк", "борщ"), 4)
+    assert cache.get(("Липецк", "борщ")) == 4
+
+
+def test_user_city_cache_follows_add_user(db):
+    run(db.add_user(1, "user", "Липецк"))
+    assert run(db.get_user_city(1)) == "Липецк"
+    # Другой экземпляр Database с тем же файлом видит смену города
+    run(Database(db.db_name).add_user(1, "user", "Ковров"))
+    assert run(db.get_user_city(1)) == "Ковров"
+    assert run(db.get_user_city(2)) is None
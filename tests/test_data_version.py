@@ -0,0 +1,54 @@
+import asyncio
+
+from app.database import Database
+from app.database.version import data_version, watch_data_version
+from tests.conftest import run
+
+
+def test_watcher_bumps_only_on_content_changes(db):
+    async def scenario():
+        reloads = []
+
+        async def on_change():
+            reloads.append(await Database(db.db_name).load_city_timezones())
+
+        watcher = asyncio.create_task(watch_data_version(db.db_name, interval=0.01, on_change=on_change))
+        # Другой процесс пишет в базу через свои соединения
+        other = Database(db.db_name)
+        await asyncio.sleep(0.05)
+        start = data_version.value
+
+        await other.add_user(1, "user", "Липецк")
+        await other.set_user_location(1, 52.6, 39.6)
+        await other.save_geocode_cache([("липецк|улица ленина 1", 52.6, 39.6, "static")])
+        await other.get_search_query_id("суп")
+        await asyncio.sleep(0.05)
+        unrelated = data_version.value - start
+
+        await other.add_place("Обед", "ул. Ленина, 1", "Столовая", "Липецк")
+        await asyncio.sleep(0.05)
+        after_place = data_version.value - start
+
+        await other.set_city_timezone("Ковров", "Asia/Yekaterinburg")
+        await asyncio.sleep(0.05)
+        watcher.cancel()
+        return unrelated, after_place, reloads
+
+    # Версия данных увеличивается и в этом процессе при записи, поэтому считаем только изменения в нем
+    unrelated, after_place, reloads = run(scenario())
+    assert unrelated == 0
+    assert after_place == 2  # запись в этом процессе и изменение, замеченное наблюдателем
+    assert reloads[-1]["Ковров"] == "Asia/Yekaterinburg"
+
+
+def test_default_database_comes_from_environment(monkeypatch, tmp_path):
+    path = str(tmp_path / "configured.db")
+    monkeypatch.setenv("DATABASE_NAME", path)
+    assert Database().db_name == path
+    assert Database("other.db").db_name == "other.db"
+
+
+def test_city_timezone_change_invalidates_local_caches(db):
+    before = data_version.value
+    run(db.set_city_timezone("Липецк", "Asia/Yekaterinburg"))
+    assert data_version.value > before
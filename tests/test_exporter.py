@@ -0,0 +1,87 @@
+import gzip
+import json
+import sqlite3
+
+from app.database.database import Database
+from app.utils.exporter import export_places, export_to_file
+from app.utils.importer import import_stream
+from tests.conftest import run
+
+
+async def _read_file(path: str, size: int = 1024):
+    with open(path, "rb") as source:
+        while chunk := source.read(size):
+            yield chunk
+
+
+def _fill(db):
+    first = run(db.add_place("Обед", "ул. Ленина, 1", "Столовая", "Липецк", admin_comment="у вокзала"))
+    run(db.add_business_lunch(first, 350, "12:00", "15:00", weekday=1, description="Борщ\nКотлета"))
+    run(db.add_business_lunch(first, 300, "15:00", "17:00", weekday=1, description="Щи"))
+    run(db.add_business_lunch(first, 400, "12:00", "16:00", description="Суп дня"))
+    run(db.add_menu_item(first, "Борщ", 200, "Супы", "со сметаной"))
+    run(db.add_menu_item(first, "Морс", 80.5, "Напитки"))
+    run(db.add_review(42, first, 5, "Вкусно"))
+    second = run(db.add_place("Ужин", "ул. Мира, 2", "Кафе", "Ковров"))
+    run(db.add_menu_item(second, "Рагу", 450, "Горячее"))
+    return first, second
+
+
+def _snapshot(db):
+    """Заведения с ланчами и меню без ID, по которым можно сравнить две базы"""
+    result = {}
+    for city in ("Липецк", "Ковров"):
+        for place in run(db.get_places_page_for_admin(city)):
+            result[(city, place["name"], place["address"])] = _place_rows(db, place["id"])
+    return result
+
+
+def _place_rows(db, place_id):
+    lunches = run(db.get_business_lunches_for_all_days(place_id))
+    items = run(db.get_menu_items_by_place_id(place_id))
+    return (
+        sorted((lunch["weekday"], lunch["price"], lunch["start_time"], lunch["end_time"],
+                lunch["description"]) for lunch in lunches),
+        sorted((item["category"], item["name"], item["price"], item["description"]) for item in items),
+    )
+
+
+def test_export_import_round_trip(db, tmp_path):
+    _fill(db)
+    path = str(tmp_path / "places.jsonl.gz")
+    stats = run(export_to_file(db, path))
+    assert (stats["places"], stats["lunches"], stats["menu_items"], stats["reviews"]) == (2, 3, 3, 1)
+    assert stats["size"] > 0
+    assert not (tmp_path / "places.jsonl.gz.part").exists()
+
+    copy = Database(str(tmp_path / "copy.db"))
+    run(copy.create_tables())
+    imported = run(import_stream(copy, _read_file(path, size=13), "places.jsonl.gz"))
+    assert (imported["inserted"], imported["rejected"]) == (2, 0)
+    assert _snapshot(copy) == _snapshot(db)
+
+
+def test_export_in_small_batches_by_city(db):
+    _fill(db)
+    run(db.add_place("Полдник", "ул. Мира, 5", "Кафе", "Липецк"))
+
+    async def collect():
+        return b"".join([chunk async for chunk in export_places(db, "Липецк", stats, chunk_size=1)])
+
+    stats = {}
+    records = [json.loads(line) for line in gzip.decompress(run(collect())).decode().splitlines()]
+    assert [record["name"] for record in records] == ["Обед", "Полдник"]
+    assert stats["places"] == 2
+    monday = records[0]["business_lunch"]["days"]["понедельник"]
+    assert [day["price"] for day in monday] == [350, 300]
+    assert records[0]["reviews"][0]["rating"] == 5
+
+
+def test_backup_is_a_complete_database(db, tmp_path):
+    _fill(db)
+    target = tmp_path / "backup.db"
+    size = run(db.backup(str(target), pages=1, sleep=0))
+    assert size == target.stat().st_size
+    with sqlite3.connect(target) as connection:
+        assert connection.execute("PRAGMA integrity_check").fetchone() == ("ok",)
+        assert connection.execute("SELECT COUNT(*) FROM menu_items").fetchone() == (3,)
@@ -0,0 +1,97 @@
+import sqlite3
+import time
+
+from aiogram.fsm.state import State, StatesGroup
+from aiogram.fsm.storage.base import StorageKey
+
+from app.database import fsm_storage
+from app.database.fsm_storage import SQLiteStorage
+from tests.conftest import run
+
+
+class Steps(StatesGroup):
+    waiting = State()
+
+
+def _key(user_id: int) -> StorageKey:
+    return StorageKey(bot_id=1, chat_id=user_id, user_id=user_id)
+
+
+def test_state_and_data_survive_restart(tmp_path):
+    path = str(tmp_path / "fsm.db")
+
+    async def first_run():
+        storage = SQLiteStorage(path)
+        await storage.set_state(_key(1), Steps.waiting)
+        await storage.set_data(_key(1), {"place_id": 5, "place_name": "Обед"})
+        await storage.close()
+
+    async def second_run():
+        storage = SQLiteStorage(path)
+        try:
+            return await storage.get_state(_key(1)), await storage.get_data(_key(1)), await storage.get_state(_key(2))
+        finally:
+            await storage.close()
+
+    run(first_run())
+    assert run(second_run()) == (Steps.waiting.state, {"place_id": 5, "place_name": "Обед"}, None)
+
+
+def test_cleared_state_is_removed_from_file(tmp_path):
+    path = str(tmp_path / "fsm.db")
+
+    async def scenario():
+        storage = SQLiteStorage(path)
+        await storage.set_state(_key(1), Steps.waiting)
+        await storage.set_data(_key(1), {"step": 1})
+        await storage.set_state(_key(1), None)
+        await storage.set_data(_key(1), {})
+        await storage.close()
+
+    run(scenario())
+    with sqlite3.connect(path) as conn:
+        assert conn.execute("SELECT COUNT(*) FROM fsm_states").fetchone()[0] == 0
+
+
+def test_large_data_is_compressed(tmp_path):
+    path = str(tmp_path / "fsm.db")
+    data = {"menu": ["Борщ со сметаной и чесночными пампушками"] * 50}
+
+    async def scenario():
+        storage = SQLiteStorage(path, maxsize=1)
+        await storage.set_data(_key(1), data)
+        await storage.set_data(_key(2), {"small": True})  # вытесняет первый ключ из кэша
+        try:
+            return await storage.get_data(_key(1))
+        finally:
+            await storage.close()
+
+    assert run(scenario()) == data
+    with sqlite3.connect(path) as conn:
+        blobs = [row[0] for row in conn.execute("SELECT data FROM fsm_states")]
+    packed = [blob for blob in blobs if blob[:1] == b"z"]
+    assert len(packed) == 1 and len(packed[0]) < fsm_storage.COMPRESS_THRESHOLD
+
+
+def test_abandoned_scenarios_expire(tmp_path, monkeypatch):
+    path = str(tmp_path / "fsm.db")
+    now = time.time()
+
+    async def start():
+        storage = SQLiteStorage(path, ttl=60)
+        await storage.set_state(_key(1), Steps.waiting)
+        await storage.set_state(_key(2), Steps.waiting)
+        await storage.close()
+
+    async def resume():
+        storage = SQLiteStorage(path, ttl=60)
+        try:
+            return await storage.get_state(_key(1))
+        finally:
+            await storage.close()
+
+    run(start())
+    monkeypatch.setattr(fsm_storage.time, "time", lambda: now + 120)
+    assert run(resume()) is None
+    with sqlite3.connect(path) as conn:
+        assert conn.execute("SELECT COUNT(*) FROM fsm_states").fetchone()[0] == 0
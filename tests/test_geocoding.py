@@ -0,0 +1,90 @@
+import pytest
+
+from app.utils import geocoding
+from app.utils.geocoding import (
+    CsvGeocoder, Geocoder, StaticGeocoder, backfill_place_coordinates, geocode_address, normalize_address
+)
+from tests.conftest import run
+
+
+def test_normalize_address_unifies_spelling_but_keeps_word_order():
+    key = normalize_address("Липецк", "г. Липецк, ул. Ленина, д. 10")
+    assert key == "липецк|улица ленина 10"
+    assert normalize_address("Липецк", "Ленина улица 10") == key
+    assert normalize_address("Липецк", "ул. Ленина 5 к 2") != normalize_address("Липецк", "ул. Ленина 2 к 5")
+
+
+def test_geocoder_interface_is_abstract():
+    with pytest.raises(TypeError):
+        Geocoder()
+
+
+class CountingGeocoder(StaticGeocoder):
+    """Справочник, который считает обращения"""
+
+    def __init__(self, entries):
+        super().__init__(entries)
+        self.calls = 0
+
+    async def geocode(self, city, address):
+        self.calls += 1
+        return await super().geocode(city, address)
+
+
+def test_geocode_address_caches_found_and_missing_addresses(db):
+    geocoder = CountingGeocoder({("Липецк", "ул. Ленина, 10"): (52.61, 39.59)})
+
+    assert run(geocode_address(db, geocoder, "Липецк", "Ленина улица 10")) == (52.61, 39.59)
+    assert run(geocode_address(db, geocoder, "Липецк", "ул. Ленина, д. 10")) == (52.61, 39.59)
+    assert run(geocode_address(db, geocoder, "Липецк", "ул. Мира, 1")) is None
+    assert run(geocode_address(db, geocoder, "Липецк", "ул. Мира, 1")) is None
+    assert geocoder.calls == 2
+
+    assert run(geocode_address(db, geocoder, "Липецк", "ул. Мира, 1", refresh=True)) is None
+    assert geocoder.calls == 3
+
+
+def test_backfill_place_coordinates(db):
+    found = run(db.add_place("Обед", "ул. Ленина, 10", "Столовая", "Липецк"))
+    same_address = run(db.add_place("Ужин", "Ленина улица 10", "Кафе", "Липецк"))
+    run(db.add_place("Где-то", "ул. Мира, 1", "Кафе", "Липецк"))
+    geocoder = CountingGeocoder({("Липецк", "ул. Ленина, 10"): (52.61, 39.59)})
+
+    stats = run(backfill_place_coordinates(db, geocoder))
+    assert stats == {"total": 3, "cached": 0, "geocoded": 2, "missing": 1}
+    assert geocoder.calls == 2
+    for place_id in (found, same_address):
+        place = run(db.get_place_by_id(place_id))
+        assert (place["latitude"], place["longitude"]) == (52.61, 39.59)
+
+    stats = run(backfill_place_coordinates(db, geocoder, refresh=True))
+    assert stats == {"total": 3, "cached": 0, "geocoded": 2, "missing": 1}
+
+
+def test_csv_geocoder_reads_both_formats(tmp_path):
+    ready = tmp_path / "ready.csv"
+    ready.write_text("city,address,lat,lon\nЛипецк,\"ул. Ленина, 10\",52.61,39.59\nЛипецк,ул. Мира 1,,\n",
+                     encoding="utf-8")
+    osm = tmp_path / "osm.csv"
+    osm.write_text("addr:street,addr:housenumber,latitude,longitude\nулица Мира,5,56.36,41.31\n", encoding="utf-8")
+
+    geocoder = CsvGeocoder(str(ready))
+    assert len(geocoder) == 1
+    assert run(geocoder.geocode("Липецк", "Ленина улица 10")) == (52.61, 39.59)
+
+    geocoder = CsvGeocoder(str(osm), default_city="Ковров")
+    assert run(geocoder.geocode("Ковров", "ул. Мира, д. 5")) == (56.36, 41.31)
+
+
+def test_default_geocoder_is_loaded_once(tmp_path, monkeypatch):
+    path = tmp_path / "addresses.csv"
+    path.write_text("city,address,lat,lon\nЛипецк,ул. Ленина 10,52.61,39.59\n", encoding="utf-8")
+    monkeypatch.setattr(geocoding, "_default_geocoder", None)
+
+    monkeypatch.delenv("GEOCODER_CSV", raising=False)
+    assert run(geocoding.get_default_geocoder()) is None
+
+    monkeypatch.setenv("GEOCODER_CSV", str(path))
+    geocoder = run(geocoding.get_default_geocoder())
+    assert run(geocoder.geocode("Липецк", "ул. Ленина, 10")) == (52.61, 39.59)
+    assert run(geocoding.get_default_geocoder()) is geocoder
@@ -0,0 +1,124 @@
+import gzip
+import json
+
+import pytest
+
+from app.utils.importer import import_stream, normalize_place
+from tests.conftest import run
+
+
+async def _chunks(data: bytes, size: int):
+    """Отдает файл кусками по size байт, как при скачивании из Telegram"""
+    for start in range(0, len(data), size):
+        yield data[start:start + size]
+
+
+def _import(db, data: bytes, filename: str, size: int = 7, **kwargs):
+    return run(import_stream(db, _chunks(data, size), filename, **kwargs))
+
+
+PLACE = {
+    "name": "Обед",
+    "address": "ул. Ленина, 1",
+    "category": "Столовая",
+    "city": "Липецк",
+    "business_lunch": {
+        "time": "12:00 до 15:00",
+        "price": 350,
+        "days": {
+            "понедельник": {"positions": ["Борщ", "Котлета"]},
+            "вторник": [{"positions": ["Щи"]}, {"positions": ["Уха"], "time": "15:00 до 17:00", "price": 300}],
+        },
+    },
+    "menu": {"Супы": [{"name": "Борщ", "price": 200, "description": "со сметаной"}]},
+}
+
+
+def test_json_array_in_small_chunks(db):
+    # Куски по 7 байт разрезают и JSON, и многобайтовые символы UTF-8
+    data = json.dumps([PLACE, {**PLACE, "name": "Ужин"}], ensure_ascii=False).encode()
+    stats = _import(db, data, "places.json")
+    assert stats == {"processed": 2, "inserted": 2, "updated": 0, "rejected": 0, "errors": []}
+
+    place_id = run(db.get_places_page_for_admin("Липецк", "Обед"))[0]["id"]
+    lunches = run(db.get_business_lunches_for_all_days(place_id))
+    assert sorted((lunch["weekday"], lunch["price"]) for lunch in lunches) == [(1, 350), (2, 300), (2, 350)]
+    assert [item["name"] for item in run(db.get_menu_items_by_place_id(place_id))] == ["Борщ"]
+
+
+def test_reimport_updates_instead_of_duplicating(db):
+    data = json.dumps({"places": [PLACE]}, ensure_ascii=False).encode()
+    _import(db, data, "places.json")
+    stats = _import(db, data, "places.json")
+    assert (stats["inserted"], stats["updated"]) == (0, 1)
+    assert run(db.count_places_for_admin("Липецк")) == 1
+    place_id = run(db.get_places_page_for_admin("Липецк"))[0]["id"]
+    assert len(run(db.get_business_lunches_for_all_days(place_id))) == 3
+    assert len(run(db.get_menu_items_by_place_id(place_id))) == 1
+
+
+def test_jsonl_reports_bad_records_and_keeps_good_ones(db):
+    lines = [
+        json.dumps(PLACE, ensure_ascii=False),
+        "{оборванная строка",
+        json.dumps({**PLACE, "name": "Без цены", "business_lunch": {"time": "12:00 до 15:00",
+                                                                   "days": {"среда": {}}}}, ensure_ascii=False),
+        json.dumps({**PLACE, "name": "Чужой", "city": None}, ensure_ascii=False),
+    ]
+    stats = _import(db, "\n".join(lines).encode(), "places.jsonl", default_city="Ковров")
+    assert (stats["processed"], stats["inserted"], stats["rejected"]) == (4, 2, 2)
+    assert stats["errors"][0].startswith("#2")
+    assert "цена" in stats["errors"][1]
+    assert run(db.count_places_for_admin("Ковров")) == 1
+
+
+def test_csv_groups_rows_of_one_place(db):
+    csv_text = (
+        "city,name,address,category,day,time,lunch_price,positions,menu_category,item,item_price\n"
+        'Липецк,Обед,"ул. Ленина, 1",Столовая,понедельник,12:00 до 15:00,350,"Борщ;Котлета",,,\n'
+        'Липецк,Обед,"ул. Ленина, 1",Столовая,,,,,Супы,"Борщ\nдомашний",200\n'
+        "Липецк,Ужин,ул. Мира 2,Кафе,вторник,18:00 до 20:00,400,Рагу,,,\n"
+    )
+    stats = _import(db, csv_text.encode(), "places.csv", size=5)
+    assert (stats["processed"], stats["inserted"], stats["rejected"]) == (2, 2, 0)
+    place_id = run(db.get_places_page_for_admin("Липецк", "Обед"))[0]["id"]
+    assert [item["name"] for item in run(db.get_menu_items_by_place_id(place_id))] == ["Борщ\nдомашний"]
+    assert run(db.get_business_lunch_by_place_id(place_id, weekday=1))["description"] == "Борщ\nКотлета"
+
+
+def test_gzip_input(db):
+    data = gzip.compress(json.dumps(PLACE, ensure_ascii=False).encode())
+    stats = _import(db, data, "places.json.gz", size=16)
+    assert stats["inserted"] == 1
+
+
+def test_unknown_format_is_rejected(db):
+    with pytest.raises(ValueError):
+        _import(db, b"", "places.xml")
+
+
+def test_normalize_place_validation():
+    with pytest.raises(ValueError, match="день недели"):
+        normalize_place({**PLACE, "business_lunch": {**PLACE["business_lunch"], "days": {"праздник": {}}}})
+    with pytest.raises(ValueError, match="широта"):
+        normalize_place({**PLACE, "latitude": 123})
+    place = normalize_place({**PLACE, "city": ""}, default_city="Ковров")
+    assert place["city"] == "Ковров"
+
+
+def test_malformed_nested_fields_reject_only_their_record(db):
+    malformed = [
+        {**PLACE, "name": "Меню-объект", "menu": {"Супы": {"name": "Борщ"}}},
+        {**PLACE, "name": "Меню-число", "menu": {"Супы": 5}},
+        {**PLACE, "name": "Строки", "menu": {}, "menu_items": ["Борщ", "Щи"]},
+        {**PLACE, "name": "Словарь", "menu": {}, "menu_items": {"name": "Борщ"}},
+        {**PLACE, "name": "День-строка", "business_lunch": {"price": 300, "days": {"вторник": "Щи"}}},
+        {**PLACE, "name": "Позиции", "business_lunch": {"price": 300, "time": "12:00 до 15:00",
+                                                         "days": {"вторник": {"positions": "Щи"}}}},
+    ]
+    records = [PLACE, *malformed, {**PLACE, "name": "Ужин"}]
+    data = "\n".join(json.dumps(record, ensure_ascii=False) for record in records).encode()
+    stats = _import(db, data, "places.jsonl", batch_size=100)
+    assert (stats["processed"], stats["inserted"], stats["rejected"]) == (8, 2, 6)
+    assert all(name in error for name, error in zip([r["name"] for r in malformed], stats["errors"]))
+    assert [place["name"] for place in run(db.get_places_page_for_admin("Липецк"))] == ["Обед", "Ужин"]
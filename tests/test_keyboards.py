@@ -0,0 +1,48 @@
+from app.keyboards import inline
+from tests.conftest import run
+
+
+def test_static_keyboards_are_shared():
+    assert inline.get_start_keyboard() is inline.get_start_keyboard()
+    assert inline.get_city_selection_keyboard() is inline.get_city_selection_keyboard()
+    assert inline.get_location_request_keyboard() is inline.get_location_request_keyboard()
+    assert inline.get_start_keyboard() == inline._build_start_keyboard()
+
+
+def test_cached_keyboards_are_reused_per_arguments():
+    args = (42, 3, 30, "business_lunch_page", 2)
+    first = inline.get_full_place_details_keyboard(*args, show_price_filters=True)
+    hits = inline.get_full_place_details_keyboard.cache_info().hits
+    assert inline.get_full_place_details_keyboard(*args, show_price_filters=True) is first
+    assert inline.get_full_place_details_keyboard.cache_info().hits == hits + 1
+    assert inline.get_full_place_details_keyboard(*args, show_price_filters=False) is not first
+
+
+def test_cached_keyboard_matches_fresh_build():
+    built = inline.get_place_details_keyboard.__wrapped__(42)
+    assert inline.get_place_details_keyboard(42) == built
+
+
+def _callbacks(markup):
+    return [button.callback_data for row in markup.inline_keyboard for button in row if button.callback_data]
+
+
+def test_menu_search_callbacks_fit_telegram_limit(db):
+    query = "Суп с фрикадельками из индейки и домашней лапшой по-деревенски" * 2
+    query_id = run(db.get_search_query_id(query)) + 10 ** 9
+    place_id, page, total = 2 ** 31, 99999, 100000
+
+    keyboards = [
+        inline.get_menu_search_pagination_keyboard([], page, total, place_id, query_id),
+        inline.get_menu_search_pagination_keyboard(
+            [], page, total, place_id, query_id, price_sorted=True,
+            nav_callbacks=(inline.menu_price_callback(query_id, 700, page - 1, (0.1 + 0.2, place_id), backward=True),
+                           inline.menu_price_callback(query_id, 700, page + 1, (1234567.891, place_id)))
+        ),
+        inline.get_price_comparison_keyboard(query_id),
+        inline.get_price_limit_keyboard(query_id=query_id),
+    ]
+    callbacks = [data for markup in keyboards for data in _callbacks(markup)]
+    assert any(data.startswith("menu_compare:") for data in callbacks)
+    assert all(query not in data for data in callbacks)
+    assert max(len(data.encode()) for data in callbacks) <= 64
@@ -0,0 +1,31 @@
+from app.handlers import business_lunch
+from app.utils.cache import render_cache
+from tests.conftest import FakeCallback, run
+
+
+def _show_list(data: str = "bl_list:1:1") -> str:
+    callback = FakeCallback(data)
+    run(business_lunch.callback_business_lunch_list(callback))
+    return callback.text
+
+
+def test_list_page_is_cached_until_data_changes(db, monkeypatch):
+    monkeypatch.setenv("DATABASE_NAME", db.db_name)
+    run(db.add_user(1, "user", "Липецк"))
+    first = run(db.add_place("Обед", "ул. Ленина, 1", "Столовая", "Липецк"))
+    run(db.add_business_lunch(first, 350, "12:00", "15:00", weekday=1))
+
+    text = _show_list()
+    assert "1. *Обед* — 350 руб., 12:00-15:00\n" in text
+    hits = render_cache.hits
+    assert _show_list() == text
+    assert render_cache.hits == hits + 1
+
+    # Новый отзыв меняет рейтинг в списке
+    run(db.add_review(2, first, 4, "Неплохо"))
+    assert "1. *Обед* — 350 руб., 12:00-15:00, ⭐ 4.0\n" in _show_list()
+
+    # Новое заведение попадает в список и в число страниц
+    second = run(db.add_place("Ужин", "ул. Мира, 2", "Кафе", "Липецк"))
+    run(db.add_business_lunch(second, 300, "12:00", "14:00", weekday=1))
+    assert "2. *Ужин* — 300 руб., 12:00-14:00\n" in _show_list()
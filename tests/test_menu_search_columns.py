@@ -0,0 +1,34 @@
+import aiosqlite
+
+from tests.conftest import run
+
+
+def test_startup_backfills_search_columns_of_old_rows(db):
+    place_id = run(db.add_place("Щи да каша", "ул. Ленина, 1", "Столовая", "Липецк"))
+    run(db.add_menu_item(place_id, "Борщ  Ёжкин", 250, "Первые БЛЮДА"))
+    run(db.add_menu_item(place_id, "Компот", 80, "Напитки"))
+
+    async def forget_search_columns():
+        # Так выглядят позиции меню, добавленные до появления поисковых колонок
+        async with aiosqlite.connect(db.db_name) as connection:
+            await connection.execute("UPDATE menu_items SET normalized_name = NULL, normalized_category = NULL")
+            await connection.commit()
+
+    run(forget_search_columns())
+    assert run(db.search_places_by_menu("борщ", "Липецк")) == []
+
+    run(db.create_tables())
+
+    async def search_columns():
+        async with aiosqlite.connect(db.db_name) as connection:
+            cursor = await connection.execute(
+                "SELECT normalized_name, normalized_category FROM menu_items ORDER BY id"
+            )
+            return await cursor.fetchall()
+
+    assert run(search_columns()) == [("борщ ежкин", "первые блюда"), ("компот", "напитки")]
+    assert [place["id"] for place in run(db.search_places_by_menu("БОРЩ", "Липецк"))] == [place_id]
+    items, total = run(db.get_matching_menu_items(place_id, "ёжкин"))
+    assert total == 1 and items[0]["name"] == "Борщ  Ёжкин"
+    _, total = run(db.get_matching_menu_items(place_id, "Первые блюда", category_only=True))
+    assert total == 1
@@ -0,0 +1,209 @@
+import asyncio
+from datetime import datetime
+
+from aiogram import Bot
+from aiogram.client.session.base import BaseSession
+from aiogram.exceptions import TelegramBadRequest
+from aiogram.methods import AnswerCallbackQuery, EditMessageText, SendMessage
+from aiogram.types import CallbackQuery, Chat, InlineKeyboardButton, InlineKeyboardMarkup, Message, User
+
+from app.middlewares.fast_ack import FastAckMiddleware
+from app.middlewares.throttling import SLOW_DOWN_TEXT, CallbackDedupMiddleware, UserThrottleMiddleware
+from app.utils.edit_guard import EditGuardMiddleware
+from tests.conftest import run
+
+
+class FakeSession(BaseSession):
+    """Сессия без сети: запоминает запросы, ошибку для следующего запроса можно задать заранее"""
+
+    def __init__(self):
+        super().__init__()
+        self.sent = []
+        self.errors = []
+
+    async def make_request(self, bot, method, timeout=None):
+        self.sent.append(method)
+        if self.errors:
+            raise self.errors.pop(0)
+        if isinstance(method, SendMessage):
+            return Message(message_id=len(self.sent), date=datetime.now(),
+                           chat=Chat(id=method.chat_id, type="private"), text=method.text)
+        return True
+
+    async def close(self):
+        pass
+
+    async def stream_content(self, *args, **kwargs):
+        yield b""
+
+
+def _bot(*middlewares) -> Bot:
+    session = FakeSession()
+    for middleware in middlewares:
+        session.middleware(middleware)
+    return Bot("123456:TEST", session=session)
+
+
+def _markup(data: str) -> InlineKeyboardMarkup:
+    return InlineKeyboardMarkup(inline_keyboard=[[InlineKeyboardButton(text="Дальше", callback_data=data)]])
+
+
+def test_edit_guard_skips_edits_that_change_nothing():
+    guard = EditGuardMiddleware()
+    bot = _bot(guard)
+
+    async def scenario():
+        message = await bot.send_message(1, "Меню", reply_markup=_markup("next"))
+        same = await bot.edit_message_text("Меню", chat_id=1, message_id=message.message_id,
+                                           reply_markup=_markup("next"))
+        changed = await bot.edit_message_text("Меню", chat_id=1, message_id=message.message_id,
+                                              reply_markup=_markup("back"))
+        again = await bot.edit_message_text("Меню", chat_id=1, message_id=message.message_id,
+                                            reply_markup=_markup("back"))
+        return same, changed, again
+
+    assert run(scenario()) == (True, True, True)
+    assert [type(method) for method in bot.session.sent] == [SendMessage, EditMessageText]
+    assert guard.skipped == 2
+
+
+def test_edit_guard_treats_not_modified_as_success():
+    guard = EditGuardMiddleware()
+    bot = _bot(guard)
+    edit = EditMessageText(chat_id=1, message_id=5, text="Меню")
+
+    async def scenario():
+        bot.session.errors.append(TelegramBadRequest(edit, "Bad Request: message is not modified"))
+        result = await bot(edit)
+        # Сообщение уже показывает этот текст: повтор в Telegram не уходит
+        repeated = await bot(edit)
+        bot.session.errors.append(TelegramBadRequest(edit, "Bad Request: message to edit not found"))
+        try:
+            await bot(EditMessageText(chat_id=1, message_id=5, text="Другое"))
+        except TelegramBadRequest:
+            return result, repeated, True
+        return result, repeated, False
+
+    assert run(scenario()) == (True, True, True)
+    assert len(bot.session.sent) == 2
+    assert guard.skipped == 1
+    # После другой ошибки показанный текст неизвестен, и редактирование снова уходит в Telegram
+    run(bot(edit))
+    assert len(bot.session.sent) == 3
+
+
+USER = User(id=1, is_bot=False, first_name="Иван")
+
+
+def _callback(bot: Bot, data: str, callback_id: str = "1") -> CallbackQuery:
+    message = Message(message_id=10, date=datetime.now(), chat=Chat(id=1, type="private"), text="Меню")
+    return CallbackQuery(id=callback_id, from_user=USER, chat_instance="1", message=message, data=data).as_(bot)
+
+
+def _answers(bot: Bot):
+    return [(method.text, method.show_alert) for method in bot.session.sent if isinstance(method, AnswerCallbackQuery)]
+
+
+def test_duplicate_press_in_flight_gets_empty_answer():
+    dedup = CallbackDedupMiddleware()
+    bot = _bot()
+    handled = []
+
+    async def scenario():
+        release = asyncio.Event()
+
+        async def handler(event, data):
+            handled.append(event.id)
+            await release.wait()
+            return "готово"
+
+        first = asyncio.create_task(dedup(handler, _callback(bot, "next", "1"), {}))
+        await asyncio.sleep(0)
+        duplicate = await dedup(handler, _callback(bot, "next", "2"), {})
+        other_button = asyncio.create_task(dedup(handler, _callback(bot, "back", "3"), {}))
+        await asyncio.sleep(0)
+        release.set()
+        results = [await first, duplicate, await other_button]
+        # Когда первое нажатие обработано, та же кнопка снова работает
+        results.append(await dedup(handler, _callback(bot, "next", "4"), {}))
+        return results
+
+    assert run(scenario()) == ["готово", None, "готово", "готово"]
+    assert handled == ["1", "3", "4"]
+    assert _answers(bot) == [(None, None)]
+    assert dedup.dropped == 1
+
+
+def test_user_over_rate_gets_toast_for_buttons_and_silence_for_messages():
+    throttle = UserThrottleMiddleware(rate=0.001, burst=2)
+    bot = _bot()
+    handled = []
+
+    async def handler(event, data):
+        handled.append(event)
+        return True
+
+    async def scenario():
+        results = [await throttle(handler, _callback(bot, "next", str(index)), {}) for index in range(3)]
+        message = Message(message_id=11, date=datetime.now(), chat=Chat(id=1, type="private"),
+                          from_user=USER, text="борщ").as_(bot)
+        results.append(await throttle(handler, message, {}))
+        other = Message(message_id=12, date=datetime.now(), chat=Chat(id=2, type="private"),
+                        from_user=User(id=2, is_bot=False, first_name="Петр"), text="борщ").as_(bot)
+        results.append(await throttle(handler, other, {}))
+        return results
+
+    assert run(scenario()) == [True, True, None, None, True]
+    assert len(handled) == 3
+    assert _answers(bot) == [(SLOW_DOWN_TEXT, None)]
+    assert throttle.throttled == 2
+
+
+def _press(fast_ack: FastAckMiddleware, handler, data: str = "next"):
+    """Нажатие кнопки проходит через FastAckMiddleware; возвращает запросы, ушедшие в Telegram"""
+    bot = _bot(fast_ack.request_middleware)
+
+    async def scenario():
+        await fast_ack(handler, _callback(bot, data), {})
+        # Ждем фоновый быстрый ответ
+        await asyncio.gather(*fast_ack._tasks)
+
+    run(scenario())
+    return bot.session.sent
+
+
+def test_late_plain_answer_is_suppressed():
+    fast_ack = FastAckMiddleware(toasts={"next": "Листаю…"})
+
+    async def handler(event, data):
+        await asyncio.sleep(0)
+        await event.answer("Готово")
+
+    sent = _press(fast_ack, handler)
+    assert [(method.text, method.show_alert) for method in sent] == [("Листаю…", None)]
+    assert fast_ack.suppressed == 1
+
+
+def test_late_alert_becomes_message():
+    fast_ack = FastAckMiddleware()
+
+    async def handler(event, data):
+        await asyncio.sleep(0)
+        await event.answer("Заведение не найдено", show_alert=True)
+
+    sent = _press(fast_ack, handler)
+    assert [type(method) for method in sent] == [AnswerCallbackQuery, SendMessage]
+    assert (sent[1].chat_id, sent[1].text) == (1, "Заведение не найдено")
+    assert fast_ack.follow_ups == 1
+
+
+def test_handler_answering_first_wins():
+    fast_ack = FastAckMiddleware(toasts={"next": "Листаю…"})
+
+    async def handler(event, data):
+        await event.answer("Поиск устарел", show_alert=True)
+
+    sent = _press(fast_ack, handler)
+    assert [(method.text, method.show_alert) for method in sent] == [("Поиск устарел", True)]
+    assert fast_ack.suppressed == 1
+    assert fast_ack.follow_ups == 0
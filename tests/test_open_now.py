@@ -0,0 +1,82 @@
+from datetime import datetime, timezone
+
+from app.handlers import business_lunch
+from app.utils import clock
+from tests.conftest import FakeCallback, run
+
+
+def _fill(db):
+    """Ланчи в Липецке: дневной по понедельникам, ночной через полночь, ежедневный и воскресный ночной"""
+    places = {}
+    for name, start, end, weekday in (
+        ("Обед", "12:00", "15:00", 1),
+        ("Ужин", "18:00", "20:00", 1),
+        ("Ночной", "22:00", "02:00", 1),
+        ("Всегда", "11:00", "12:00", 0),
+        ("Воскресный", "23:00", "01:00", 7),
+    ):
+        places[name] = run(db.add_place(name, f"ул. {name}", "Кафе", "Липецк"))
+        run(db.add_business_lunch(places[name], 300, start, end, weekday=weekday))
+    return places
+
+
+def _open(db, weekday, hours, minutes=0):
+    open_at = hours * 60 + minutes
+    names = [place["name"] for place in run(db.get_business_lunches("Липецк", weekday=weekday, open_at=open_at))]
+    assert run(db.count_business_lunches("Липецк", weekday=weekday, open_at=open_at)) == len(names)
+    return sorted(names)
+
+
+def test_open_now_inside_and_outside_opening_hours(db):
+    _fill(db)
+    assert _open(db, 1, 13) == ["Обед"]
+    # Ланч, который начнется в ближайшие полчаса, тоже показывается
+    assert _open(db, 1, 11, 40) == ["Всегда", "Обед"]
+    assert _open(db, 1, 15) == []
+    assert _open(db, 1, 21) == []
+    assert _open(db, 2, 13) == []
+    assert len(run(db.get_business_lunches("Липецк", weekday=1))) == 4
+
+
+def test_open_now_window_through_midnight(db):
+    _fill(db)
+    assert _open(db, 1, 23) == ["Ночной"]
+    # После полуночи идет ланч, начавшийся накануне
+    assert _open(db, 2, 1) == ["Ночной"]
+    assert _open(db, 2, 2) == []
+    assert _open(db, 1, 0, 30) == ["Воскресный"]
+
+    card = business_lunch._format_lunch_card(
+        {"name": "Ночной", "address": "ул. Ночной", "city": "Липецк", "price": 300, "start_time": "22:00",
+         "end_time": "02:00", "start_minute": 22 * 60, "end_minute": 120, "description": None},
+        [], 1, now_minute=60
+    )
+    assert "Идёт сейчас, до 02:00" in card
+
+
+def _freeze(monkeypatch, moment: datetime):
+    class FrozenDatetime(datetime):
+        @classmethod
+        def now(cls, tz=None):
+            return moment.astimezone(tz) if tz else moment.replace(tzinfo=None)
+
+    monkeypatch.setattr(clock, "datetime", FrozenDatetime)
+
+
+def test_open_now_uses_city_time_zone(db, monkeypatch):
+    _fill(db)
+    monkeypatch.setenv("DATABASE_NAME", db.db_name)
+    run(db.add_user(1, "user", "Липецк"))
+    # Понедельник, 03:30 UTC: во Владивостоке 13:30, в Москве 06:30
+    _freeze(monkeypatch, datetime(2026, 10, 19, 3, 30, tzinfo=timezone.utc))
+
+    run(db.set_city_timezone("Липецк", "Asia/Vladivostok"))
+    callback = FakeCallback("bl_now:1")
+    run(business_lunch.callback_business_lunch_now(callback))
+    assert "*Обед*" in callback.text
+    assert "Идёт сейчас, до 15:00" in callback.text
+
+    run(db.set_city_timezone("Липецк", "Europe/Moscow"))
+    callback = FakeCallback("bl_now:1")
+    run(business_lunch.callback_business_lunch_now(callback))
+    assert callback.text.startswith("Сейчас в городе Липецк нет идущих бизнес-ланчей")
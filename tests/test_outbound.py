@@ -0,0 +1,147 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from aiogram.client.session.aiohttp import AiohttpSession
+from aiogram.exceptions import TelegramRetryAfter
+from aiogram.methods import AnswerCallbackQuery, GetUpdates, SendMessage
+
+from app.utils import rate_limit, session
+from app.utils.rate_limit import LANE_BULK, LANE_CALLBACK, LANE_INTERACTIVE, OutboundScheduler, bulk_lane
+from app.utils.session import MAX_RETRIES, ThrottledSession
+from tests.conftest import run
+
+
+class FakeClock:
+    """Часы планировщика: sleep не ждет, а переводит время вперед и запоминает паузу"""
+
+    def __init__(self):
+        self.now = 1000.0
+        self.sleeps = []
+
+    def monotonic(self) -> float:
+        return self.now
+
+    async def sleep(self, seconds: float):
+        self.sleeps.append(seconds)
+        self.now += seconds
+        await asyncio.sleep(0)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    fake_asyncio = SimpleNamespace(**{name: getattr(asyncio, name) for name in dir(asyncio) if not name.startswith("_")})
+    fake_asyncio.sleep = fake.sleep
+    monkeypatch.setattr(rate_limit, "time", SimpleNamespace(monotonic=fake.monotonic))
+    monkeypatch.setattr(rate_limit, "asyncio", fake_asyncio)
+    monkeypatch.setattr(session, "asyncio", fake_asyncio)
+    return fake
+
+
+def test_callbacks_go_before_replies_and_bulk():
+    scheduler = OutboundScheduler(global_rate=1000)
+    scheduler.global_bucket.tokens = 0
+    order = []
+
+    async def send(lane):
+        await scheduler.acquire(lane)
+        order.append(lane)
+
+    async def scenario():
+        # Все три запроса встают в очередь раньше, чем освобождается общий токен
+        await asyncio.gather(send(LANE_BULK), send(LANE_INTERACTIVE), send(LANE_CALLBACK))
+        await scheduler.close()
+
+    run(scenario())
+    assert order == [LANE_CALLBACK, LANE_INTERACTIVE, LANE_BULK]
+    assert scheduler.metrics["sent_callback"] == scheduler.metrics["sent_bulk"] == 1
+
+
+def test_each_chat_has_own_bucket(clock):
+    scheduler = OutboundScheduler(chat_rate=1, chat_burst=2)
+
+    async def scenario():
+        for _ in range(4):
+            await scheduler.acquire(LANE_INTERACTIVE, chat_id=1)
+        sleeps_for_first_chat = list(clock.sleeps)
+        await scheduler.acquire(LANE_INTERACTIVE, chat_id=2)
+        await scheduler.close()
+        return sleeps_for_first_chat
+
+    # Всплеск из двух сообщений сразу, дальше по одному в секунду; другой чат не ждет
+    assert run(scenario()) == [1.0, 1.0]
+    assert clock.sleeps == [1.0, 1.0]
+    assert scheduler.snapshot()["chat_buckets"] == 2
+
+
+def test_retry_after_pauses_chat_or_everything(clock):
+    scheduler = OutboundScheduler()
+    scheduler.retry_after(10, chat_id=5)
+    assert scheduler._chat_bucket(5).delay() == 10
+    assert scheduler._chat_bucket(6).delay() == 0
+    assert scheduler.global_bucket.delay() == 0
+
+    scheduler.retry_after(3)
+    assert scheduler.global_bucket.delay() == 3
+    clock.now += 10
+    assert scheduler._chat_bucket(5).delay() == 0
+    assert scheduler.global_bucket.delay() == 0
+    assert scheduler.metrics["retry_after"] == 2
+
+
+def _session(monkeypatch, failures: int):
+    """Сессия, у которой Telegram первые failures раз отвечает retry_after = 2"""
+    calls = []
+
+    async def make_request(self, bot, method, timeout=None):
+        calls.append(method)
+        if len(calls) <= failures:
+            raise TelegramRetryAfter(method=method, message="Too Many Requests", retry_after=2)
+        return "ok"
+
+    monkeypatch.setattr(AiohttpSession, "make_request", make_request)
+    return ThrottledSession(), calls
+
+
+def test_session_retries_after_retry_after(clock, monkeypatch):
+    throttled, calls = _session(monkeypatch, failures=2)
+    method = SendMessage(chat_id=7, text="привет")
+
+    async def scenario():
+        result = await throttled.make_request(None, method)
+        await throttled.scheduler.close()
+        return result
+
+    assert run(scenario()) == "ok"
+    assert len(calls) == 3
+    assert throttled.scheduler.metrics["retry_after"] == 2
+    assert throttled.scheduler.metrics["failed"] == 0
+    assert sum(clock.sleeps) >= 4
+
+
+def test_session_gives_up_after_max_retries(clock, monkeypatch):
+    throttled, calls = _session(monkeypatch, failures=MAX_RETRIES + 1)
+
+    async def scenario():
+        try:
+            await throttled.make_request(None, SendMessage(chat_id=7, text="привет"))
+        finally:
+            await throttled.scheduler.close()
+
+    with pytest.raises(TelegramRetryAfter):
+        run(scenario())
+    assert len(calls) == MAX_RETRIES + 1
+    assert throttled.scheduler.metrics["failed"] == 1
+
+
+def test_session_lanes_and_polling_bypass(clock, monkeypatch):
+    throttled, calls = _session(monkeypatch, failures=0)
+    assert throttled._lane(AnswerCallbackQuery(callback_query_id="1")) == LANE_CALLBACK
+    assert throttled._lane(SendMessage(chat_id=1, text="x")) == LANE_INTERACTIVE
+    with bulk_lane():
+        assert throttled._lane(SendMessage(chat_id=1, text="x")) == LANE_BULK
+
+    run(throttled.make_request(None, GetUpdates(timeout=30)))
+    assert len(calls) == 1
+    assert throttled.scheduler.metrics["sent"] == 0
@@ -0,0 +1,78 @@
+import asyncio
+
+from app.utils.prefetch import Prefetcher
+from tests.conftest import run
+
+
+def test_new_task_cancels_previous_task_of_same_user():
+    prefetcher = Prefetcher()
+    finished = []
+
+    async def render(page: int, delay: float):
+        await asyncio.sleep(delay)
+        finished.append(page)
+
+    async def scenario():
+        assert prefetcher.schedule(1, render, 2, 0.05)
+        first = prefetcher._tasks[1]
+        assert prefetcher.schedule(1, render, 3, 0)
+        # Задача другого пользователя не трогается
+        assert prefetcher.schedule(2, render, 5, 0.01)
+        await asyncio.sleep(0.1)
+        return first
+
+    first = run(scenario())
+
+    assert first.cancelled()
+    assert sorted(finished) == [3, 5]
+    assert prefetcher.cancelled == 1
+    assert prefetcher.started == 3
+    # Завершенные задачи удаляются из реестра
+    assert len(prefetcher) == 0
+
+
+def test_global_cap_skips_new_tasks():
+    prefetcher = Prefetcher(max_tasks=2)
+    release = None
+
+    async def render():
+        await release.wait()
+
+    async def scenario():
+        nonlocal release
+        release = asyncio.Event()
+        assert prefetcher.schedule(1, render)
+        assert prefetcher.schedule(2, render)
+        assert not prefetcher.schedule(3, render)
+        # Повторная задача пользователя заменяет его собственную и в лимит укладывается
+        assert prefetcher.schedule(2, render)
+        assert len(prefetcher) == 2
+
+        release.set()
+        await asyncio.sleep(0.01)
+        assert len(prefetcher) == 0
+        assert prefetcher.schedule(3, render)
+        await asyncio.sleep(0.01)
+
+    run(scenario())
+
+    assert prefetcher.skipped == 1
+    assert prefetcher.started == 4
+
+
+def test_error_in_prefetch_is_swallowed():
+    prefetcher = Prefetcher()
+
+    async def broken():
+        raise RuntimeError("boom")
+
+    async def scenario():
+        prefetcher.schedule(1, broken)
+        task = prefetcher._tasks[1]
+        await asyncio.sleep(0.01)
+        return task
+
+    task = run(scenario())
+
+    assert task.done() and task.exception() is None
+    assert len(prefetcher) == 0
@@ -0,0 +1,87 @@
+from app.keyboards import lunch_price_callback, menu_price_callback
+from tests.conftest import run
+
+
+def _walk(fetch, cursor_of):
+    """Листает страницы по одной записи вперед до конца, затем от последней назад до начала"""
+    pages, cursor = [], None
+    while True:
+        rows = run(fetch(cursor, False))
+        if not rows:
+            break
+        pages.append(rows[0])
+        cursor = cursor_of(rows[0])
+    backward, cursor = [pages[-1]], cursor_of(pages[-1])
+    while True:
+        rows = run(fetch(cursor, True))
+        if not rows:
+            break
+        backward.append(rows[0])
+        cursor = cursor_of(rows[0])
+    return pages, backward[::-1]
+
+
+def test_menu_price_pages_list_each_place_once_by_cheapest_item(db):
+    cheap = run(db.add_place("Борщевая", "ул. Ленина, 1", "Столовая", "Липецк"))
+    middle = run(db.add_place("Уха", "ул. Мира, 2", "Кафе", "Липецк"))
+    tied = run(db.add_place("Щи", "ул. Мира, 3", "Кафе", "Липецк"))
+    other_city = run(db.add_place("Суповая", "ул. Мира, 4", "Кафе", "Ковров"))
+    run(db.add_menu_item(cheap, "Суп дня", 150.1, "Супы"))
+    run(db.add_menu_item(cheap, "Суп грибной", 150.1, "Супы"))
+    run(db.add_menu_item(cheap, "Суп сырный", 900, "Супы"))
+    run(db.add_menu_item(middle, "Суп рыбный", 300, "Супы"))
+    run(db.add_menu_item(middle, "Салат", 100, "Салаты"))
+    run(db.add_menu_item(tied, "Суп щи", 300, "Супы"))
+    run(db.add_menu_item(other_city, "Суп дня", 50, "Супы"))
+
+    def fetch(cursor, backward):
+        return db.search_places_by_menu_price("суп", "Липецк", cursor=cursor, backward=backward)
+
+    forward, backward = _walk(fetch, lambda place: (place["min_price"], place["id"]))
+    assert [(place["id"], place["min_price"]) for place in forward] == [
+        (cheap, 150.1), (middle, 300), (tied, 300)
+    ]
+    assert backward == forward
+    assert run(db.count_search_results_by_price("суп", "Липецк")) == 3
+
+    limited = run(db.search_places_by_menu_price("суп", "Липецк", max_price=200, limit=10))
+    assert [place["id"] for place in limited] == [cheap]
+    assert run(db.count_search_results_by_price("суп", "Липецк", max_price=200)) == 1
+
+
+def test_lunch_price_pages_count_places_not_lunches(db):
+    first = run(db.add_place("Обед", "ул. Ленина, 1", "Столовая", "Липецк"))
+    second = run(db.add_place("Ужин", "ул. Мира, 2", "Кафе", "Липецк"))
+    every_day = run(db.add_place("Всегда", "ул. Мира, 3", "Кафе", "Липецк"))
+    run(db.add_business_lunch(first, 250, "12:00", "15:00", weekday=1))
+    run(db.add_business_lunch(first, 400, "15:00", "17:00", weekday=1))
+    run(db.add_business_lunch(second, 300, "12:00", "15:00", weekday=1))
+    run(db.add_business_lunch(every_day, 350, "12:00", "15:00"))
+    run(db.add_business_lunch(every_day, 200, "11:00", "12:00"))
+
+    def fetch(cursor, backward):
+        return db.get_business_lunches_by_price("Липецк", weekday=1, cursor=cursor, backward=backward)
+
+    forward, backward = _walk(fetch, lambda lunch: (lunch["price"], lunch["lunch_id"]))
+    assert [(lunch["id"], lunch["price"]) for lunch in forward] == [
+        (every_day, 200), (first, 250), (second, 300)
+    ]
+    assert backward == forward
+    assert run(db.count_business_lunches_by_price("Липецк", weekday=1)) == 3
+    assert run(db.count_business_lunches_by_price("Липецк", weekday=1, max_price=260)) == 2
+
+
+def test_price_callbacks_keep_exact_cursor_and_fit_telegram_limit(db):
+    query = "Очень длинный поисковый запрос про суп с фрикадельками и сметаной"
+    query_id = run(db.get_search_query_id(query))
+    assert run(db.get_search_query_id(query)) == query_id
+    assert run(db.get_search_query(query_id)) == query
+
+    price = 0.1 + 0.2
+    data = menu_price_callback(query_id, 700, 12345, (price, 987654), backward=True)
+    assert len(data.encode()) <= 64
+    assert float(data.split(":")[5]) == price
+
+    data = lunch_price_callback(7, 700, 12345, (1234567.891, 987654))
+    assert len(data.encode()) <= 64
+    assert float(data.split(":")[5]) == 1234567.891
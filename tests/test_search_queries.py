@@ -0,0 +1,28 @@
+import aiosqlite
+
+from app.database.database import Database
+from tests.conftest import run
+
+
+def test_query_id_is_stable_and_old_queries_are_pruned(db):
+    kept = run(db.get_search_query_id("борщ"))
+    stale = run(db.get_search_query_id("окрошка"))
+    assert run(db.get_search_query_id("борщ")) == kept
+
+    async def age(query_id, days):
+        async with aiosqlite.connect(db.db_name) as connection:
+            await connection.execute(
+                "UPDATE search_queries SET last_used_at = datetime('now', ?) WHERE id = ?", (f"-{days} days", query_id)
+            )
+            await connection.commit()
+
+    run(age(kept, 40))
+    run(age(stale, 40))
+    # Повторный ввод запроса продлевает его жизнь
+    run(db.get_search_query_id("борщ"))
+
+    run(Database(db.db_name).create_tables())
+    assert run(db.get_search_query(kept)) == "борщ"
+    assert run(db.get_search_query(stale)) is None
+    # ID удаленного запроса не достается новому запросу
+    assert run(db.get_search_query_id("окрошка")) > stale
@@ -0,0 +1,97 @@
+import random
+
+import pytest
+
+from app.database import spatial
+from app.database.spatial import CELL_DEG, CityGrid, CityPoints, SpatialIndex
+from app.utils.geo import haversine_km
+from tests.conftest import run
+
+
+def _brute_force(points, lat, lon, k, allowed=None):
+    return sorted(
+        (haversine_km(lat, lon, place_lat, place_lon), place_id)
+        for place_id, place_lat, place_lon in points
+        if allowed is None or allowed(place_id)
+    )[:k]
+
+
+def _grid(points):
+    grid = CityGrid()
+    for place_id, lat, lon in points:
+        grid.add(place_id, lat, lon)
+    return grid
+
+
+def test_nearest_matches_brute_force_on_random_points():
+    rng = random.Random(42)
+    points = [(place_id, rng.uniform(52.55, 52.65), rng.uniform(39.5, 39.7)) for place_id in range(1, 301)]
+    grid = _grid(points)
+    for _ in range(200):
+        # Точки и внутри города, и за его пределами, где ближние ячейки пусты
+        lat, lon = rng.uniform(52.45, 52.75), rng.uniform(39.3, 39.9)
+        k = rng.choice((1, 5, 20))
+        assert grid.nearest(lat, lon, k) == _brute_force(points, lat, lon, k)
+
+    even = lambda place_id: place_id % 2 == 0
+    assert grid.nearest(52.6, 39.6, 10, even) == _brute_force(points, 52.6, 39.6, 10, even)
+
+
+def test_nearest_grows_rings_past_empty_cells():
+    # Два скопления в 10 км друг от друга, между ними пустые ячейки
+    points = [(1, 52.6, 39.6), (2, 52.601, 39.601), (3, 52.69, 39.6), (4, 52.691, 39.601)]
+    grid = _grid(points)
+    for lat, lon in ((52.645, 39.6), (52.68, 39.6), (52.5, 39.5)):
+        assert grid.nearest(lat, lon, 3) == _brute_force(points, lat, lon, 3)
+    assert [place_id for _, place_id in grid.nearest(52.6, 39.6, 10)] == [1, 2, 3, 4]
+
+
+def test_nearest_on_cell_boundaries():
+    # Заведения ровно на границах ячеек и чуть по разные стороны от них
+    points = []
+    for index, (i, j) in enumerate((i, j) for i in range(5260, 5263) for j in range(3960, 3963)):
+        base_lat, base_lon = i * CELL_DEG, j * CELL_DEG
+        points.append((3 * index + 1, base_lat, base_lon))
+        points.append((3 * index + 2, base_lat - 1e-7, base_lon + 1e-7))
+        points.append((3 * index + 3, base_lat + 0.0049, base_lon - 0.0049))
+    grid = _grid(points)
+    for lat, lon in ((52.61, 39.61), (52.61 - 1e-9, 39.61 + 1e-9), (52.615, 39.605), (52.62, 39.6)):
+        for k in (1, 4, 9):
+            assert grid.nearest(lat, lon, k) == _brute_force(points, lat, lon, k)
+
+
+def test_city_without_coordinates(db):
+    assert CityGrid().nearest(52.6, 39.6, 5) == []
+
+    with_coordinates = run(db.add_place("Обед", "ул. Ленина, 1", "Столовая", "Липецк"))
+    run(db.set_place_coordinates(with_coordinates, 52.6, 39.6))
+    run(db.add_place("Ужин", "ул. Мира, 2", "Кафе", "Ковров"))
+
+    index = SpatialIndex()
+    assert run(index.nearest(db, "Ковров", 56.36, 41.31)) == []
+    assert run(index.distance_order(db, "Ковров", 56.36, 41.31)) == []
+    assert [place_id for _, place_id in run(index.nearest(db, "Липецк", 52.61, 39.6))] == [with_coordinates]
+
+
+def test_city_points_numpy_and_fallback_agree(monkeypatch):
+    pytest.importorskip("numpy")
+    rng = random.Random(7)
+    points = [(place_id, rng.uniform(52.55, 52.65), rng.uniform(39.5, 39.7)) for place_id in range(1, 201)]
+    # Два заведения в одной точке: при равном расстоянии порядок по ID
+    points.append((500, 52.6, 39.6))
+    points.append((400, 52.6, 39.6))
+    allowed = {place_id for place_id, _, _ in points if place_id % 3 == 0} | {400, 500}
+    queries = [(52.6, 39.6), (52.5, 39.4), (52.631, 39.655)]
+
+    cases = [(lat, lon, subset) for lat, lon in queries for subset in (None, allowed)]
+    vectorized = [CityPoints(points).distance_order(lat, lon, subset) for lat, lon, subset in cases]
+    monkeypatch.setattr(spatial, "np", None)
+    fallback = CityPoints(points)
+
+    for (lat, lon, subset), result in zip(cases, vectorized):
+        expected = fallback.distance_order(lat, lon, subset)
+        assert [place_id for _, place_id in result] == [place_id for _, place_id in expected]
+        assert [distance for distance, _ in result] == pytest.approx([distance for distance, _ in expected])
+        assert all(type(place_id) is int for _, place_id in result)
+    assert fallback.distance_order(52.6, 39.6)[:2] == [(0.0, 400), (0.0, 500)]
+    assert CityPoints([]).distance_order(52.6, 39.6) == []
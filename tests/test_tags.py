@@ -0,0 +1,52 @@
+import aiosqlite
+
+from app.database.tags import TagIndex
+from tests.conftest import run
+
+
+def test_untag_survives_restart(db):
+    place_id = run(db.add_place("Дымок", "ул. Ленина, 1", "Кальянная", "Липецк"))
+    assert run(db.get_place_tags(place_id)) == ["hookah"]
+
+    run(db.remove_place_tags(place_id, ["hookah"]))
+    run(db.create_tables())  # перезапуск бота повторяет автоматическую расстановку тегов
+    assert run(db.get_place_tags(place_id)) == []
+
+    run(db.add_menu_item(place_id, "Кальян классический", 1200, "Кальяны"))
+    assert run(db.get_place_tags(place_id)) == []
+
+
+def test_tag_after_untag_restores_tag(db):
+    place_id = run(db.add_place("Дымок", "ул. Ленина, 1", "Кальянная", "Липецк"))
+    run(db.remove_place_tags(place_id, ["hookah"]))
+    run(db.add_place_tags(place_id, ["hookah", "terrace"]))
+    assert run(db.get_place_tags(place_id)) == ["hookah", "terrace"]
+
+
+def test_tag_index_skips_removed_tags(db):
+    hookah_id = run(db.add_place("Дымок", "ул. Ленина, 1", "Кальянная", "Липецк"))
+    other_id = run(db.add_place("Облако", "ул. Мира, 2", "Кальянная", "Липецк"))
+    run(db.remove_place_tags(other_id, ["hookah"]))
+
+    index = TagIndex()
+    place_ids, total = run(index.find_places(db, "Липецк", tags=["hookah"]))
+    assert (place_ids, total) == ([hookah_id], 1)
+
+
+def test_startup_backfills_missing_tags(db):
+    hookah_id = run(db.add_place("Дымок", "ул. Ленина, 1", "Кальянная", "Липецк"))
+    cafe_id = run(db.add_place("Обед", "ул. Мира, 2", "Столовая", "Липецк"))
+    run(db.add_menu_item(cafe_id, "Кальян на грейпфруте", 1500, "Кальяны"))
+
+    async def drop_tags():
+        # База, заполненная до появления тегов
+        async with aiosqlite.connect(db.db_name) as connection:
+            await connection.execute("DELETE FROM place_tags")
+            await connection.commit()
+
+    run(drop_tags())
+    assert run(db.get_place_tags(hookah_id)) == []
+
+    run(db.create_tables())
+    assert run(db.get_place_tags(hookah_id)) == ["hookah"]
+    assert run(db.get_place_tags(cafe_id)) == ["hookah"]
@@ -0,0 +1,81 @@
+import asyncio
+
+from aiogram.fsm.storage.base import StorageKey
+
+from app.utils.update_scheduler import UserOrderedScheduler, intake_limit
+from tests.conftest import run
+
+
+def _key(user_id: int) -> StorageKey:
+    return StorageKey(bot_id=1, chat_id=user_id, user_id=user_id)
+
+
+async def _handle(scheduler, user_id, delay, log):
+    async with scheduler.lock(_key(user_id)):
+        log.append(("start", user_id, delay))
+        await asyncio.sleep(delay)
+        log.append(("end", user_id, delay))
+
+
+def test_updates_of_one_user_run_in_order():
+    async def scenario():
+        scheduler = UserOrderedScheduler(max_concurrency=8)
+        log = []
+        # Первый апдейт самый долгий, но следующие все равно ждут его
+        await asyncio.gather(*(_handle(scheduler, 1, delay, log) for delay in (0.03, 0.01, 0.0)))
+        return scheduler, log
+
+    scheduler, log = run(scenario())
+    assert log == [
+        ("start", 1, 0.03), ("end", 1, 0.03),
+        ("start", 1, 0.01), ("end", 1, 0.01),
+        ("start", 1, 0.0), ("end", 1, 0.0),
+    ]
+    assert scheduler.snapshot()["handled"] == 3
+    assert scheduler.snapshot()["users"] == 0
+
+
+def test_users_run_in_parallel_up_to_the_limit():
+    async def scenario():
+        scheduler = UserOrderedScheduler(max_concurrency=2)
+        peak = 0
+
+        async def handle(user_id):
+            nonlocal peak
+            async with scheduler.lock(_key(user_id)):
+                peak = max(peak, scheduler.active)
+                await asyncio.sleep(0.01)
+
+        await asyncio.gather(*(handle(user_id) for user_id in range(6)))
+        return scheduler, peak
+
+    scheduler, peak = run(scenario())
+    snapshot = scheduler.snapshot()
+    assert peak == 2
+    assert snapshot["handled"] == 6
+    assert snapshot["active"] == snapshot["queued"] == 0
+    assert snapshot["max_queued"] == 4
+
+
+def test_cancelled_update_releases_its_place():
+    async def scenario():
+        scheduler = UserOrderedScheduler(max_concurrency=1)
+        log = []
+        slow = asyncio.create_task(_handle(scheduler, 1, 1.0, log))
+        waiting = asyncio.create_task(_handle(scheduler, 2, 0.0, log))
+        await asyncio.sleep(0.01)
+        slow.cancel()
+        await asyncio.gather(slow, waiting, return_exceptions=True)
+        return scheduler, log
+
+    scheduler, log = run(scenario())
+    assert log == [("start", 1, 1.0), ("start", 2, 0.0), ("end", 2, 0.0)]
+    assert scheduler.snapshot()["active"] == scheduler.snapshot()["queued"] == 0
+
+
+def test_intake_limit_follows_concurrency(monkeypatch):
+    monkeypatch.delenv("UPDATE_INTAKE_LIMIT", raising=False)
+    monkeypatch.setenv("UPDATE_CONCURRENCY", "10")
+    assert intake_limit() == 40
+    monkeypatch.setenv("UPDATE_INTAKE_LIMIT", "15")
+    assert intake_limit() == 15
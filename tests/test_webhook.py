@@ -0,0 +1,96 @@
+import asyncio
+
+from aiogram import Bot, Dispatcher
+from aiohttp import web
+from aiohttp.test_utils import TestClient, TestServer
+
+from app.utils.webhook import BoundedRequestHandler
+from tests.conftest import run
+
+SECRET = "test-secret"
+HEADERS = {"X-Telegram-Bot-Api-Secret-Token": SECRET}
+
+
+def _update(update_id: int):
+    return {
+        "update_id": update_id,
+        "message": {
+            "message_id": update_id,
+            "date": 0,
+            "chat": {"id": 1, "type": "private"},
+            "from": {"id": 1, "is_bot": False, "first_name": "Test"},
+            "text": "hi",
+        },
+    }
+
+
+async def _client(max_concurrency: int, release: asyncio.Event, handled: list):
+    dp = Dispatcher()
+
+    @dp.message()
+    async def on_message(message):
+        await release.wait()
+        handled.append(message.message_id)
+
+    bot = Bot("123456:TEST")
+    handler = BoundedRequestHandler(dp, bot, max_concurrency=max_concurrency, secret_token=SECRET)
+    app = web.Application()
+    handler.register(app, path="/webhook")
+    client = TestClient(TestServer(app))
+    await client.start_server()
+    return client, handler, bot
+
+
+def test_wrong_secret_is_rejected():
+    async def scenario():
+        release = asyncio.Event()
+        release.set()
+        handled = []
+        client, handler, bot = await _client(4, release, handled)
+        try:
+            missing = await client.post("/webhook", json=_update(1))
+            wrong = await client.post("/webhook", json=_update(2),
+                                      headers={"X-Telegram-Bot-Api-Secret-Token": "wrong"})
+            await asyncio.sleep(0.05)
+            return missing.status, wrong.status, handler.snapshot(), handled
+        finally:
+            await client.close()
+            await bot.session.close()
+
+    missing, wrong, snapshot, handled = run(scenario())
+
+    assert missing == wrong == 401
+    assert snapshot["received"] == 0
+    assert handled == []
+
+
+def test_response_waits_when_all_slots_are_busy():
+    async def scenario():
+        release = asyncio.Event()
+        handled = []
+        client, handler, bot = await _client(1, release, handled)
+        try:
+            first = await client.post("/webhook", json=_update(1), headers=HEADERS)
+            assert first.status == 200
+
+            # Единственное место занято: ответ на второй апдейт задерживается
+            second = asyncio.ensure_future(client.post("/webhook", json=_update(2), headers=HEADERS))
+            await asyncio.sleep(0.1)
+            assert not second.done()
+            assert handler.snapshot()["in_progress"] == 1
+
+            release.set()
+            response = await asyncio.wait_for(second, 1)
+            assert response.status == 200
+            await asyncio.sleep(0.05)
+            return handler.snapshot(), handled
+        finally:
+            await client.close()
+            await bot.session.close()
+
+    snapshot, handled = run(scenario())
+
+    assert handled == [1, 2]
+    assert snapshot["received"] == snapshot["handled"] == 2
+    assert snapshot["in_progress"] == 0
+    assert snapshot["wait_seconds"] > 0.05
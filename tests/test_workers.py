@@ -0,0 +1,51 @@
+import asyncio
+
+from app.utils.workers import UpdateDistributor, shard_of
+from tests.conftest import run
+
+
+def _update(update_id: int, user_id: int = 1):
+    return {"update_id": update_id, "message": {"from": {"id": user_id}, "chat": {"id": user_id}}}
+
+
+def test_shard_keeps_user_on_one_worker():
+    assert shard_of(_update(1, 7), 3) == shard_of(_update(2, 7), 3) == 1
+    assert shard_of({"update_id": 5}, 3) == 2
+
+
+def test_put_waits_for_room_in_worker_queue():
+    distributor = UpdateDistributor(1, queue_size=2)
+    queue = distributor.queues[0]
+
+    async def scenario():
+        await distributor.put(_update(1))
+        await distributor.put(_update(2))
+        pending = asyncio.ensure_future(distributor.put(_update(3)))
+        ticks = 0
+        # Очередь полна: put ждет, а event loop продолжает работать
+        while ticks < 20:
+            await asyncio.sleep(0.01)
+            ticks += 1
+        assert not pending.done()
+
+        assert queue.get(timeout=1)["update_id"] == 1
+        await asyncio.wait_for(pending, 1)
+        return [queue.get(timeout=1)["update_id"] for _ in range(2)]
+
+    try:
+        assert run(scenario()) == [2, 3]
+        assert distributor.distributed == [3]
+    finally:
+        distributor.stop(timeout=0.1)
+
+
+def test_default_queue_size_follows_intake_limit(monkeypatch):
+    monkeypatch.setenv("UPDATE_INTAKE_LIMIT", "3")
+    distributor = UpdateDistributor(1)
+    try:
+        queue = distributor.queues[0]
+        for update_id in range(3):
+            queue.put(_update(update_id), timeout=1)
+        assert queue.full()
+    finally:
+        distributor.stop(timeout=0.1)